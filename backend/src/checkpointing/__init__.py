@@ -0,0 +1,168 @@
+"""
+LangGraph checkpointers, selected at startup from the environment.
+
+CHECKPOINTER_BACKEND:
+- "memory" (default): in-process BoundedMemorySaver, lost on restart and not
+  shared between workers
+- "sqlite": DurableCheckpointSaver on a WAL-mode SQLite file
+  (CHECKPOINT_SQLITE_PATH) that every worker on the box shares
+- "redis": DurableCheckpointSaver on Redis (CHECKPOINT_REDIS_URL)
+
+Every backend keeps the last CHECKPOINT_MAX_PER_THREAD checkpoints per thread
+and at most CHECKPOINT_MEMORY_BUDGET_MB of checkpoints in memory.
+
+With the memory backend, threads idle for CHECKPOINT_COLD_AFTER_SECONDS (or
+pushed out by the byte budget) are spilled to memory-mapped segment files in
+CHECKPOINT_COLD_DIR instead of being discarded (see segments.py); 0 disables
+the cold tier. The durable backends need none: their store is the cold tier.
+
+Node outputs are also appended to an event log keyed by thread and message
+hash, so a retried message replays finished nodes (see events.py).
+
+CHECKPOINT_SERIALIZER selects "compact" (default: msgpack + zstd with a
+shipped, versioned dictionary, see serde.py) or "default" (LangGraph's msgpack).
+"""
+import os
+import logging
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, SerializerProtocol
+
+from .kv import KVStore, SQLiteKVStore, RedisKVStore
+from .memory import BoundedMemorySaver
+from .saver import DurableCheckpointSaver
+from .segments import SegmentStore
+from .events import NodeEventLog, message_hash, journaled, get_event_log, close_event_log, event_log_stats
+from .serde import CompactSerializer, UnknownDictionaryError, load_or_train_dictionary, load_shipped_dictionaries
+
+logger = logging.getLogger(__name__)
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+
+
+def checkpointer_backend() -> str:
+    """Configured checkpointer backend (CHECKPOINTER_BACKEND: memory, sqlite or redis)."""
+    return os.getenv("CHECKPOINTER_BACKEND", "memory").lower()
+
+
+def _create_serializer() -> Optional[SerializerProtocol]:
+    if os.getenv("CHECKPOINT_SERIALIZER", "compact").lower() != "compact":
+        return None
+    dictionary = load_or_train_dictionary(os.getenv("CHECKPOINT_ZSTD_DICT_PATH") or None)
+    return CompactSerializer(
+        dictionary,
+        level=int(os.getenv("CHECKPOINT_ZSTD_LEVEL", "3")),
+        previous_dictionaries=load_shipped_dictionaries()
+    )
+
+
+def _create_cold_store() -> Optional[SegmentStore]:
+    if float(os.getenv("CHECKPOINT_COLD_AFTER_SECONDS", "1800")) <= 0:
+        return None
+    directory = os.getenv("CHECKPOINT_COLD_DIR", "data/cold")
+    max_segment_bytes = int(float(os.getenv("CHECKPOINT_SEGMENT_MB", "64")) * 1024 * 1024)
+    try:
+        store = SegmentStore(directory, max_segment_bytes=max_segment_bytes)
+    except BlockingIOError:
+        # Each worker has its own memory backend, so each needs its own directory
+        directory = os.path.join(directory, f"worker-{os.getpid()}")
+        logger.warning(f"Cold checkpoint directory is owned by another worker, using {directory}")
+        store = SegmentStore(directory, max_segment_bytes=max_segment_bytes)
+    store.start_compactor(float(os.getenv("CHECKPOINT_COMPACT_INTERVAL_SECONDS", "300")))
+    return store
+
+
+def _create_store(backend: str) -> KVStore:
+    if backend == "sqlite":
+        return SQLiteKVStore(os.getenv("CHECKPOINT_SQLITE_PATH", "data/checkpoints.sqlite3"))
+    if backend == "redis":
+        return RedisKVStore(os.getenv("CHECKPOINT_REDIS_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown CHECKPOINTER_BACKEND: {backend}. Expected memory, sqlite or redis.")
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """
+    Create the process-wide checkpointer for the configured backend.
+
+    Returns:
+        The checkpointer to compile the chat workflow with
+    """
+    global _checkpointer
+    backend = checkpointer_backend()
+    bounds = {
+        "max_checkpoints_per_thread": int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "5")),
+        "max_bytes": int(float(os.getenv("CHECKPOINT_MEMORY_BUDGET_MB", "256")) * 1024 * 1024),
+        "serde": _create_serializer()
+    }
+    if backend == "memory":
+        _checkpointer = BoundedMemorySaver(
+            cold_store=_create_cold_store(),
+            cold_after_seconds=float(os.getenv("CHECKPOINT_COLD_AFTER_SECONDS", "1800")),
+            **bounds
+        )
+    else:
+        _checkpointer = DurableCheckpointSaver(
+            _create_store(backend),
+            ttl_seconds=int(os.getenv("CHECKPOINT_TTL_SECONDS", "604800")),
+            cache_ttl_seconds=float(os.getenv("CHECKPOINT_CACHE_TTL_SECONDS", "900")),
+            flush_batch=int(os.getenv("CHECKPOINT_FLUSH_BATCH", "32")),
+            **bounds
+        )
+    logger.info(f"Using checkpointer backend: {backend}")
+    return _checkpointer
+
+
+def get_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """Return the process-wide checkpointer (None before create_checkpointer())."""
+    return _checkpointer
+
+
+async def flush_checkpointer() -> None:
+    """Persist buffered checkpoint writes (called at the end of every message)."""
+    if isinstance(_checkpointer, DurableCheckpointSaver):
+        try:
+            await _checkpointer.aflush()
+        except Exception as e:
+            logger.error(f"Failed to flush checkpoints: {str(e)}")
+
+
+async def close_checkpointer() -> None:
+    """Flush and close the process-wide checkpointer on shutdown."""
+    global _checkpointer
+    if isinstance(_checkpointer, DurableCheckpointSaver):
+        await flush_checkpointer()
+        _checkpointer.store.close()
+    elif isinstance(_checkpointer, BoundedMemorySaver) and _checkpointer.cold_store is not None:
+        _checkpointer.cold_store.close()
+    _checkpointer = None
+
+
+def checkpointer_stats() -> Optional[Dict[str, Any]]:
+    """Memory usage, eviction and flush counters of the checkpointer (None before startup)."""
+    if isinstance(_checkpointer, BoundedMemorySaver):
+        return _checkpointer.stats()
+    return None
+
+
+__all__ = [
+    "KVStore",
+    "SQLiteKVStore",
+    "RedisKVStore",
+    "BoundedMemorySaver",
+    "DurableCheckpointSaver",
+    "CompactSerializer",
+    "UnknownDictionaryError",
+    "SegmentStore",
+    "NodeEventLog",
+    "message_hash",
+    "journaled",
+    "get_event_log",
+    "close_event_log",
+    "event_log_stats",
+    "checkpointer_backend",
+    "create_checkpointer",
+    "get_checkpointer",
+    "flush_checkpointer",
+    "close_checkpointer",
+    "checkpointer_stats"
+]
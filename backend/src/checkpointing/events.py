@@ -0,0 +1,241 @@
+"""
+Append-only event log of workflow node outputs, for retries without LLM calls.
+
+Every node's output is appended to the log under the conversation thread and
+a hash of the message's initial state as soon as the node finishes. When the
+same message runs again - Xano retrying after the worker died before
+call_xano_data_webhook, possibly on another worker - each node whose output
+is already logged returns it instead of calling the providers, so replay is
+deterministic: the graph sees exactly the states of the first attempt, and
+only the nodes that never finished run live.
+
+A message is committed (a marker event is appended) once its webhook call
+succeeds; a committed message is not replayed, so a user repeating the same
+text later gets a fresh answer. Events expire after EVENT_LOG_TTL_SECONDS.
+
+Replayed nodes don't re-emit their streaming events (token deltas, "text",
+"ui"); the final "message" event of /webhook/chat/stream carries the full
+response either way.
+
+The log is a WAL-mode SQLite file (EVENT_LOG_PATH) that all workers on the
+box share, like SQLiteKVStore.
+"""
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+COMMITTED = "__committed__"
+
+_event_log: Optional["NodeEventLog"] = None
+_event_log_lock = threading.Lock()
+
+
+def message_hash(state: Dict[str, Any]) -> str:
+    """
+    Stable hash of a message's initial workflow state.
+
+    Args:
+        state: ConversationState dump the workflow is invoked with
+
+    Returns:
+        Hex SHA-256 of the canonical JSON of `state`
+    """
+    canonical = json.dumps(state, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class NodeEventLog:
+    """
+    Append-only log of node outputs on a WAL-mode SQLite file.
+
+    Args:
+        path: SQLite file
+        ttl_seconds: Age after which events are purged
+        purge_interval: Minimum seconds between lazy purges (run on appends)
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 3600, purge_interval: float = 300.0):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval = purge_interval
+        self.serde = JsonPlusSerializer()
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS node_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, thread_id TEXT NOT NULL, message_hash TEXT NOT NULL, "
+            "node TEXT NOT NULL, type TEXT NOT NULL, output BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS node_events_message ON node_events (thread_id, message_hash, node)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS node_events_created_at ON node_events (created_at)")
+        self._stats = {"recorded": 0, "replayed": 0, "committed": 0}
+        logger.info(f"Node event log opened at {path}")
+
+    def append(self, thread_id: str, message_hash: str, node: str, output: Any) -> None:
+        """Append the output of a finished node."""
+        type_, data = self.serde.dumps_typed(output)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO node_events (thread_id, message_hash, node, type, output, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (thread_id, message_hash, node, type_, sqlite3.Binary(data), now)
+                )
+                if now - self._last_purge >= self.purge_interval:
+                    purged = self._conn.execute(
+                        "DELETE FROM node_events WHERE created_at <= ?", (now - self.ttl_seconds,)
+                    ).rowcount
+                    self._last_purge = now
+                    if purged:
+                        logger.info(f"Purged {purged} expired node events")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if node == COMMITTED:
+                self._stats["committed"] += 1
+            else:
+                self._stats["recorded"] += 1
+
+    def replay(self, thread_id: str, message_hash: str, node: str) -> Optional[Any]:
+        """
+        Logged output of `node` for an uncommitted message.
+
+        Returns:
+            The first logged output, or None if the node never finished (or
+            the message was committed, or its events expired)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT type, output FROM node_events "
+                "WHERE thread_id = ? AND message_hash = ? AND node = ? AND created_at > ? "
+                "AND NOT EXISTS (SELECT 1 FROM node_events WHERE thread_id = ? AND message_hash = ? AND node = ?) "
+                "ORDER BY id LIMIT 1",
+                (thread_id, message_hash, node, time.time() - self.ttl_seconds, thread_id, message_hash, COMMITTED)
+            ).fetchone()
+            if row is None:
+                return None
+            self._stats["replayed"] += 1
+        return self.serde.loads_typed((row[0], bytes(row[1])))
+
+    def commit(self, thread_id: str, message_hash: str) -> None:
+        """Mark a message as delivered, so it is not replayed again."""
+        self.append(thread_id, message_hash, COMMITTED, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Record, replay and commit counters for monitoring."""
+        with self._lock:
+            return {"path": self.path, "ttl_seconds": self.ttl_seconds, **self._stats}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def event_log_enabled() -> bool:
+    """Whether node outputs are logged for replay (ENABLE_EVENT_LOG, default true)."""
+    return os.getenv("ENABLE_EVENT_LOG", "true").lower() == "true"
+
+
+def get_event_log() -> Optional[NodeEventLog]:
+    """Return the process-wide event log, opening it on first use (None when disabled)."""
+    global _event_log
+    if _event_log is None and event_log_enabled():
+        with _event_log_lock:
+            if _event_log is None:
+                _event_log = NodeEventLog(
+                    os.getenv("EVENT_LOG_PATH", "data/events.sqlite3"),
+                    ttl_seconds=int(os.getenv("EVENT_LOG_TTL_SECONDS", "3600"))
+                )
+    return _event_log
+
+
+def close_event_log() -> None:
+    """Close the process-wide event log on shutdown."""
+    global _event_log
+    if _event_log is not None:
+        _event_log.close()
+        _event_log = None
+
+
+def event_log_stats() -> Optional[Dict[str, Any]]:
+    """Counters of the process-wide event log (None when disabled or unused)."""
+    return _event_log.stats() if _event_log is not None else None
+
+
+def journaled(node: str, func: Callable[[Any], Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Wrap an async workflow node so its output is logged and replayed.
+
+    Nodes only use the log when the run config carries a "message_hash"
+    (see main.build_thread_config); otherwise they run unchanged.
+
+    Args:
+        node: Node name in the graph
+        func: Node function taking the ConversationState
+
+    Returns:
+        Node function taking (state, config)
+    """
+    async def wrapper(state: Any, config: RunnableConfig) -> Any:
+        configurable = (config or {}).get("configurable", {})
+        key = configurable.get("message_hash")
+        log = get_event_log() if key else None
+        if log is None:
+            return await func(state)
+        thread_id = configurable["thread_id"]
+
+        try:
+            recorded = await asyncio.to_thread(log.replay, thread_id, key, node)
+        except Exception as e:
+            logger.error(f"Failed to read node events for {node}: {str(e)}")
+            recorded = None
+        if recorded is not None:
+            logger.info(f"Replayed {node} for {thread_id} from the event log")
+            return type(state).model_validate(recorded) if isinstance(state, BaseModel) else recorded
+
+        result = await func(state)
+        output = result.model_dump() if isinstance(result, BaseModel) else result
+        try:
+            await asyncio.to_thread(log.append, thread_id, key, node, output)
+        except Exception as e:
+            logger.error(f"Failed to log {node} output: {str(e)}")
+        return result
+
+    # No functools.wraps: LangGraph must see the (state, config) signature, not func's
+    wrapper.__name__ = wrapper.__qualname__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+__all__ = [
+    "COMMITTED",
+    "message_hash",
+    "NodeEventLog",
+    "event_log_enabled",
+    "get_event_log",
+    "close_event_log",
+    "event_log_stats",
+    "journaled"
+]
@@ -0,0 +1,178 @@
+"""
+Key-value stores behind the durable checkpointer.
+
+The checkpointer only needs a small Redis-compatible subset - get, mget,
+set/mset with an expiry, delete and expire - so it can run against a real
+Redis (RedisKVStore, needs the optional `redis` package) or against
+SQLiteKVStore, a local stand-in that keeps the same semantics in a WAL-mode
+SQLite file. Several uvicorn workers on one box can share the SQLite file:
+WAL lets readers run alongside the single writer, and busy_timeout makes
+concurrent writers wait instead of failing.
+"""
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+except ImportError:  # optional dependency, only needed for CHECKPOINTER_BACKEND=redis
+    redis = None
+
+
+class KVStore:
+    """Redis-compatible subset used by DurableCheckpointSaver."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Value of `key`, or None if missing or expired."""
+        raise NotImplementedError
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        """Values of several keys, None for missing or expired ones."""
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> None:
+        """Store `value`, expiring after `ex` seconds (never if None)."""
+        self.mset({key: value}, ex=ex)
+
+    def mset(self, mapping: Dict[str, bytes], ex: Optional[int] = None) -> None:
+        """Store several values atomically with one shared expiry."""
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> int:
+        """Delete keys; returns how many existed."""
+        raise NotImplementedError
+
+    def expire(self, key: str, seconds: int) -> bool:
+        """Reset the expiry of `key`; False if it doesn't exist."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the connection."""
+
+
+class SQLiteKVStore(KVStore):
+    """
+    Local stand-in for Redis on a WAL-mode SQLite file.
+
+    Expired rows are invisible to reads and are purged lazily, at most once
+    per `purge_interval` seconds, on writes.
+    """
+
+    def __init__(self, path: str, purge_interval: float = 300.0):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS kv_expires_at ON kv (expires_at)")
+        logger.info(f"SQLite checkpoint store opened at {path}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.mget([key])[0]
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        keys = list(keys)
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, value FROM kv WHERE key IN ({placeholders}) "
+                f"AND (expires_at IS NULL OR expires_at > ?)",
+                (*keys, time.time())
+            ).fetchall()
+        found = {key: bytes(value) for key, value in rows}
+        return [found.get(key) for key in keys]
+
+    def mset(self, mapping: Dict[str, bytes], ex: Optional[int] = None) -> None:
+        if not mapping:
+            return
+        now = time.time()
+        expires_at = now + ex if ex else None
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                    [(key, sqlite3.Binary(value), expires_at) for key, value in mapping.items()]
+                )
+                if now - self._last_purge >= self.purge_interval:
+                    purged = self._conn.execute(
+                        "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+                    ).rowcount
+                    self._last_purge = now
+                    if purged:
+                        logger.info(f"Purged {purged} expired checkpoint keys")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            return self._conn.execute(f"DELETE FROM kv WHERE key IN ({placeholders})", keys).rowcount
+
+    def expire(self, key: str, seconds: int) -> bool:
+        now = time.time()
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE kv SET expires_at = ? WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (now + seconds, key, now)
+            ).rowcount > 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisKVStore(KVStore):
+    """KVStore on a Redis server (requires the `redis` package)."""
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("CHECKPOINTER_BACKEND=redis requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+        logger.info("Redis checkpoint store connected")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        keys = list(keys)
+        return self._client.mget(keys) if keys else []
+
+    def mset(self, mapping: Dict[str, bytes], ex: Optional[int] = None) -> None:
+        if not mapping:
+            return
+        pipeline = self._client.pipeline(transaction=True)
+        for key, value in mapping.items():
+            pipeline.set(key, value, ex=ex)
+        pipeline.execute()
+
+    def delete(self, *keys: str) -> int:
+        return self._client.delete(*keys) if keys else 0
+
+    def expire(self, key: str, seconds: int) -> bool:
+        return bool(self._client.expire(key, seconds))
+
+    def close(self) -> None:
+        self._client.close()
+
+
+__all__ = ["KVStore", "SQLiteKVStore", "RedisKVStore"]
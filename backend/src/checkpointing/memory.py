@@ -0,0 +1,367 @@
+"""
+Bounded in-memory LangGraph checkpointer.
+
+MemorySaver keeps every checkpoint of every thread for the life of the
+process. BoundedMemorySaver keeps only the last CHECKPOINT_MAX_PER_THREAD
+checkpoints of each thread (with the channel blobs and pending writes they
+still reference) and evicts whole threads, least recently used first, once
+the serialized size of everything it holds exceeds CHECKPOINT_MEMORY_BUDGET_MB.
+With a CompactSerializer, diagnostic-only channels are capped before storing.
+
+With a cold store (segments.py), threads idle for CHECKPOINT_COLD_AFTER_SECONDS
+and threads pushed out by the byte budget are spilled to disk as one snapshot
+instead of being discarded, and rehydrated transparently on their next access,
+so the hot set stays bounded however many conversations exist.
+
+A snapshot written with a zstd dictionary this process can't decode (see
+serde.py) is treated as missing: the thread starts over instead of failing.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from typing import Any, Dict, Optional, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple, SerializerProtocol
+from langgraph.checkpoint.memory import InMemorySaver
+
+from .segments import SegmentStore
+from .serde import (
+    DIAGNOSTIC_CHANNEL_LIMITS,
+    CompactSerializer,
+    UnknownDictionaryError,
+    compact_channel_value,
+    compact_channel_values
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    InMemorySaver with per-thread checkpoint pruning and an LRU byte budget.
+
+    Args:
+        max_checkpoints_per_thread: Checkpoints kept per thread and namespace
+        max_bytes: Budget for the serialized checkpoints, blobs and writes (0 = unbounded)
+        cold_store: Segment store receiving idle and evicted threads (None = discard them)
+        cold_after_seconds: Idle time after which a thread is spilled to the cold store
+        serde: Checkpoint serializer (LangGraph's default if None)
+    """
+
+    def __init__(
+        self,
+        max_checkpoints_per_thread: int = 5,
+        max_bytes: int = 256 * 1024 * 1024,
+        cold_store: Optional[SegmentStore] = None,
+        cold_after_seconds: float = 1800.0,
+        serde: Optional[SerializerProtocol] = None
+    ):
+        super().__init__(serde=serde)
+        self.max_checkpoints_per_thread = max(1, max_checkpoints_per_thread)
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        # thread_id -> serialized bytes held, least recently used first
+        self._lru: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._versions: Dict[str, Dict[Tuple[str, str], Dict[str, Any]]] = {}
+        self._write_keys: Dict[str, Set[Tuple[str, str, str]]] = {}
+        self._blob_keys: Dict[str, Set[Tuple[Any, ...]]] = {}
+        self._evictions = 0
+        self._pruned_checkpoints = 0
+        self.cold_store = cold_store
+        self.cold_after_seconds = cold_after_seconds
+        self._last_access: Dict[str, float] = {}
+        self._next_idle_check = time.monotonic() + min(60.0, cold_after_seconds / 2)
+        self._spilled = 0
+        self._rehydrated = 0
+        self._unreadable = 0
+
+    # Thread snapshots
+
+    def _encode_thread(self, thread_id: str, **extra: Any) -> bytes:
+        """Serialize everything held for a thread (plus `extra` fields) as one snapshot."""
+        versions = self._versions.get(thread_id, {})
+        snapshot = {
+            **extra,
+            "checkpoints": [
+                [ns, checkpoint_id, list(checkpoint), list(metadata), parent, versions.get((ns, checkpoint_id), {})]
+                for ns, checkpoints in self.storage.get(thread_id, {}).items()
+                for checkpoint_id, (checkpoint, metadata, parent) in checkpoints.items()
+            ],
+            "writes": [
+                [key[1], key[2], [[w[0], idx[1], w[1], list(w[2]), w[3]] for idx, w in self.writes[key].items()]]
+                for key in self._write_keys.get(thread_id, ()) if key in self.writes
+            ],
+            "blobs": [
+                [key[1], key[2], key[3], list(self.blobs[key])]
+                for key in self._blob_keys.get(thread_id, ()) if key in self.blobs
+            ]
+        }
+        type_, data = self.serde.dumps_typed(snapshot)
+        return type_.encode() + b"\n" + data
+
+    def _check_readable(self, snapshot: Dict[str, Any]) -> None:
+        """Raise UnknownDictionaryError if any payload in a snapshot can't be decoded."""
+        if not isinstance(self.serde, CompactSerializer):
+            return
+        types = [type_ for _, _, checkpoint, metadata, _, _ in snapshot["checkpoints"] for type_ in (checkpoint[0], metadata[0])]
+        types += [write[3][0] for _, _, writes in snapshot["writes"] for write in writes]
+        types += [value[0] for _, _, _, value in snapshot["blobs"]]
+        for type_ in types:
+            self.serde.ensure_readable(type_)
+
+    def _load_thread(self, thread_id: str, raw: bytes) -> Dict[str, Any]:
+        """
+        Replace the thread in memory with a snapshot from _encode_thread(); returns the snapshot.
+
+        Raises:
+            UnknownDictionaryError: If the snapshot was written with a dictionary
+                that isn't loaded (the thread in memory is left untouched)
+        """
+        type_, _, data = raw.partition(b"\n")
+        snapshot = self.serde.loads_typed((type_.decode(), data))
+        self._check_readable(snapshot)
+        self._drop(thread_id)
+        versions = self._versions.setdefault(thread_id, {})
+        for ns, checkpoint_id, checkpoint, metadata, parent, channel_versions in snapshot["checkpoints"]:
+            self.storage[thread_id][ns][checkpoint_id] = (tuple(checkpoint), tuple(metadata), parent)
+            versions[(ns, checkpoint_id)] = channel_versions
+        write_keys = self._write_keys.setdefault(thread_id, set())
+        for ns, checkpoint_id, writes in snapshot["writes"]:
+            outer_key = (thread_id, ns, checkpoint_id)
+            write_keys.add(outer_key)
+            self.writes[outer_key] = {
+                (task_id, idx): (task_id, channel, tuple(value), path)
+                for task_id, idx, channel, value, path in writes
+            }
+        blob_keys = self._blob_keys.setdefault(thread_id, set())
+        for ns, channel, version, value in snapshot["blobs"]:
+            key = (thread_id, ns, channel, version)
+            blob_keys.add(key)
+            self.blobs[key] = tuple(value)
+        self._account(thread_id)
+        self._last_access[thread_id] = time.monotonic()
+        self._enforce_budget(thread_id)
+        return snapshot
+
+    # Cold tier
+
+    def _evict(self, thread_id: str) -> None:
+        """Move a thread out of memory, to the cold store if there is one."""
+        if self.cold_store is not None and thread_id in self.storage:
+            self.cold_store.put(thread_id, self._encode_thread(thread_id))
+            self._spilled += 1
+        self._drop(thread_id)
+
+    def _ensure_hot(self, thread_id: str) -> None:
+        """Rehydrate a spilled thread before it is read or written."""
+        if self.cold_store is None or thread_id in self.storage:
+            return
+        raw = self.cold_store.get(thread_id)
+        if raw is None:
+            return
+        try:
+            self._load_thread(thread_id, raw)
+            self._rehydrated += 1
+        except UnknownDictionaryError as e:
+            logger.warning(f"Discarding unreadable cold checkpoint of thread {thread_id}: {e}")
+            self._unreadable += 1
+        self.cold_store.delete(thread_id)
+
+    def _spill_idle(self) -> None:
+        """Spill threads idle for cold_after_seconds (checked at most every minute)."""
+        now = time.monotonic()
+        if self.cold_store is None or now < self._next_idle_check:
+            return
+        self._next_idle_check = now + min(60.0, self.cold_after_seconds / 2)
+        cutoff = now - self.cold_after_seconds
+        idle = [t for t, accessed in self._last_access.items() if accessed < cutoff and self._evictable(t)]
+        for thread_id in idle:
+            self._evict(thread_id)
+        if idle:
+            logger.info(f"Spilled {len(idle)} idle checkpoint threads to the cold store")
+
+    def _touch(self, thread_id: str) -> None:
+        self._last_access[thread_id] = time.monotonic()
+        if thread_id in self._lru:
+            self._lru.move_to_end(thread_id)
+
+    # Accounting
+
+    def _thread_bytes(self, thread_id: str) -> int:
+        size = sum(
+            len(checkpoint[1]) + len(metadata[1])
+            for checkpoints in self.storage.get(thread_id, {}).values()
+            for checkpoint, metadata, _ in checkpoints.values()
+        )
+        size += sum(len(self.blobs[key][1]) for key in self._blob_keys.get(thread_id, ()) if key in self.blobs)
+        size += sum(
+            len(write[2][1])
+            for key in self._write_keys.get(thread_id, ()) for write in self.writes.get(key, {}).values()
+        )
+        return size
+
+    def _account(self, thread_id: str) -> None:
+        """Re-measure a thread and mark it most recently used."""
+        size = self._thread_bytes(thread_id)
+        self._bytes += size - self._lru.get(thread_id, 0)
+        self._lru[thread_id] = size
+        self._lru.move_to_end(thread_id)
+
+    def _evictable(self, thread_id: str) -> bool:
+        """Whether a thread may be evicted to meet the budget."""
+        return True
+
+    def _enforce_budget(self, current: str) -> None:
+        if self.max_bytes <= 0 or self._bytes <= self.max_bytes:
+            return
+        evicted = 0
+        for thread_id in list(self._lru):
+            if self._bytes <= self.max_bytes:
+                break
+            if thread_id != current and self._evictable(thread_id):
+                self._evict(thread_id)
+                evicted += 1
+        if evicted:
+            self._evictions += evicted
+            logger.info(f"Evicted {evicted} checkpoint threads to stay within {self.max_bytes} bytes")
+
+    def _drop(self, thread_id: str) -> None:
+        """Remove a thread and everything it references from memory."""
+        for ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, ns, checkpoint_id), None)
+        for key in self._write_keys.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._blob_keys.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        self._versions.pop(thread_id, None)
+        self._last_access.pop(thread_id, None)
+        self._bytes -= self._lru.pop(thread_id, 0)
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Keep the newest checkpoints of a namespace and the blobs they reference."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        if len(checkpoints) <= self.max_checkpoints_per_thread:
+            return
+        versions = self._versions.setdefault(thread_id, {})
+        write_keys = self._write_keys.get(thread_id, set())
+        stale = sorted(checkpoints)[:-self.max_checkpoints_per_thread]
+        for checkpoint_id in stale:
+            del checkpoints[checkpoint_id]
+            versions.pop((checkpoint_ns, checkpoint_id), None)
+            key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(key, None)
+            write_keys.discard(key)
+        live = {
+            (channel, version)
+            for (ns, _), channel_versions in versions.items() if ns == checkpoint_ns
+            for channel, version in channel_versions.items()
+        }
+        blob_keys = self._blob_keys.get(thread_id, set())
+        for key in [k for k in blob_keys if k[1] == checkpoint_ns and (k[2], k[3]) not in live]:
+            self.blobs.pop(key, None)
+            blob_keys.discard(key)
+        self._pruned_checkpoints += len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of memory usage, eviction and serializer counters for monitoring."""
+        with self._lock:
+            return {
+                "serializer": self.serde.stats() if isinstance(self.serde, CompactSerializer) else None,
+                "threads": len(self._lru),
+                "checkpoints": sum(len(c) for namespaces in self.storage.values() for c in namespaces.values()),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_checkpoints_per_thread": self.max_checkpoints_per_thread,
+                "evictions": self._evictions,
+                "pruned_checkpoints": self._pruned_checkpoints,
+                "spilled": self._spilled,
+                "rehydrated": self._rehydrated,
+                "unreadable": self._unreadable,
+                "cold": self.cold_store.stats() if self.cold_store is not None else None
+            }
+
+    # BaseCheckpointSaver API
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._ensure_hot(thread_id)
+            if thread_id not in self.storage:
+                return None
+            self._touch(thread_id)
+            self._spill_idle()
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        # Without a thread only the threads in memory are listed
+        with self._lock:
+            if config:
+                self._ensure_hot(config["configurable"]["thread_id"])
+            if config and config["configurable"]["thread_id"] not in self.storage:
+                return
+            items = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        if isinstance(self.serde, CompactSerializer):
+            checkpoint = {**checkpoint, "channel_values": compact_channel_values(checkpoint["channel_values"])}
+        with self._lock:
+            self._ensure_hot(thread_id)
+            result = super().put(config, checkpoint, metadata, new_versions)
+            self._versions.setdefault(thread_id, {})[(checkpoint_ns, checkpoint["id"])] = dict(
+                checkpoint["channel_versions"]
+            )
+            self._blob_keys.setdefault(thread_id, set()).update(
+                (thread_id, checkpoint_ns, channel, version) for channel, version in new_versions.items()
+            )
+            self._prune(thread_id, checkpoint_ns)
+            self._account(thread_id)
+            self._touch(thread_id)
+            self._enforce_budget(thread_id)
+            self._spill_idle()
+            return result
+
+    def put_writes(self, config: RunnableConfig, writes, task_id: str, task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        if isinstance(self.serde, CompactSerializer):
+            writes = [
+                (channel, compact_channel_value(channel, value)) for channel, value in writes
+                if channel not in DIAGNOSTIC_CHANNEL_LIMITS or DIAGNOSTIC_CHANNEL_LIMITS[channel] is not None
+            ]
+        with self._lock:
+            self._ensure_hot(thread_id)
+            super().put_writes(config, writes, task_id, task_path)
+            self._write_keys.setdefault(thread_id, set()).add(outer_key)
+            self._account(thread_id)
+            self._touch(thread_id)
+            self._enforce_budget(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._drop(thread_id)
+            if self.cold_store is not None:
+                self.cold_store.delete(thread_id)
+
+
+__all__ = ["BoundedMemorySaver"]
@@ -0,0 +1,279 @@
+"""
+Durable LangGraph checkpointer on a key-value store.
+
+DurableCheckpointSaver keeps BoundedMemorySaver's structures as a write-through
+hot cache and persists each conversation thread as one snapshot key in a KVStore
+(SQLite or Redis, see kv.py):
+
+- writes go to memory first and mark the thread dirty; dirty threads are
+  written together in one batched mset when CHECKPOINT_FLUSH_BATCH writes have
+  accumulated and at the end of every message (flush() / aflush())
+- every snapshot key expires CHECKPOINT_TTL_SECONDS after the thread's last
+  flush, so abandoned conversations age out of the store
+- a thread not touched for CHECKPOINT_CACHE_TTL_SECONDS, or evicted by the
+  BoundedMemorySaver byte budget, is dropped from memory and reloaded from the
+  store on its next access; threads with unflushed writes are never evicted
+- only the last CHECKPOINT_MAX_PER_THREAD checkpoints are kept, which also
+  bounds the size of each snapshot
+- each flush writes a new revision id next to the snapshot; reads compare it
+  with the cached revision, so a conversation that continues on another
+  worker is reloaded instead of served stale
+- a snapshot written with a zstd dictionary this process can't decode is a
+  cache miss: the thread starts over and its next flush replaces the snapshot
+"""
+import time
+import uuid
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple, SerializerProtocol
+
+from .kv import KVStore
+from .memory import BoundedMemorySaver
+from .serde import UnknownDictionaryError
+
+logger = logging.getLogger(__name__)
+
+THREAD_KEY = "checkpoint:thread:{}"
+REVISION_KEY = "checkpoint:rev:{}"
+
+
+class DurableCheckpointSaver(BoundedMemorySaver):
+    """
+    BoundedMemorySaver backed by a KVStore, with per-thread TTL and batched writes.
+
+    Args:
+        store: Key-value store holding the thread snapshots
+        ttl_seconds: Store expiry of a thread after its last flush
+        cache_ttl_seconds: Idle time after which a thread leaves the hot cache
+        flush_batch: Buffered writes that trigger a flush
+        max_checkpoints_per_thread: Checkpoints kept per thread and namespace
+        max_bytes: Byte budget of the hot cache (0 = unbounded)
+        serde: Checkpoint serializer (LangGraph's default if None)
+    """
+
+    def __init__(
+        self,
+        store: KVStore,
+        ttl_seconds: int = 604800,
+        cache_ttl_seconds: float = 900.0,
+        flush_batch: int = 32,
+        max_checkpoints_per_thread: int = 5,
+        max_bytes: int = 256 * 1024 * 1024,
+        serde: Optional[SerializerProtocol] = None
+    ):
+        super().__init__(max_checkpoints_per_thread=max_checkpoints_per_thread, max_bytes=max_bytes, serde=serde)
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.flush_batch = max(1, flush_batch)
+        self._dirty: Set[str] = set()
+        self._pending_writes = 0
+        self._revisions: Dict[str, Optional[str]] = {}
+        self._stats = {"loads": 0, "cache_hits": 0, "flushes": 0, "flushed_threads": 0, "expirations": 0, "unreadable": 0}
+
+    # Hot cache management
+
+    def _drop(self, thread_id: str) -> None:
+        """Forget a thread in memory only (the store keeps it)."""
+        super()._drop(thread_id)
+        self._revisions.pop(thread_id, None)
+
+    def _evictable(self, thread_id: str) -> bool:
+        return thread_id not in self._dirty
+
+    def _refresh(self, thread_id: str) -> None:
+        """Make the cached thread match the store, unless it has unflushed writes."""
+        self._last_access[thread_id] = time.monotonic()
+        if thread_id in self._dirty:
+            return
+        raw_revision = self.store.get(REVISION_KEY.format(thread_id))
+        revision = raw_revision.decode() if raw_revision else None
+        if thread_id in self._revisions and revision == self._revisions[thread_id]:
+            self._stats["cache_hits"] += 1
+            return
+        self._drop(thread_id)
+        raw = self.store.get(THREAD_KEY.format(thread_id)) if revision else None
+        try:
+            self._revisions[thread_id] = self._load_thread(thread_id, raw)["rev"] if raw else None
+            if raw:
+                self._stats["loads"] += 1
+        except UnknownDictionaryError as e:
+            # Serve the thread as new; keeping the revision avoids retrying every access
+            logger.warning(f"Ignoring unreadable checkpoint of thread {thread_id}: {e}")
+            self._revisions[thread_id] = revision
+            self._stats["unreadable"] += 1
+        self._last_access[thread_id] = time.monotonic()
+
+    def _evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.cache_ttl_seconds
+        idle = [t for t, accessed in self._last_access.items() if accessed < cutoff and t not in self._dirty]
+        for thread_id in idle:
+            self._drop(thread_id)
+        if idle:
+            self._stats["expirations"] += len(idle)
+            logger.info(f"Evicted {len(idle)} idle threads from the checkpoint cache")
+
+    def _mark_dirty(self, thread_id: str) -> bool:
+        """Record a buffered write; returns whether a flush is due."""
+        self._dirty.add(thread_id)
+        self._last_access[thread_id] = time.monotonic()
+        self._pending_writes += 1
+        return self._pending_writes >= self.flush_batch
+
+    # Flushing
+
+    def flush(self) -> int:
+        """
+        Write every dirty thread to the store in one batch.
+
+        Returns:
+            Number of threads written
+        """
+        with self._lock:
+            if not self._dirty:
+                return 0
+            threads = list(self._dirty)
+            revisions = {thread_id: uuid.uuid4().hex for thread_id in threads}
+            mapping: Dict[str, bytes] = {}
+            for thread_id in threads:
+                mapping[THREAD_KEY.format(thread_id)] = self._encode_thread(thread_id, rev=revisions[thread_id])
+                mapping[REVISION_KEY.format(thread_id)] = revisions[thread_id].encode()
+            self._dirty.clear()
+            self._pending_writes = 0
+        try:
+            self.store.mset(mapping, ex=self.ttl_seconds)
+        except Exception:
+            with self._lock:
+                self._dirty.update(threads)
+            raise
+        with self._lock:
+            for thread_id in threads:
+                if thread_id not in self._dirty:
+                    self._revisions[thread_id] = revisions[thread_id]
+            self._stats["flushes"] += 1
+            self._stats["flushed_threads"] += len(threads)
+            self._evict_idle()
+        logger.debug(f"Flushed {len(threads)} checkpoint threads ({sum(len(v) for v in mapping.values())} bytes)")
+        return len(threads)
+
+    async def aflush(self) -> int:
+        """Async flush(); the store I/O runs in a worker thread."""
+        return await asyncio.to_thread(self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the hot cache and flush counters for monitoring."""
+        with self._lock:
+            return {
+                "store": type(self.store).__name__,
+                **super().stats(),
+                "dirty_threads": len(self._dirty),
+                "ttl_seconds": self.ttl_seconds,
+                **self._stats
+            }
+
+    # BaseCheckpointSaver API
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        with self._lock:
+            self._refresh(config["configurable"]["thread_id"])
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[CheckpointTuple]:
+        # Without a thread only the cached threads can be listed
+        with self._lock:
+            if config:
+                self._refresh(config["configurable"]["thread_id"])
+            items: List[CheckpointTuple] = list(super().list(config, filter=filter, before=before, limit=limit))
+        yield from items
+
+    def _put(self, config, checkpoint, metadata, new_versions) -> Tuple[RunnableConfig, bool]:
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            return result, self._mark_dirty(config["configurable"]["thread_id"])
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        result, flush_due = self._put(config, checkpoint, metadata, new_versions)
+        if flush_due:
+            self.flush()
+        return result
+
+    def _put_writes(self, config, writes, task_id, task_path) -> bool:
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+            return self._mark_dirty(config["configurable"]["thread_id"])
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        if self._put_writes(config, writes, task_id, task_path):
+            self.flush()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._dirty.discard(thread_id)
+            self._drop(thread_id)
+        self.store.delete(THREAD_KEY.format(thread_id), REVISION_KEY.format(thread_id))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[CheckpointTuple]:
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        result, flush_due = self._put(config, checkpoint, metadata, new_versions)
+        if flush_due:
+            await self.aflush()
+        return result
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = ""
+    ) -> None:
+        if self._put_writes(config, writes, task_id, task_path):
+            await self.aflush()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+__all__ = ["DurableCheckpointSaver"]
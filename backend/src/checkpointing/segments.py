@@ -0,0 +1,276 @@
+"""
+Append-only, memory-mapped segment files for cold checkpoint threads.
+
+Records are appended to the active segment file (seg-000001.log, ...) and
+read back through mmap, so a cold thread costs one index entry in memory
+(key -> segment id and offset) instead of its whole state. Record layout:
+
+    crc32 (4) | flags (1) | key length (2) | value length (4) | key | value
+
+Overwriting or deleting a key leaves the old record behind as garbage
+(deletes append a tombstone). A background thread compacts sealed segments
+whose live bytes drop below half of their size by copying the live records
+into the active segment and removing the old file. A tombstone is copied too
+while an older segment still exists (which may hold a value it deletes), so
+a deleted key can't come back when the index is rebuilt. The index is rebuilt
+by scanning the segments in order on startup; a record torn by a crash is
+truncated away.
+
+One process owns a directory at a time (an exclusive lock file enforces it).
+"""
+import os
+import mmap
+import zlib
+import fcntl
+import struct
+import logging
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct("<IBHI")
+TOMBSTONE = 1
+# Sealed segments with less live data than this share of their size are compacted
+COMPACT_LIVE_RATIO = 0.5
+
+
+class SegmentStore:
+    """
+    Key -> bytes store on append-only memory-mapped segment files.
+
+    Args:
+        directory: Directory holding the segment files
+        max_segment_bytes: Size at which the active segment is sealed and a new one started
+
+    Raises:
+        BlockingIOError: If another process already owns `directory`
+    """
+
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 1024 * 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self._lock = threading.RLock()
+        self._lock_file = open(os.path.join(directory, "LOCK"), "w")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # key -> (segment id, record offset, record length)
+        self._index: Dict[str, Tuple[int, int, int]] = {}
+        self._sizes: Dict[int, int] = {}
+        self._live: Dict[int, int] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._active_id = 0
+        self._active_fd: Optional[int] = None
+        self._compactions = 0
+        self._reclaimed_bytes = 0
+        self._compactor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._recover()
+
+    # Files
+
+    def _path(self, segment_id: int) -> str:
+        return os.path.join(self.directory, f"seg-{segment_id:06d}.log")
+
+    def _segment_ids(self) -> list:
+        names = [n for n in os.listdir(self.directory) if n.startswith("seg-") and n.endswith(".log")]
+        return sorted(int(n[4:-4]) for n in names)
+
+    def _open_active(self, segment_id: int) -> None:
+        if self._active_fd is not None:
+            os.close(self._active_fd)
+        self._active_id = segment_id
+        self._active_fd = os.open(self._path(segment_id), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._sizes.setdefault(segment_id, os.fstat(self._active_fd).st_size)
+        self._live.setdefault(segment_id, 0)
+
+    def _map(self, segment_id: int, end: int) -> mmap.mmap:
+        """mmap of a segment covering at least `end` bytes (the active segment grows)."""
+        current = self._maps.get(segment_id)
+        if current is None or len(current) < end:
+            if current is not None:
+                current.close()
+            with open(self._path(segment_id), "rb") as f:
+                current = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment_id] = current
+        return current
+
+    def _records(self, segment_id: int) -> Iterator[Tuple[int, int, int, str, int]]:
+        """(offset, length, flags, key, value offset) for every intact record of a segment."""
+        size = os.path.getsize(self._path(segment_id))
+        if size == 0:
+            return
+        data = self._map(segment_id, size)
+        offset = 0
+        while offset + HEADER.size <= size:
+            crc, flags, key_len, value_len = HEADER.unpack_from(data, offset)
+            end = offset + HEADER.size + key_len + value_len
+            if end > size:
+                break
+            body = data[offset + HEADER.size:end]
+            if zlib.crc32(body) != crc:
+                break
+            yield offset, end - offset, flags, body[:key_len].decode(), offset + HEADER.size + key_len
+            offset = end
+
+    def _recover(self) -> None:
+        """Rebuild the index from the segment files, truncating a torn tail."""
+        segment_ids = self._segment_ids()
+        for segment_id in segment_ids:
+            self._sizes[segment_id] = 0
+            self._live[segment_id] = 0
+            good_end = 0
+            for offset, length, flags, key, _ in self._records(segment_id):
+                self._unlink_key(key)
+                if not flags & TOMBSTONE:
+                    self._index[key] = (segment_id, offset, length)
+                    self._live[segment_id] += length
+                good_end = offset + length
+            if good_end < os.path.getsize(self._path(segment_id)):
+                logger.warning(f"Truncating torn record at {self._path(segment_id)}:{good_end}")
+                self._maps.pop(segment_id).close()
+                os.truncate(self._path(segment_id), good_end)
+            self._sizes[segment_id] = good_end
+        self._open_active(segment_ids[-1] if segment_ids else 1)
+        if self._index:
+            logger.info(f"Cold checkpoint store recovered {len(self._index)} threads from {len(segment_ids)} segments")
+
+    # Records
+
+    def _unlink_key(self, key: str) -> None:
+        old = self._index.pop(key, None)
+        if old is not None:
+            self._live[old[0]] -= old[2]
+
+    def _append(self, key: str, value: bytes, flags: int = 0) -> Tuple[int, int, int]:
+        if self._sizes[self._active_id] >= self.max_segment_bytes:
+            self._open_active(self._active_id + 1)
+        body = key.encode() + value
+        record = HEADER.pack(zlib.crc32(body), flags, len(key.encode()), len(value)) + body
+        offset = self._sizes[self._active_id]
+        os.write(self._active_fd, record)
+        self._sizes[self._active_id] += len(record)
+        return self._active_id, offset, len(record)
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store `value` under `key`, replacing any earlier value."""
+        with self._lock:
+            self._unlink_key(key)
+            location = self._append(key, value)
+            self._index[key] = location
+            self._live[location[0]] += location[2]
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Value of `key`, or None if it isn't stored."""
+        with self._lock:
+            location = self._index.get(key)
+            if location is None:
+                return None
+            segment_id, offset, length = location
+            data = self._map(segment_id, offset + length)
+            _, _, key_len, value_len = HEADER.unpack_from(data, offset)
+            start = offset + HEADER.size + key_len
+            return data[start:start + value_len]
+
+    def delete(self, key: str) -> bool:
+        """Remove `key` (appends a tombstone); False if it wasn't stored."""
+        with self._lock:
+            if key not in self._index:
+                return False
+            self._unlink_key(key)
+            self._append(key, b"", TOMBSTONE)
+            return True
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # Compaction
+
+    def compact(self) -> int:
+        """
+        Rewrite sealed segments that are mostly garbage.
+
+        Returns:
+            Bytes reclaimed
+        """
+        reclaimed = 0
+        with self._lock:
+            candidates = [
+                segment_id for segment_id, size in self._sizes.items()
+                if segment_id != self._active_id and self._live[segment_id] < size * COMPACT_LIVE_RATIO
+            ]
+        for segment_id in candidates:
+            # One segment at a time, so reads and writes only wait for one rewrite
+            with self._lock:
+                data = self._map(segment_id, self._sizes[segment_id])
+                has_older = any(other < segment_id for other in self._sizes)
+                carried = 0
+                for offset, length, flags, key, value_offset in self._records(segment_id):
+                    if flags & TOMBSTONE:
+                        # Still needed while an older segment may hold the deleted value
+                        if has_older and key not in self._index:
+                            carried += self._append(key, b"", TOMBSTONE)[2]
+                    elif self._index.get(key) == (segment_id, offset, length):
+                        value = data[value_offset:offset + length]
+                        self._index[key] = location = self._append(key, value)
+                        self._live[location[0]] += location[2]
+                garbage = self._sizes.pop(segment_id) - self._live.pop(segment_id) - carried
+                self._maps.pop(segment_id).close()
+                os.remove(self._path(segment_id))
+                self._compactions += 1
+                self._reclaimed_bytes += garbage
+                reclaimed += garbage
+        if candidates:
+            logger.info(f"Compacted {len(candidates)} cold checkpoint segments, reclaimed {reclaimed} bytes")
+        return reclaimed
+
+    def _compact_loop(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Cold checkpoint compaction failed: {str(e)}")
+
+    def start_compactor(self, interval: float = 300.0) -> None:
+        """Run compact() every `interval` seconds in a daemon thread."""
+        if self._compactor is None:
+            self._compactor = threading.Thread(
+                target=self._compact_loop, args=(interval,), name="checkpoint-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the cold store for monitoring."""
+        with self._lock:
+            total = sum(self._sizes.values())
+            live = sum(self._live.values())
+            return {
+                "threads": len(self._index),
+                "segments": len(self._sizes),
+                "disk_bytes": total,
+                "live_bytes": live,
+                "garbage_ratio": round(1 - live / total, 4) if total else 0.0,
+                "compactions": self._compactions,
+                "reclaimed_bytes": self._reclaimed_bytes
+            }
+
+    def close(self) -> None:
+        """Stop the compactor and release the files and the directory lock."""
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            if self._active_fd is not None:
+                os.close(self._active_fd)
+                self._active_fd = None
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+
+
+__all__ = ["SegmentStore"]
@@ -0,0 +1,409 @@
+"""
+Compact checkpoint serialization: msgpack + zstd with a trained dictionary.
+
+Checkpoint channel values are small msgpack documents with a lot of shared
+structure (field names, URLs, step names, the JSX form markup in
+assistant_message), which general-purpose compression can't exploit on
+payloads this short. CompactSerializer msgpack-encodes like LangGraph's
+JsonPlusSerializer and then zstd-compresses with a dictionary trained on
+sample conversation states, keeping the uncompressed form whenever
+compression doesn't pay off.
+
+Before a checkpoint is stored, diagnostic-only channels are capped
+(DIAGNOSTIC_CHANNEL_LIMITS): they are never read back, because every message
+passes the full ConversationState as graph input.
+
+The dictionary id is part of the stored type tag, so a payload can only be
+decoded with the dictionary it was written with. Dictionaries are therefore
+shipped as versioned files (dictionaries/checkpoint-vN.zdict) rather than
+retrained at startup, where any change to sample_states() would change the id
+and orphan every stored checkpoint. The newest shipped dictionary (or
+CHECKPOINT_ZSTD_DICT_PATH when set) encodes; every shipped dictionary can
+still decode. A payload written with a dictionary that isn't loaded raises
+UnknownDictionaryError, which the checkpointers treat as a cache miss.
+
+To change the dictionary, add the next version instead of replacing a file:
+
+    python -m src.checkpointing.serde train --output src/checkpointing/dictionaries/checkpoint-v2.zdict
+"""
+import os
+import re
+import time
+import random
+import logging
+import argparse
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import zstandard
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from ..models.schemas import ConversationState
+
+logger = logging.getLogger(__name__)
+
+ZSTD_TAG = "+zstd:"
+MIN_COMPRESS_BYTES = 64
+DEFAULT_DICT_SIZE = 16 * 1024
+DICTIONARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dictionaries")
+DICTIONARY_FILE_RE = re.compile(r"^checkpoint-v(\d+)\.zdict$")
+
+# Caps for diagnostic-only channels: lists keep their last N items, strings
+# their first N characters, None drops the value
+DIAGNOSTIC_CHANNEL_LIMITS: Dict[str, Optional[int]] = {
+    "processing_steps": 20,
+    "intent_reasoning": 300,
+    "token_usage": None
+}
+
+
+def compact_channel_value(channel: str, value: Any) -> Any:
+    """Apply DIAGNOSTIC_CHANNEL_LIMITS to one channel value (None = drop)."""
+    if channel not in DIAGNOSTIC_CHANNEL_LIMITS:
+        return value
+    limit = DIAGNOSTIC_CHANNEL_LIMITS[channel]
+    if limit is None:
+        return None
+    if isinstance(value, list) and len(value) > limit:
+        return value[-limit:]
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit]
+    return value
+
+
+def compact_channel_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a checkpoint's channel values with diagnostic-only channels capped or dropped."""
+    compacted = {}
+    for channel, value in values.items():
+        value = compact_channel_value(channel, value)
+        if value is not None:
+            compacted[channel] = value
+    return compacted
+
+
+class UnknownDictionaryError(ValueError):
+    """A payload was compressed with a zstd dictionary that isn't loaded."""
+
+
+class CompactSerializer(JsonPlusSerializer):
+    """
+    JsonPlusSerializer whose msgpack payloads are zstd-compressed.
+
+    Args:
+        dictionary: Trained zstd dictionary used to encode (plain zstd if None)
+        level: zstd compression level
+        previous_dictionaries: Older dictionaries that payloads may still be
+            compressed with (decode only)
+    """
+
+    def __init__(
+        self,
+        dictionary: Optional[zstandard.ZstdCompressionDict] = None,
+        level: int = 3,
+        previous_dictionaries: Sequence[zstandard.ZstdCompressionDict] = ()
+    ):
+        super().__init__()
+        self.dictionary = dictionary
+        self.dict_id = dictionary.dict_id() if dictionary is not None else 0
+        self.level = level
+        self._dictionaries: Dict[int, Optional[zstandard.ZstdCompressionDict]] = {
+            d.dict_id(): d for d in previous_dictionaries
+        }
+        self._dictionaries[self.dict_id] = dictionary
+        # zstd contexts are not thread-safe; keep them per thread
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._encoded = self._decoded = 0
+        self._raw_bytes = self._stored_bytes = 0
+        self._encode_seconds = self._decode_seconds = 0.0
+
+    def _compressor(self) -> zstandard.ZstdCompressor:
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self.dictionary)
+        return compressor
+
+    def _decompressor(self, dict_id: int) -> zstandard.ZstdDecompressor:
+        decompressors = getattr(self._local, "decompressors", None)
+        if decompressors is None:
+            decompressors = self._local.decompressors = {}
+        if dict_id not in decompressors:
+            decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=self._dictionaries[dict_id])
+        return decompressors[dict_id]
+
+    @property
+    def dictionary_ids(self) -> List[int]:
+        """Ids of every dictionary payloads can be decoded with."""
+        return sorted(self._dictionaries)
+
+    def ensure_readable(self, type_: str) -> None:
+        """
+        Check that a payload with this type tag can be decoded.
+
+        Raises:
+            UnknownDictionaryError: If it was compressed with a dictionary that isn't loaded
+        """
+        if ZSTD_TAG in type_:
+            dict_id = int(type_.partition(ZSTD_TAG)[2])
+            if dict_id not in self._dictionaries:
+                raise UnknownDictionaryError(
+                    f"Checkpoint was compressed with zstd dictionary {dict_id}, "
+                    f"but only dictionaries {self.dictionary_ids} are loaded"
+                )
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        start = time.perf_counter()
+        type_, data = super().dumps_typed(obj)
+        stored = data
+        if type_ == "msgpack" and len(data) >= MIN_COMPRESS_BYTES:
+            compressed = self._compressor().compress(data)
+            if len(compressed) < len(data):
+                type_, stored = f"msgpack{ZSTD_TAG}{self.dict_id}", compressed
+        with self._stats_lock:
+            self._encoded += 1
+            self._raw_bytes += len(data)
+            self._stored_bytes += len(stored)
+            self._encode_seconds += time.perf_counter() - start
+        return type_, stored
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        start = time.perf_counter()
+        type_, payload = data
+        if ZSTD_TAG in type_:
+            self.ensure_readable(type_)
+            type_, _, dict_id = type_.partition(ZSTD_TAG)
+            payload = self._decompressor(int(dict_id)).decompress(payload)
+        value = super().loads_typed((type_, payload))
+        with self._stats_lock:
+            self._decoded += 1
+            self._decode_seconds += time.perf_counter() - start
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Compression ratio and average encode/decode time for monitoring."""
+        with self._stats_lock:
+            return {
+                "dictionary_id": self.dict_id,
+                "decodable_dictionary_ids": self.dictionary_ids,
+                "encoded": self._encoded,
+                "decoded": self._decoded,
+                "raw_bytes": self._raw_bytes,
+                "stored_bytes": self._stored_bytes,
+                "compression_ratio": round(self._raw_bytes / self._stored_bytes, 2) if self._stored_bytes else 0.0,
+                "avg_encode_us": round(self._encode_seconds / self._encoded * 1e6, 1) if self._encoded else 0.0,
+                "avg_decode_us": round(self._decode_seconds / self._decoded * 1e6, 1) if self._decoded else 0.0
+            }
+
+
+# Sample conversation content for dictionary training
+
+_NAMES = ["Sarah Johnson", "Mike Chen", "Allie Davis", "Robert Garcia", "Priya Patel", "James Wilson"]
+_DEALERS = ["smithmotors", "bayareahonda", "premierford", "sunsettoyota", "metrochevy"]
+_VEHICLES = [("Honda", "CR-V"), ("Toyota", "RAV4"), ("Ford", "F-150"), ("Tesla", "Model Y"), ("Chevrolet", "Tahoe")]
+_STEPS = [
+    "intent_detected: 2", "sticky_workflow: 2", "local_extraction: ['user_phone']",
+    "extraction_prompt_pruned: ~378 tokens saved", "data_extracted: ['shopper_name', 'user_phone']",
+    "data_normalized: ['user_phone']", "data_validated_against_prd", "prd_validation_failed",
+    "no_relevant_data_found", "response_generated", "ui_component_generated: render_input",
+    "structured_extraction_retried: gemini-2.5-flash-lite", "ready_for_xano_submission"
+]
+
+
+def sample_states(count: int = 300, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Deterministic, representative ConversationState dumps for dictionary training.
+
+    Args:
+        count: Number of states
+        seed: Random seed (the same seed always gives the same states)
+
+    Returns:
+        ConversationState.model_dump() dictionaries
+    """
+    from ..config.field_specifications import FIELD_SPECIFICATIONS, WORKFLOW_SPEC_KEYS
+    from ..utils.ui_catalog import get_ui_catalog
+
+    rng = random.Random(seed)
+    catalog = get_ui_catalog()
+    states = []
+    for index in range(count):
+        workflow_id = rng.choice([1, 2, 2, 3])
+        name, dealer = rng.choice(_NAMES), rng.choice(_DEALERS)
+        make, model = rng.choice(_VEHICLES)
+        data: Dict[str, Any] = {}
+        current_field = None
+        assistant_message = f"Thanks! I can help with that, {name.split()[0]}."
+        if workflow_id in WORKFLOW_SPEC_KEYS:
+            fields = list(FIELD_SPECIFICATIONS[WORKFLOW_SPEC_KEYS[workflow_id]]["field_types"])
+            candidates = {
+                "dealershipwebsite_url": f"https://www.{dealer}.com",
+                "vehicledetailspage_urls": [
+                    f"https://www.{dealer}.com/inventory/used-{rng.randint(2015, 2025)}-{make.lower()}-{model.lower()}-{rng.randint(10000, 99999)}"
+                    for _ in range(rng.randint(1, 3))
+                ],
+                "shopper_name": name,
+                "user_name": rng.choice(_NAMES),
+                "user_phone": f"+1555{rng.randint(1000000, 9999999)}",
+                "user_email": f"{name.split()[0].lower()}@{dealer}.com",
+                "gender_descriptor": rng.choice(["man", "woman"]),
+                "age_descriptor": rng.choice(["30s", "40s", "50s"]),
+                "shopper_notes": f"Lives in the suburbs, two kids, commutes {rng.randint(10, 60)} miles a day",
+                "vehiclesearchpreference": [{
+                    "make": make, "model": model, "year_min": rng.randint(2015, 2022),
+                    "price_max": float(rng.randint(20, 60) * 1000), "condition": [rng.choice(["New", "Used", "Certified"])]
+                }]
+            }
+            collected = rng.sample(fields, rng.randint(0, len(fields)))
+            data = {field: candidates[field] for field in collected if field in candidates}
+            missing = [field for field in fields if field not in data]
+            current_field = missing[0] if missing else None
+            jsx = catalog.render(workflow_id, current_field, data) if current_field else None
+            if jsx:
+                assistant_message += f"\n\n[UI_COMPONENT_START]\n{jsx}\n[UI_COMPONENT_END]"
+        state = ConversationState(
+            user_query=f"my customer {name} wants a {make} {model} under {rng.randint(20, 60)}k",
+            conversation_id=1000 + index,
+            workflow_id=workflow_id,
+            intent_confidence=round(rng.uniform(0.6, 1.0), 2),
+            collected_data=data,
+            completed_fields=list(data),
+            newly_collected_fields=list(data)[:2],
+            current_field=current_field,
+            assistant_message=assistant_message,
+            processing_steps=rng.sample(_STEPS, rng.randint(3, 8)),
+            llm_model_used=rng.choice(["gpt-4o-mini", "gemini-2.5-flash"])
+        )
+        states.append(state.model_dump())
+    return states
+
+
+def train_checkpoint_dictionary(
+    states: List[Dict[str, Any]],
+    size: int = DEFAULT_DICT_SIZE
+) -> zstandard.ZstdCompressionDict:
+    """
+    Train a zstd dictionary on the channel values of sample states.
+
+    Values are compacted and msgpack-encoded exactly as the checkpointer stores
+    them, one sample per channel value.
+
+    Args:
+        states: ConversationState dictionaries (see sample_states())
+        size: Dictionary size in bytes
+
+    Returns:
+        Trained dictionary
+    """
+    serde = JsonPlusSerializer()
+    samples = []
+    for state in states:
+        for value in compact_channel_values(state).values():
+            type_, data = serde.dumps_typed(value)
+            if type_ == "msgpack" and len(data) >= MIN_COMPRESS_BYTES:
+                samples.append(data)
+    return zstandard.train_dictionary(size, samples, threads=1)
+
+
+def shipped_dictionary_paths(directory: str = DICTIONARY_DIR) -> List[str]:
+    """Paths of the shipped checkpoint-vN.zdict files, oldest version first."""
+    if not os.path.isdir(directory):
+        return []
+    versions = [
+        (int(match.group(1)), name)
+        for name in os.listdir(directory) if (match := DICTIONARY_FILE_RE.match(name))
+    ]
+    return [os.path.join(directory, name) for _, name in sorted(versions)]
+
+
+def read_dictionary(path: str) -> zstandard.ZstdCompressionDict:
+    """Load a zstd dictionary file."""
+    with open(path, "rb") as f:
+        return zstandard.ZstdCompressionDict(f.read())
+
+
+def load_shipped_dictionaries(directory: str = DICTIONARY_DIR) -> List[zstandard.ZstdCompressionDict]:
+    """Every shipped dictionary, oldest version first (all of them stay decodable)."""
+    return [read_dictionary(path) for path in shipped_dictionary_paths(directory)]
+
+
+def load_or_train_dictionary(path: Optional[str] = None) -> zstandard.ZstdCompressionDict:
+    """
+    Load the dictionary checkpoints are encoded with.
+
+    Without `path` this is the newest shipped dictionary, so the dictionary
+    id only changes when a new version is added. With `path`, the file is
+    loaded, or trained from sample_states() and written there if missing so
+    later processes load the same one.
+
+    Raises:
+        FileNotFoundError: If no `path` is given and no dictionary is shipped
+    """
+    if path is None:
+        paths = shipped_dictionary_paths()
+        if not paths:
+            raise FileNotFoundError(f"No checkpoint-vN.zdict dictionary in {DICTIONARY_DIR}")
+        dictionary = read_dictionary(paths[-1])
+        logger.info(f"Loaded checkpoint zstd dictionary {dictionary.dict_id()} from {paths[-1]}")
+        return dictionary
+    if os.path.exists(path):
+        dictionary = read_dictionary(path)
+        logger.info(f"Loaded checkpoint zstd dictionary {dictionary.dict_id()} from {path}")
+        return dictionary
+    start = time.perf_counter()
+    dictionary = train_checkpoint_dictionary(sample_states())
+    logger.info(
+        f"Trained checkpoint zstd dictionary {dictionary.dict_id()} "
+        f"({len(dictionary.as_bytes())} bytes, {(time.perf_counter() - start) * 1000:.0f}ms)"
+    )
+    write_dictionary(dictionary, path)
+    return dictionary
+
+
+def write_dictionary(dictionary: zstandard.ZstdCompressionDict, path: str) -> None:
+    """Atomically write a dictionary file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dictionary.as_bytes())
+    os.replace(tmp_path, path)
+
+
+def _train_command(args: argparse.Namespace) -> None:
+    if os.path.exists(args.output):
+        raise SystemExit(f"{args.output} exists; add a new checkpoint-vN.zdict version instead of replacing it")
+    dictionary = train_checkpoint_dictionary(sample_states(args.samples, args.seed), args.size)
+    write_dictionary(dictionary, args.output)
+    print(f"Saved dictionary {dictionary.dict_id()} to {args.output} ({len(dictionary.as_bytes())} bytes)")
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Train a checkpoint zstd dictionary from sample states.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train = subparsers.add_parser("train", help="Train a dictionary on sample_states()")
+    train.add_argument("--output", required=True, help="Dictionary file to write (must not exist)")
+    train.add_argument("--samples", type=int, default=300, help="Number of sample states")
+    train.add_argument("--seed", type=int, default=0)
+    train.add_argument("--size", type=int, default=DEFAULT_DICT_SIZE, help="Dictionary size in bytes")
+    train.set_defaults(func=_train_command)
+
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    args.func(args)
+
+
+__all__ = [
+    "DIAGNOSTIC_CHANNEL_LIMITS",
+    "compact_channel_value",
+    "compact_channel_values",
+    "UnknownDictionaryError",
+    "CompactSerializer",
+    "sample_states",
+    "train_checkpoint_dictionary",
+    "shipped_dictionary_paths",
+    "load_shipped_dictionaries",
+    "load_or_train_dictionary"
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,12 @@ This module defines the exact field requirements for each workflow type
 to ensure data consistency when sending to Xano API.
 """
 
+# Workflow ID -> FIELD_SPECIFICATIONS key
+WORKFLOW_SPEC_KEYS = {
+    2: "shopper_showroom",
+    3: "personal_showroom"
+}
+
 FIELD_SPECIFICATIONS = {
     "shopper_showroom": {
         "required_fields": [
@@ -92,4 +98,70 @@ VEHICLE_SEARCH_PREFERENCE_SCHEMA = {
     "miles_max": {"type": "integer", "required": False},
     "condition": {"type": "array", "required": False, "allowed_values": ["New", "Used", "Certified"]},
     "body_style": {"type": "string", "required": False}
-}
\ No newline at end of file
+}
+# Per-field extraction rules and examples, used by the pruned extraction prompt
+# so only the fields still in play carry their instructions
+FIELD_EXTRACTION_HINTS = {
+    "dealershipwebsite_url": {
+        "rules": ["Use the dealership's home page URL, including https://"],
+        "example": ("our site is https://abcmotors.com", {"dealershipwebsite_url": "https://abcmotors.com"})
+    },
+    "vehicledetailspage_urls": {
+        "rules": ["Collect every vehicle detail page URL in the message, in order"],
+        "example": (
+            "The vehicle pages are https://dealer.com/bmw-x3-2023 and https://dealer.com/mercedes-c-class-2022",
+            {"vehicledetailspage_urls": ["https://dealer.com/bmw-x3-2023", "https://dealer.com/mercedes-c-class-2022"]}
+        )
+    },
+    "shopper_name": {
+        "rules": ["The person the showroom is for, not the salesperson"],
+        "example": ("I want to create a shopper drift for allie davis", {"shopper_name": "allie davis"})
+    },
+    "user_name": {
+        "rules": ["The salesperson's own name"],
+        "example": ("I'm Mike Jones", {"user_name": "Mike Jones"})
+    },
+    "user_phone": {
+        "rules": ["Keep the digits exactly as given"],
+        "example": ("you can reach me at 555-123-4567", {"user_phone": "555-123-4567"})
+    },
+    "user_email": {
+        "rules": [],
+        "example": ("email is mike@abcmotors.com", {"user_email": "mike@abcmotors.com"})
+    },
+    "vehiclesearchpreference": {
+        "rules": [
+            "Create separate objects for each vehicle mentioned",
+            'Convert "under 40k" → `price_max: 40000`',
+            'Convert "below 10k miles" → `miles_max: 10000`'
+        ],
+        "example": (
+            "wants either a blue mercedes c-class sedan or BMW x3 under 40k, 2022 or 2023",
+            {"vehiclesearchpreference": [
+                {"make": "Mercedes", "model": "C-Class", "body_style": "sedan", "exterior_color": ["blue"],
+                 "price_max": 40000, "year_min": 2022, "year_max": 2023},
+                {"make": "BMW", "model": "X3", "price_max": 40000, "year_min": 2022, "year_max": 2023}
+            ]}
+        )
+    },
+    "gender_descriptor": {
+        "rules": [
+            '"him" or "he" or "his" → "man"',
+            '"her" or "she" or "hers" → "woman"',
+            "Infer from pronouns used to describe the shopper (lowercase only)"
+        ],
+        "example": ("she likes SUVs", {"gender_descriptor": "woman"})
+    },
+    "age_descriptor": {
+        "rules": [
+            '"mid-20\'s" or "20\'s" → "20s"',
+            '"early 30s" or "30\'s" → "30s"',
+            'One of "20s", "30s", "40s", "50s", "60s", "70s", "80s"'
+        ],
+        "example": ("she's mid-20's in age", {"age_descriptor": "20s"})
+    },
+    "shopper_notes": {
+        "rules": ["Combine lifestyle, interests and family details into one note"],
+        "example": ("likes her 2 kids and dog", {"shopper_notes": "allie davis has 2 kids and dog"})
+    }
+}
@@ -0,0 +1,61 @@
+"""
+Keyword patterns for salesperson intent signals.
+
+All groups are compiled into one shared PatternMatcher (SIGNAL_MATCHER), so
+intent detection and the workflow nodes scan a message once for every
+keyword check.
+"""
+from ..utils.pattern_matcher import PatternMatcher
+
+# Customer reference patterns (strong signal for Workflow 2)
+CUSTOMER_PATTERNS = [
+    "my customer", "my client", "customer wants", "customer needs",
+    "customer is looking", "client is looking", "for my customer",
+    "customer who", "client who", "customer named", "client named",
+    "create a showroom for", "build a showroom for", "showroom for",
+    "shopper showroom", "customer showroom"
+]
+
+# Personal showroom patterns (strong signal for Workflow 3)
+PERSONAL_PATTERNS = [
+    "my showroom", "my personal", "my favorite vehicles",
+    "my top picks", "my vehicle showcase", "my own showroom",
+    "personal showcase", "my preferred vehicles", "personal showroom"
+]
+
+# General/support patterns (signal for Workflow 1)
+SUPPORT_PATTERNS = [
+    "how does", "how do i", "what is", "what are", "help me understand",
+    "can you explain", "i need help", "technical issue", "problem with"
+]
+
+# Requests to go ahead with showroom creation
+PROCEED_KEYWORDS = ["proceed", "create", "let's do it", "go ahead", "yes", "ready", "start", "build"]
+
+# Explicit requests to leave or change the current flow; these always go
+# back through intent detection instead of the sticky fast path
+SWITCH_PATTERNS = [
+    "switch to", "switch over", "change to", "instead", "nevermind", "never mind",
+    "cancel", "forget it", "forget that", "forget about", "start over", "new question",
+    "different question", "something else", "stop this", "go back", "not anymore"
+]
+
+# Pattern group -> workflow it signals
+GROUP_WORKFLOWS = {
+    "customer": 2,
+    "personal": 3,
+    "support": 1
+}
+
+SIGNAL_MATCHER = PatternMatcher(
+    [(p, "customer") for p in CUSTOMER_PATTERNS]
+    + [(p, "personal") for p in PERSONAL_PATTERNS]
+    + [(p, "support") for p in SUPPORT_PATTERNS]
+    + [(p, "proceed") for p in PROCEED_KEYWORDS]
+    + [(p, "switch") for p in SWITCH_PATTERNS]
+)
+
+__all__ = [
+    "CUSTOMER_PATTERNS", "PERSONAL_PATTERNS", "SUPPORT_PATTERNS", "PROCEED_KEYWORDS", "SWITCH_PATTERNS",
+    "GROUP_WORKFLOWS", "SIGNAL_MATCHER"
+]
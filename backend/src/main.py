@@ -6,10 +6,11 @@ It processes chat requests using LangGraph and calls back to Xano's data collect
 """
 
 import os
+import uuid
 import logging
 import asyncio
 from contextlib import asynccontextmanager
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -20,7 +21,16 @@ from dotenv import load_dotenv
 import json
 
 from .workflows.chat_workflow import create_chat_workflow
-from .models.schemas import ChatRequest, ChatResponse, HealthResponse, N8nWebhookResponse
+from .checkpointing import flush_checkpointer, close_checkpointer, checkpointer_stats
+from .checkpointing import message_hash, get_event_log, close_event_log, event_log_stats
+from .utils.ui_catalog import get_ui_catalog
+from .utils.llm_clients import init_llm_clients, close_llm_clients
+from .utils.intent_classifier import load_intent_classifier
+from .utils.token_accounting import MODEL_PRICING, log_token_usage
+from .workflows.intent_detection import get_intent_cache, get_similarity_index
+from .prompts import get_prompt_registry
+from .workflows.streaming import extract_text_delta, node_update_events, UI_COMPONENT_START
+from .models.schemas import ChatRequest, ChatResponse, HealthResponse, N8nWebhookResponse, ConversationState
 
 # Configure logging
 logging.basicConfig(
@@ -48,9 +58,23 @@ async def lifespan(app: FastAPI):
     # Create HTTP session for external API calls
     http_session = aiohttp.ClientSession()
     
+    # Shared, pooled LLM clients for all workflow nodes
+    init_llm_clients()
+    
     # Initialize LangGraph workflow
     chat_workflow = create_chat_workflow()
     
+    # Precompute the field -> UI component catalog
+    get_ui_catalog()
+    
+    # Local intent classifier (optional, INTENT_CLASSIFIER_PATH)
+    load_intent_classifier()
+    
+    # Load the tokenizers and count the prompt prefixes now, in a worker thread,
+    # instead of on the event loop during the first request
+    warmed = await asyncio.to_thread(get_prompt_registry().warm, MODEL_PRICING)
+    logger.info(f"Prompt registry warmed: {warmed} templates")
+    
     logger.info("LangGraph Drift service started successfully")
     
     yield
@@ -61,6 +85,12 @@ async def lifespan(app: FastAPI):
     if http_session:
         await http_session.close()
     
+    await close_llm_clients()
+    
+    # Persist any buffered checkpoints before the worker exits
+    await close_checkpointer()
+    close_event_log()
+    
     logger.info("LangGraph Drift service shut down successfully")
 
 
@@ -92,6 +122,92 @@ async def health_check():
     )
 
 
+@app.get("/stats")
+async def stats():
+    """Runtime cache statistics and prompt template versions for monitoring."""
+    similarity_index = get_similarity_index()
+    return {
+        "intent_cache": get_intent_cache().stats(),
+        "intent_similarity": similarity_index.stats() if similarity_index else None,
+        "prompt_versions": get_prompt_registry().versions(),
+        "checkpointer": checkpointer_stats(),
+        "event_log": event_log_stats()
+    }
+
+
+def build_initial_state(request: ChatRequest) -> ConversationState:
+    """
+    Build the initial LangGraph state for a chat request from Xano.
+    
+    Args:
+        request: Chat request data from Xano
+        
+    Returns:
+        ConversationState to feed into the workflow
+    """
+    return ConversationState(
+        user_query=request.user_query,
+        conversation_id=request.conversation_id,
+        user_id=request.user_id,
+        session_id=request.session_id,
+        visitor_ip=request.visitor_ip_address,
+        workflow_id=request.workflow_id or 1,
+        workflow_status=request.workflow_status or "active",
+        current_field=request.next_field,
+        completed_fields=request.collected_fields or [],
+        # CRITICAL: collected_data starts empty - we only collect NEW data from this message
+        collected_data={}
+    )
+
+
+def build_thread_config(request: ChatRequest) -> Dict[str, Any]:
+    """
+    Build the LangGraph run config (thread_id for the checkpointer).
+    
+    Requests without a conversation_id get a thread of their own instead of
+    all sharing one ever-growing "conversation_new" thread. Requests with one
+    also carry the hash of their initial state, which keys the node event log
+    so a retried message replays finished nodes.
+    """
+    if not request.conversation_id:
+        return {"configurable": {"thread_id": f"anonymous_{uuid.uuid4().hex}"}}
+    return {
+        "configurable": {
+            "thread_id": f"conversation_{request.conversation_id}",
+            "message_hash": message_hash(build_initial_state(request).model_dump())
+        }
+    }
+
+
+def build_webhook_data(conversation_id: int, workflow_state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the payload for Xano's data collection webhook.
+    
+    Args:
+        conversation_id: Xano conversation ID
+        workflow_state: Final workflow state returned by the graph
+        
+    Returns:
+        Dictionary matching what n8n was sending to Xano
+    """
+    return {
+        "conversation_id": conversation_id,
+        "newly_collected_data": workflow_state.get("newly_collected_fields", []),  # Array of field names
+        "collected_data": workflow_state.get("collected_data", {}),
+        "next_field": workflow_state.get("current_field"),
+        "workflow_id": workflow_state.get("workflow_id", 1),
+        "workflow_status": workflow_state.get("workflow_status", "active"),
+        "role": "assistant",
+        "content": workflow_state.get("assistant_message", "")
+    }
+
+
+def format_sse(event: str, data: Any, event_id: str) -> str:
+    """Format a single server-sent event."""
+    payload = data if isinstance(data, str) else json.dumps(data)
+    return f"event: {event}\ndata: {payload}\nid: {event_id}\n\n"
+
+
 @app.post("/webhook/chat")
 async def process_chat_request(request: ChatRequest):
     """
@@ -113,32 +229,16 @@ async def process_chat_request(request: ChatRequest):
         logger.info(f"Incoming request data: {request.model_dump()}")
         
         # Initialize the conversation state with data from Xano
-        from .models.schemas import ConversationState
-        
-        initial_state = ConversationState(
-            user_query=request.user_query,
-            conversation_id=request.conversation_id,
-            user_id=request.user_id,
-            session_id=request.session_id,
-            visitor_ip=request.visitor_ip_address,
-            workflow_id=request.workflow_id or 1,
-            workflow_status=request.workflow_status or "active",
-            current_field=request.next_field,
-            completed_fields=request.collected_fields or [],
-            # CRITICAL: collected_data starts empty - we only collect NEW data from this message
-            collected_data={}
-        )
+        initial_state = build_initial_state(request)
         
         # Run LangGraph workflow with thread_id for checkpointer
-        config = {
-            "configurable": {
-                "thread_id": f"conversation_{request.conversation_id or 'new'}"
-            }
-        }
+        config = build_thread_config(request)
         result = await chat_workflow.ainvoke(initial_state.model_dump(), config)
+        await flush_checkpointer()
         
         # Extract workflow state from result
         workflow_state = result
+        log_token_usage(workflow_state.get("token_usage", {}), f"conversation {request.conversation_id}")
         
         # Build n8n-compatible response body
         response_body = N8nWebhookResponse(
@@ -158,19 +258,10 @@ async def process_chat_request(request: ChatRequest):
             newly_collected = workflow_state.get("newly_collected_fields", [])
             
             # n8n sends field names as an array, not the values
-            webhook_data = {
-                "conversation_id": request.conversation_id,
-                "newly_collected_data": newly_collected,  # Array of field names
-                "collected_data": workflow_state.get("collected_data", {}),
-                "next_field": workflow_state.get("current_field"),
-                "workflow_id": workflow_state.get("workflow_id", 1),
-                "workflow_status": workflow_state.get("workflow_status", "active"),
-                "role": "assistant",
-                "content": workflow_state.get("assistant_message", "")
-            }
+            webhook_data = build_webhook_data(request.conversation_id, workflow_state)
             
             # Call the webhook asynchronously
-            asyncio.create_task(call_xano_data_webhook(webhook_data))
+            asyncio.create_task(call_xano_data_webhook(webhook_data, config))
             logger.info(f"Scheduled data collection webhook call for conversation {request.conversation_id} with newly_collected: {newly_collected}")
         
         # Return in the exact format Xano expects (matching n8n webhook response)
@@ -189,7 +280,7 @@ async def process_chat_request(request: ChatRequest):
         )
 
 
-async def call_xano_data_webhook(webhook_data: Dict[str, Any]) -> None:
+async def call_xano_data_webhook(webhook_data: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> None:
     """
     Call Xano's data collection webhook with processed data.
     
@@ -198,6 +289,8 @@ async def call_xano_data_webhook(webhook_data: Dict[str, Any]) -> None:
     
     Args:
         webhook_data: Dictionary containing all data n8n was sending to Xano
+        config: Run config of the message; once delivered, the message is
+            committed in the node event log so it is no longer replayed
     """
     # Use the hardcoded URL like n8n was doing
     webhook_url = "https://api.autosnap.cloud/api:owKhF9pX/webhook/data_collection_n8n"
@@ -218,6 +311,7 @@ async def call_xano_data_webhook(webhook_data: Dict[str, Any]) -> None:
             if response.status == 200:
                 response_data = await response.json()
                 logger.info(f"Successfully called Xano webhook: {response_data}")
+                await commit_message(config)
             else:
                 error_text = await response.text()
                 logger.error(f"Xano webhook call failed with status {response.status}: {error_text}")
@@ -227,6 +321,18 @@ async def call_xano_data_webhook(webhook_data: Dict[str, Any]) -> None:
         # Don't raise here as this is a side effect, not critical to main flow
 
 
+async def commit_message(config: Optional[Dict[str, Any]]) -> None:
+    """Commit a delivered message in the node event log (no-op without a message hash)."""
+    configurable = (config or {}).get("configurable", {})
+    log = get_event_log()
+    if log is None or "message_hash" not in configurable:
+        return
+    try:
+        await asyncio.to_thread(log.commit, configurable["thread_id"], configurable["message_hash"])
+    except Exception as e:
+        logger.error(f"Failed to commit message in the event log: {str(e)}")
+
+
 @app.post("/webhook/chat/stream")
 async def process_chat_stream(request: ChatRequest):
     """
@@ -242,37 +348,44 @@ async def process_chat_stream(request: ChatRequest):
         StreamingResponse: Server-sent events stream
     """
     async def generate():
+        event_id = f"{request.conversation_id}-{request.session_id}"
         try:
             logger.info(f"Processing streaming chat request for query: {request.user_query[:100]}...")
             
             # Initialize the conversation state
-            from .models.schemas import ConversationState
-            
-            initial_state = ConversationState(
-                user_query=request.user_query,
-                conversation_id=request.conversation_id,
-                user_id=request.user_id,
-                session_id=request.session_id,
-                visitor_ip=request.visitor_ip_address,
-                workflow_id=request.workflow_id or 1,
-                workflow_status=request.workflow_status or "active",
-                current_field=request.next_field,
-                completed_fields=request.collected_fields or [],
-                collected_data={}
-            )
+            initial_state = build_initial_state(request)
+            config = build_thread_config(request)
             
-            # Run LangGraph workflow
-            config = {
-                "configurable": {
-                    "thread_id": f"conversation_{request.conversation_id or 'new'}"
-                }
-            }
-            result = await chat_workflow.ainvoke(initial_state.model_dump(), config)
+            # Drive the graph in streaming mode: "messages" yields LLM tokens as they
+            # are generated, "updates" yields each node's output as soon as it
+            # finishes, "custom" carries events emitted by nodes and "values"
+            # yields the full state after each step
+            workflow_state: Dict[str, Any] = {}
+            async for mode, chunk in chat_workflow.astream(
+                initial_state.model_dump(),
+                config,
+                stream_mode=["messages", "updates", "custom", "values"]
+            ):
+                if mode == "messages":
+                    message_chunk, metadata = chunk
+                    delta = extract_text_delta(message_chunk, metadata)
+                    if delta:
+                        yield format_sse("delta", {"content": delta}, event_id)
+                elif mode == "updates":
+                    # Progressive per-node events: intent -> fields
+                    for node, update in chunk.items():
+                        for event, data in node_update_events(node, update):
+                            yield format_sse(event, data, event_id)
+                elif mode == "custom":
+                    # Events emitted by the workflow nodes themselves: text -> ui
+                    yield format_sse(chunk["event"], chunk["data"], event_id)
+                elif mode == "values":
+                    workflow_state = chunk if isinstance(chunk, dict) else chunk.model_dump()
             
-            # Extract workflow state
-            workflow_state = result
+            await flush_checkpointer()
+            log_token_usage(workflow_state.get("token_usage", {}), f"conversation {request.conversation_id}")
             
-            # Stream the response with metadata
+            # Final metadata event with the complete message closes the stream
             response_data = {
                 "role": "assistant",
                 "content": workflow_state.get("assistant_message", ""),
@@ -283,28 +396,19 @@ async def process_chat_stream(request: ChatRequest):
                 "next_field": workflow_state.get("current_field"),
                 "conversation_id": request.conversation_id,
                 "session_id": request.session_id,
-                "has_ui": "[UI_COMPONENT_START]" in workflow_state.get("assistant_message", "")
+                "has_ui": UI_COMPONENT_START in workflow_state.get("assistant_message", "")
             }
             
             # Send as SSE event with event type for better parsing
-            yield f"event: message\ndata: {json.dumps(response_data)}\nid: {request.conversation_id}-{request.session_id}\n\n"
+            yield format_sse("message", response_data, event_id)
             
             # Final event to signal completion
-            yield f"event: done\ndata: [DONE]\nid: {request.conversation_id}-{request.session_id}\n\n"
+            yield format_sse("done", "[DONE]", event_id)
             
             # Call Xano webhook after streaming completes
             if request.conversation_id:
-                webhook_data = {
-                    "conversation_id": request.conversation_id,
-                    "newly_collected_data": workflow_state.get("newly_collected_fields", []),
-                    "collected_data": workflow_state.get("collected_data", {}),
-                    "next_field": workflow_state.get("current_field"),
-                    "workflow_id": workflow_state.get("workflow_id", 1),
-                    "workflow_status": workflow_state.get("workflow_status", "active"),
-                    "role": "assistant",
-                    "content": workflow_state.get("assistant_message", "")
-                }
-                asyncio.create_task(call_xano_data_webhook(webhook_data))
+                webhook_data = build_webhook_data(request.conversation_id, workflow_state)
+                asyncio.create_task(call_xano_data_webhook(webhook_data, config))
                 
         except Exception as e:
             logger.error(f"Error in streaming chat: {str(e)}")
@@ -0,0 +1,218 @@
+"""
+Deterministic repair of collected data before PRD validation.
+
+The validation models reject a whole payload for small, recoverable issues
+("www.dealer.com" without a scheme, gender_descriptor "she", age_descriptor
+"mid-30s", condition "used"). normalize_collected_data() coerces such values
+into the PRD formats and reports which fields it changed, so the strict models
+in validation.py only fail on data that really can't be used.
+
+Values that can't be repaired are left untouched for the validators to reject.
+"""
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.local_extraction import normalize_phone
+
+logger = logging.getLogger(__name__)
+
+SCHEME_RE = re.compile(r"^https?://", re.IGNORECASE)
+DOMAIN_RE = re.compile(r"^(?:[a-z0-9-]+\.)+[a-z]{2,}(?:[/?#]\S*)?$", re.IGNORECASE)
+EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+AGE_DECADE_RE = re.compile(r"\b(?:early|mid|late)?[\s-]*(\d)0\s*'?s\b", re.IGNORECASE)
+AGE_RANGE_RE = re.compile(r"\b(\d{2})\s*(?:-|to|–)\s*(\d{2})\b")
+AGE_YEARS_RE = re.compile(r"^(?:about|around|roughly|approximately|~)?\s*(\d{2})\s*(?:years?\s*old|yrs?(?:\s*old)?|y/?o)?$", re.IGNORECASE)
+NUMBER_RE = re.compile(r"^\$?\s*(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k|thousand)?\s*(?:miles|mi|usd|dollars)?$", re.IGNORECASE)
+
+# Spelled-out decades ("thirties", "mid forties")
+AGE_WORDS = {
+    "twenties": "20s", "thirties": "30s", "forties": "40s", "fifties": "50s",
+    "sixties": "60s", "seventies": "70s", "eighties": "80s", "nineties": "90s"
+}
+GENDER_WORDS = {
+    "woman": ("woman", "women", "she", "her", "female", "f", "lady", "girl", "mrs", "ms", "miss"),
+    "man": ("man", "men", "he", "him", "male", "m", "guy", "gentleman", "boy", "mr")
+}
+CONDITION_WORDS = {
+    "New": ("new", "brand new"),
+    "Used": ("used", "pre-owned", "preowned", "pre owned", "second hand", "secondhand"),
+    "Certified": ("certified", "cpo", "certified pre-owned", "certified preowned", "certified used")
+}
+
+INT_PREFERENCE_FIELDS = ("year_min", "year_max", "miles_min", "miles_max")
+FLOAT_PREFERENCE_FIELDS = ("price_min", "price_max")
+LIST_PREFERENCE_FIELDS = ("exterior_color", "interior_color", "condition")
+
+
+def normalize_url(value: Any) -> Any:
+    """Add a missing https:// scheme and strip stray whitespace and punctuation."""
+    if not isinstance(value, str):
+        return value
+    # Sentence punctuation may follow a closing bracket ("<https://x.com>.")
+    url = value.strip().rstrip(".,;!?").strip("<>\"'").rstrip(".,;)!?")
+    if not SCHEME_RE.match(url) and DOMAIN_RE.match(url):
+        url = f"https://{url}"
+    return url
+
+
+def normalize_gender(value: Any) -> Any:
+    """Map pronouns and synonyms to the "man" / "woman" values n8n expects."""
+    if not isinstance(value, str):
+        return value
+    word = value.strip().lower().rstrip(".")
+    for target, synonyms in GENDER_WORDS.items():
+        if word in synonyms:
+            return target
+    return value
+
+
+def normalize_age(value: Any) -> Any:
+    """Coerce age phrases ("mid-30s", "30's", "thirties", "35 years old", "20 to 30") to "30s" / "35" / "20-30"."""
+    if isinstance(value, int) and 10 <= value <= 99:
+        return str(value)
+    if not isinstance(value, str):
+        return value
+    text = value.strip().lower()
+    for word, decade in AGE_WORDS.items():
+        if word in text:
+            return decade
+    match = AGE_RANGE_RE.search(text)
+    if match:
+        return f"{match.group(1)}-{match.group(2)}"
+    match = AGE_DECADE_RE.search(text)
+    if match:
+        return f"{match.group(1)}0s"
+    match = AGE_YEARS_RE.match(text)
+    if match:
+        return match.group(1)
+    return value
+
+
+def normalize_condition(value: Any) -> Any:
+    """Map condition synonyms to "New" / "Used" / "Certified", as a de-duplicated list."""
+    items = _as_list(value)
+    if not isinstance(items, list):
+        return value
+    conditions = []
+    for item in items:
+        mapped = item
+        if isinstance(item, str):
+            word = item.strip().lower()
+            mapped = next((target for target, words in CONDITION_WORDS.items() if word in words), item)
+        if mapped not in conditions:
+            conditions.append(mapped)
+    return conditions
+
+
+def _as_list(value: Any) -> Any:
+    """Wrap a single value in a list; split comma-separated strings."""
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    if isinstance(value, (tuple, set)):
+        return list(value)
+    return value
+
+
+def _number(value: Any) -> Optional[float]:
+    """Parse "$30,000", "30k", "50,000 miles" or numeric strings; None if not a number."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = NUMBER_RE.match(value.strip())
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", ""))
+    return number * 1000 if match.group(2) else number
+
+
+def normalize_preference(preference: Any) -> Any:
+    """Coerce one vehiclesearchpreference entry (numeric strings, list fields, reversed ranges)."""
+    if not isinstance(preference, dict):
+        return preference
+    fixed = dict(preference)
+    for key in INT_PREFERENCE_FIELDS:
+        number = _number(fixed.get(key))
+        if number is not None and number == int(number):
+            fixed[key] = int(number)
+    for key in FLOAT_PREFERENCE_FIELDS:
+        number = _number(fixed.get(key))
+        if number is not None:
+            fixed[key] = number
+    for key in LIST_PREFERENCE_FIELDS:
+        if fixed.get(key) is not None:
+            fixed[key] = _as_list(fixed[key])
+    if fixed.get("condition"):
+        fixed["condition"] = normalize_condition(fixed["condition"])
+    for low, high in (("year_min", "year_max"), ("price_min", "price_max"), ("miles_min", "miles_max")):
+        lo, hi = fixed.get(low), fixed.get(high)
+        if isinstance(lo, (int, float)) and isinstance(hi, (int, float)) and lo > hi:
+            fixed[low], fixed[high] = hi, lo
+    return fixed
+
+
+def _normalize_field(field: str, value: Any) -> Any:
+    if isinstance(value, str) and field not in ("dealershipwebsite_url", "vehicledetailspage_urls"):
+        value = value.strip()
+    if field == "dealershipwebsite_url":
+        return normalize_url(value)
+    if field == "vehicledetailspage_urls":
+        urls = _as_list(value)
+        if isinstance(urls, list):
+            urls = list(dict.fromkeys(normalize_url(url) for url in urls))
+        return urls
+    if field == "user_email" and isinstance(value, str):
+        email = re.sub(r"^mailto:", "", value, flags=re.IGNORECASE).strip("<>").lower()
+        return email if EMAIL_RE.match(email) else value
+    if field == "user_phone":
+        if isinstance(value, int):
+            value = str(value)
+        if isinstance(value, str):
+            return normalize_phone(value) or value
+        return value
+    if field == "gender_descriptor":
+        return normalize_gender(value)
+    if field == "age_descriptor":
+        return normalize_age(value)
+    if field == "vehiclesearchpreference":
+        preferences = [value] if isinstance(value, dict) else value
+        if isinstance(preferences, list):
+            return [normalize_preference(p) for p in preferences]
+    return value
+
+
+def normalize_collected_data(data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Repair recoverable formatting issues in collected data before validation.
+
+    Args:
+        data: Collected data (not modified)
+
+    Returns:
+        Tuple of (normalized copy of the data, names of the fields that were coerced)
+    """
+    normalized: Dict[str, Any] = {}
+    coerced: List[str] = []
+    for field, value in data.items():
+        if value is None:
+            normalized[field] = value
+            continue
+        fixed = _normalize_field(field, value)
+        if fixed != value:
+            coerced.append(field)
+            logger.info(f"Normalized {field}: {value!r} -> {fixed!r}")
+        normalized[field] = fixed
+    return normalized, coerced
+
+
+__all__ = [
+    "normalize_collected_data",
+    "normalize_url",
+    "normalize_gender",
+    "normalize_age",
+    "normalize_condition",
+    "normalize_preference"
+]
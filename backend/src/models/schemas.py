@@ -224,6 +224,27 @@ class IntentRoute(BaseModel):
     )
 
 
+class ExtractAndRespond(BaseModel):
+    """
+    Structured output for the single-call "extract + respond" collection mode.
+    
+    One LLM call returns both the fields extracted from the salesperson's
+    message and the conversational reply for this turn.
+    """
+    extracted_data: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Fields extracted from the message, using the exact PRD field names"
+    )
+    assistant_message: str = Field(
+        ...,
+        description="Conversational reply that acknowledges the new data and asks for the next missing field"
+    )
+    next_field: Optional[str] = Field(
+        None,
+        description="PRD name of the field assistant_message asks for, or null if it asks for none"
+    )
+
+
 class ConversationState(BaseModel):
     """
     LangGraph conversation state that flows between nodes.
@@ -252,6 +273,7 @@ class ConversationState(BaseModel):
     
     # Response state
     assistant_message: str = ""
+    drafted_response: Optional[str] = None  # Reply drafted by the combined collection call
     next_question: Optional[str] = None
     conversation_complete: bool = False
     
@@ -264,4 +286,7 @@ class ConversationState(BaseModel):
     llm_model_used: Optional[str] = None
     error: Optional[str] = None
     
+    # Token accounting for this message: totals plus per-node breakdown
+    token_usage: Dict[str, Any] = Field(default_factory=dict)
+    
     model_config = {"protected_namespaces": ()}
\ No newline at end of file
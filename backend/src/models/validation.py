@@ -4,8 +4,8 @@ Pydantic models for strict data validation before sending to Xano API.
 These models ensure all collected data matches PRD specifications exactly.
 """
 import re
-from typing import Optional, List, Dict, Any, Union
-from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Dict, Any, Type, Union
+from pydantic import BaseModel, Field, create_model, field_validator, model_validator
 from datetime import datetime
 
 
@@ -200,9 +200,40 @@ def validate_collected_data(data: Dict[str, Any], workflow_id: int) -> Dict[str,
         raise ValueError(f"Unknown workflow ID: {workflow_id}. Expected 2 or 3.")
 
 
+def _extraction_model(source: Type[BaseModel], name: str, overrides: Optional[Dict[str, Any]] = None) -> Type[BaseModel]:
+    """
+    Build a lenient extraction schema from a validation model.
+    
+    Every field becomes optional (a message usually carries only some of them)
+    and no validators are copied - the strict model still runs afterwards in
+    validate_collected_data.
+    """
+    overrides = overrides or {}
+    fields = {}
+    for field_name, info in source.model_fields.items():
+        annotation = overrides.get(field_name, info.annotation)
+        fields[field_name] = (Optional[annotation], Field(default=None, description=info.description))
+    return create_model(name, __doc__=f"Fields extracted from one message ({source.__name__}).", **fields)
+
+
+# Schemas for schema-constrained extraction output, generated from the models above
+VehicleSearchPreferenceExtraction = _extraction_model(VehicleSearchPreference, "VehicleSearchPreferenceExtraction")
+_PREFERENCE_OVERRIDE = {"vehiclesearchpreference": List[VehicleSearchPreferenceExtraction]}
+ShopperShowroomExtraction = _extraction_model(ShopperShowroomData, "ShopperShowroomExtraction", _PREFERENCE_OVERRIDE)
+PersonalShowroomExtraction = _extraction_model(PersonalShowroomData, "PersonalShowroomExtraction", _PREFERENCE_OVERRIDE)
+
+EXTRACTION_MODELS: Dict[int, Type[BaseModel]] = {
+    2: ShopperShowroomExtraction,
+    3: PersonalShowroomExtraction
+}
+
+
 __all__ = [
     "VehicleSearchPreference",
     "ShopperShowroomData", 
     "PersonalShowroomData",
-    "validate_collected_data"
+    "validate_collected_data",
+    "ShopperShowroomExtraction",
+    "PersonalShowroomExtraction",
+    "EXTRACTION_MODELS"
 ]
\ No newline at end of file
@@ -0,0 +1,7 @@
+"""
+Prompt templates and the registry that renders them.
+"""
+from .registry import PromptTemplate, RenderedPrompt, PromptRegistry, get_prompt_registry, render_prompt
+from . import templates  # noqa: F401  (registers every template)
+
+__all__ = ["PromptTemplate", "RenderedPrompt", "PromptRegistry", "get_prompt_registry", "render_prompt"]
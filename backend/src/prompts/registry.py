@@ -0,0 +1,177 @@
+"""
+Prompt template registry.
+
+Each template is a byte-identical static prefix (instructions, field
+definitions, examples) followed by a short dynamic suffix with the per-turn
+context. Keeping the variable part last lets provider-side prefix caching reuse
+the long instructions across calls. Templates are registered at import and
+their static prefix is tokenized once (loading a tokenizer may download its
+BPE files, which must not happen at import): the service does it at startup,
+off the event loop, with warm(). Every render logs the template's version id,
+and so does every LLM call whose system prompt starts with a template's
+static prefix (see version_for()).
+"""
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from ..utils.tokens import count_tokens, encode, get_encoding
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    A prompt with a static prefix and a str.format() dynamic suffix.
+
+    The static prefix is never formatted, so it may contain literal braces.
+    """
+    name: str
+    static: str
+    dynamic: str = ""
+    model: Optional[str] = None
+    version: str = field(init=False)
+
+    def __post_init__(self):
+        digest = hashlib.sha256(f"{self.static}\x00{self.dynamic}".encode()).hexdigest()[:8]
+        object.__setattr__(self, "version", f"{self.name}@{digest}")
+
+    @cached_property
+    def prefix_tokens(self) -> Optional[Sequence[int]]:
+        """Token ids of the static prefix (None without tiktoken), computed on first use."""
+        tokens = encode(self.static, self.model)
+        return tuple(tokens) if tokens is not None else None
+
+    @cached_property
+    def prefix_token_count(self) -> int:
+        """Token count of the static prefix, computed on first use."""
+        tokens = self.prefix_tokens
+        return len(tokens) if tokens is not None else count_tokens(self.static)
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    """Result of PromptRegistry.render()."""
+    text: str
+    version: str
+    prefix_token_count: int
+    token_count: int
+
+
+class PromptRegistry:
+    """Process-wide lookup of PromptTemplates by name."""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        """
+        Add a template (replacing any template with the same name).
+
+        Args:
+            template: Template to register
+
+        Returns:
+            The registered template
+        """
+        self._templates[template.name] = template
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        Look up a template by name.
+
+        Raises:
+            KeyError: If no template is registered under `name`
+        """
+        return self._templates[name]
+
+    def _build(self, name: str, context: Dict[str, Any]) -> RenderedPrompt:
+        template = self.get(name)
+        suffix = template.dynamic.format(**context) if template.dynamic else ""
+        text = f"{template.static}\n\n{suffix}" if suffix else template.static
+        token_count = template.prefix_token_count + (count_tokens(suffix, template.model) if suffix else 0)
+        return RenderedPrompt(
+            text=text,
+            version=template.version,
+            prefix_token_count=template.prefix_token_count,
+            token_count=token_count
+        )
+
+    def render(self, name: str, **context: Any) -> RenderedPrompt:
+        """
+        Render a template for an LLM call: static prefix, then the formatted dynamic suffix.
+
+        Args:
+            name: Registered template name
+            **context: Values for the dynamic suffix placeholders
+
+        Returns:
+            RenderedPrompt with the text, version id and token counts
+        """
+        rendered = self._build(name, context)
+        logger.info(
+            f"Rendered prompt {rendered.version} ({rendered.prefix_token_count} cached-prefix + "
+            f"{rendered.token_count - rendered.prefix_token_count} dynamic tokens)"
+        )
+        return rendered
+
+    def measure(self, name: str, **context: Any) -> int:
+        """Token count a render would have, without logging it as a call."""
+        return self._build(name, context).token_count
+
+    def version_for(self, text: str) -> Optional[str]:
+        """
+        Version id of the template a prompt was rendered from.
+
+        Args:
+            text: Prompt text (e.g. the system message of an LLM call)
+
+        Returns:
+            Version of the template with the longest static prefix starting
+            `text`, or None if no template matches
+        """
+        matches = [template for template in self._templates.values() if text.startswith(template.static)]
+        return max(matches, key=lambda template: len(template.static)).version if matches else None
+
+    def warm(self, models: Iterable[str] = ()) -> int:
+        """
+        Load the tokenizers and tokenize every static prefix now.
+
+        Blocking (it may download BPE files), so the service runs it in a
+        worker thread at startup rather than on the first request.
+
+        Args:
+            models: Models whose tokenizers LLM call accounting will need
+
+        Returns:
+            Number of templates warmed
+        """
+        for model in models:
+            get_encoding(model)
+        for template in self._templates.values():
+            template.prefix_token_count
+        return len(self._templates)
+
+    def versions(self) -> Dict[str, str]:
+        """Template name -> version id for every registered template."""
+        return {name: template.version for name, template in self._templates.items()}
+
+
+_registry = PromptRegistry()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Return the process-wide prompt registry."""
+    return _registry
+
+
+def render_prompt(name: str, **context: Any) -> RenderedPrompt:
+    """Render a template from the process-wide registry."""
+    return _registry.render(name, **context)
+
+
+__all__ = ["PromptTemplate", "RenderedPrompt", "PromptRegistry", "get_prompt_registry", "render_prompt"]
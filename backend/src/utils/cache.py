@@ -0,0 +1,64 @@
+"""
+Process-level caches with hit/miss/eviction accounting.
+"""
+import logging
+from typing import Any, Dict
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class StatsTTLCache(TTLCache):
+    """
+    LRU + TTL cache (cachetools.TTLCache) that counts hits, misses and evictions.
+
+    Use lookup() rather than `in` / [] so hits and misses are recorded.
+    Evictions count entries dropped for size (least recently used) and
+    expirations count entries dropped because their TTL ran out.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, key: Any, default: Any = None) -> Any:
+        """Get a cached value, recording a hit or miss."""
+        value = self.get(key, default)
+        if value is default:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def popitem(self):
+        """Evict the least recently used entry (called by cachetools when full)."""
+        item = super().popitem()
+        self.evictions += 1
+        return item
+
+    def expire(self, time=None):
+        """Drop expired entries (called by cachetools on every access)."""
+        expired = super().expire(time)
+        self.expirations += len(expired)
+        return expired
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the cache counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": self.currsize,
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+__all__ = ["StatsTTLCache"]
@@ -0,0 +1,70 @@
+"""
+Token-bounded splitting of long messages.
+
+Splits on line boundaries first (pasted listings and email threads are
+line-oriented), then on sentence boundaries, and only cuts mid-sentence when a
+single sentence is longer than a chunk.
+"""
+import re
+from typing import List, Optional
+
+from .tokens import count_tokens, encode, get_encoding
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _hard_split(text: str, max_tokens: int, model: Optional[str]) -> List[str]:
+    tokens = encode(text, model)
+    if tokens is not None:
+        encoding = get_encoding(model)
+        return [encoding.decode(list(tokens[i:i + max_tokens])) for i in range(0, len(tokens), max_tokens)]
+    step = max_tokens * 4
+    return [text[i:i + step] for i in range(0, len(text), step)]
+
+
+def _pieces(text: str, max_tokens: int, model: Optional[str]) -> List[str]:
+    """Lines of `text`, with over-long lines broken into sentences or hard cuts."""
+    pieces = []
+    for line in text.splitlines(keepends=True):
+        if count_tokens(line, model) <= max_tokens:
+            pieces.append(line)
+            continue
+        for sentence in SENTENCE_RE.split(line):
+            if count_tokens(sentence, model) <= max_tokens:
+                pieces.append(sentence + " ")
+            else:
+                pieces.extend(_hard_split(sentence, max_tokens, model))
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int, model: Optional[str] = None) -> List[str]:
+    """
+    Split text into chunks of at most `max_tokens` tokens.
+
+    Args:
+        text: Text to split
+        max_tokens: Token limit per chunk
+        model: Model whose tokenizer to use
+
+    Returns:
+        Non-empty chunks in their original order
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return [text]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for piece in _pieces(text, max_tokens, model):
+        piece_tokens = count_tokens(piece, model)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("".join(current))
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
+
+
+__all__ = ["split_into_chunks"]
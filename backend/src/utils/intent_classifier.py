@@ -0,0 +1,361 @@
+"""
+Local intent classifier trained from logged routing decisions.
+
+A multinomial naive Bayes model over hashed word n-grams of the normalized
+message (names, numbers and URLs masked, see simhash.normalize_for_similarity),
+with temperature-scaled probabilities. It answers before the GPT router in
+IntentDetectionNode; GPT is only consulted below INTENT_CLASSIFIER_THRESHOLD.
+
+Routing decisions made by GPT are appended to INTENT_ROUTING_LOG_PATH (JSONL,
+off unless the path is set), and the model is trained offline from that log:
+
+    python -m src.utils.intent_classifier train --input routing_log.jsonl --output intent_model.json
+
+The model file is small JSON (only non-zero feature counts are stored) and is
+loaded once at startup from INTENT_CLASSIFIER_PATH.
+
+The log never holds raw messages: queries are stored normalized, with URLs,
+emails, numbers (phones, prices) and capitalized names masked - the same
+normalization the classifier applies before featurizing, so training is
+unaffected. Once the log reaches INTENT_ROUTING_LOG_MAX_MB it is rotated to
+<path>.1, replacing the previous rotation, so at most two files are retained.
+"""
+import os
+import json
+import math
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .simhash import normalize_for_similarity
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+DEFAULT_FEATURE_BITS = 18
+WORKFLOW_IDS = [1, 2, 3]
+
+
+def hashed_features(text: str, n_features: int) -> Counter:
+    """
+    Hashed unigram + bigram counts of a normalized message.
+
+    Args:
+        text: Raw user message
+        n_features: Number of hash buckets
+
+    Returns:
+        Counter of bucket index -> count
+    """
+    tokens = normalize_for_similarity(text).split()
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return Counter(
+        int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "big") % n_features
+        for gram in grams
+    )
+
+
+def _softmax(logits: List[float]) -> List[float]:
+    top = max(logits)
+    exps = [math.exp(x - top) for x in logits]
+    total = sum(exps)
+    return [x / total for x in exps]
+
+
+class IntentClassifier:
+    """
+    Multinomial naive Bayes over hashed n-grams with temperature calibration.
+    """
+
+    def __init__(
+        self,
+        class_counts: Dict[int, int],
+        feature_counts: Dict[int, Dict[int, int]],
+        n_features: int = 1 << DEFAULT_FEATURE_BITS,
+        alpha: float = 0.1,
+        temperature: float = 1.0
+    ):
+        self.classes = sorted(class_counts)
+        self.class_counts = class_counts
+        self.feature_counts = feature_counts
+        self.n_features = n_features
+        self.alpha = alpha
+        self.temperature = temperature
+
+        total_docs = sum(class_counts.values())
+        self._log_prior = {c: math.log(class_counts[c] / total_docs) for c in self.classes}
+        self._log_denominator = {
+            c: math.log(sum(feature_counts.get(c, {}).values()) + alpha * n_features)
+            for c in self.classes
+        }
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[Tuple[str, int]],
+        n_features: int = 1 << DEFAULT_FEATURE_BITS,
+        alpha: float = 0.1
+    ) -> "IntentClassifier":
+        """
+        Fit the model on (query, workflow_id) pairs.
+
+        Args:
+            examples: Labelled messages
+            n_features: Number of hash buckets
+            alpha: Additive smoothing
+
+        Returns:
+            Trained classifier with temperature 1.0
+        """
+        class_counts: Dict[int, int] = {}
+        feature_counts: Dict[int, Dict[int, int]] = {}
+        for query, workflow_id in examples:
+            class_counts[workflow_id] = class_counts.get(workflow_id, 0) + 1
+            counts = feature_counts.setdefault(workflow_id, {})
+            for index, count in hashed_features(query, n_features).items():
+                counts[index] = counts.get(index, 0) + count
+        if not class_counts:
+            raise ValueError("No training examples")
+        return cls(class_counts, feature_counts, n_features, alpha)
+
+    def logits(self, text: str) -> List[float]:
+        """Unscaled per-class log joint probabilities, in self.classes order."""
+        features = hashed_features(text, self.n_features)
+        result = []
+        for c in self.classes:
+            counts = self.feature_counts.get(c, {})
+            score = self._log_prior[c]
+            for index, count in features.items():
+                score += count * (math.log(counts.get(index, 0) + self.alpha) - self._log_denominator[c])
+            result.append(score)
+        return result
+
+    def predict_proba(self, text: str) -> Dict[int, float]:
+        """Calibrated class probabilities for a message."""
+        probs = _softmax([x / self.temperature for x in self.logits(text)])
+        return dict(zip(self.classes, probs))
+
+    def predict(self, text: str) -> Tuple[int, float]:
+        """
+        Most likely workflow and its calibrated probability.
+
+        Args:
+            text: User message
+
+        Returns:
+            Tuple of (workflow_id, probability)
+        """
+        probs = self.predict_proba(text)
+        workflow_id = max(probs, key=probs.get)
+        return workflow_id, probs[workflow_id]
+
+    def calibrate(self, examples: List[Tuple[str, int]]) -> float:
+        """
+        Fit the softmax temperature on held-out examples by minimizing log loss.
+
+        Args:
+            examples: Held-out (query, workflow_id) pairs
+
+        Returns:
+            Chosen temperature (also stored on the model)
+        """
+        all_logits = [(self.logits(q), self.classes.index(y)) for q, y in examples if y in self.classes]
+        if not all_logits:
+            return self.temperature
+
+        def log_loss(temperature: float) -> float:
+            return -sum(
+                math.log(max(_softmax([x / temperature for x in logits])[label], 1e-12))
+                for logits, label in all_logits
+            ) / len(all_logits)
+
+        candidates = [10 ** (i / 20) for i in range(-20, 61)]  # 0.1 .. 1000
+        self.temperature = min(candidates, key=log_loss)
+        return self.temperature
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": MODEL_VERSION,
+            "n_features": self.n_features,
+            "alpha": self.alpha,
+            "temperature": self.temperature,
+            "class_counts": {str(c): n for c, n in self.class_counts.items()},
+            "feature_counts": {
+                str(c): {str(i): n for i, n in counts.items()}
+                for c, counts in self.feature_counts.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IntentClassifier":
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"Unsupported intent model version: {data.get('version')}")
+        return cls(
+            class_counts={int(c): n for c, n in data["class_counts"].items()},
+            feature_counts={
+                int(c): {int(i): n for i, n in counts.items()}
+                for c, counts in data["feature_counts"].items()
+            },
+            n_features=data["n_features"],
+            alpha=data["alpha"],
+            temperature=data["temperature"]
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+_classifier: Optional[IntentClassifier] = None
+
+
+def load_intent_classifier() -> Optional[IntentClassifier]:
+    """
+    Load the model from INTENT_CLASSIFIER_PATH (called from the FastAPI lifespan).
+
+    Returns:
+        The loaded classifier, or None if no model is configured or it fails to load
+    """
+    global _classifier
+    path = os.getenv("INTENT_CLASSIFIER_PATH")
+    if not path:
+        return None
+    try:
+        _classifier = IntentClassifier.load(path)
+        logger.info(f"Loaded intent classifier from {path} (temperature={_classifier.temperature:.2f})")
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Failed to load intent classifier from {path}: {str(e)}")
+        _classifier = None
+    return _classifier
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """Return the loaded classifier, or None if none is loaded."""
+    return _classifier
+
+
+def classifier_threshold() -> float:
+    """Calibrated probability above which the classifier's answer is used (INTENT_CLASSIFIER_THRESHOLD)."""
+    return float(os.getenv("INTENT_CLASSIFIER_THRESHOLD", "0.9"))
+
+
+_routing_log_lock = threading.Lock()
+
+
+def _append_routing_record(path: str, record: Dict[str, Any]) -> None:
+    max_bytes = float(os.getenv("INTENT_ROUTING_LOG_MAX_MB", "50")) * 1024 * 1024
+    with _routing_log_lock:
+        try:
+            if os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+                os.replace(path, f"{path}.1")
+            with open(path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write routing log to {path}: {str(e)}")
+
+
+async def log_routing_decision(query: str, workflow_id: int, confidence: float, source: str) -> None:
+    """
+    Append a redacted routing decision to INTENT_ROUTING_LOG_PATH as training data.
+
+    The query is stored normalized (names, numbers, URLs and emails masked)
+    and the file write runs in a worker thread, off the event loop.
+
+    Args:
+        query: User message
+        workflow_id: Chosen workflow
+        confidence: Router confidence
+        source: Which tier decided (e.g. "llm")
+    """
+    path = os.getenv("INTENT_ROUTING_LOG_PATH")
+    if not path:
+        return
+    record = {
+        "query": normalize_for_similarity(query),
+        "workflow_id": workflow_id,
+        "confidence": confidence,
+        "source": source
+    }
+    await asyncio.to_thread(_append_routing_record, path, record)
+
+
+def _read_examples(path: str, min_confidence: float) -> List[Tuple[str, int]]:
+    examples = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get("workflow_id") in WORKFLOW_IDS and record.get("confidence", 1.0) >= min_confidence:
+                examples.append((record["query"], record["workflow_id"]))
+    return examples
+
+
+def _train_command(args: argparse.Namespace) -> None:
+    examples = _read_examples(args.input, args.min_confidence)
+    random.Random(args.seed).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train_set, holdout = examples[:split], examples[split:]
+    print(f"Training on {len(train_set)} examples, calibrating on {len(holdout)}")
+
+    model = IntentClassifier.train(train_set, n_features=1 << args.feature_bits, alpha=args.alpha)
+    temperature = model.calibrate(holdout)
+    print(f"Calibrated temperature: {temperature:.3f}")
+
+    if holdout:
+        predictions = [(model.predict(q), y) for q, y in holdout]
+        accuracy = sum(p == y for (p, _), y in predictions) / len(predictions)
+        confident = [(p, y) for (p, prob), y in predictions if prob >= args.threshold]
+        print(f"Holdout accuracy: {accuracy:.3f}")
+        if confident:
+            precision = sum(p == y for p, y in confident) / len(confident)
+            print(f"At threshold {args.threshold}: coverage {len(confident) / len(predictions):.3f}, accuracy {precision:.3f}")
+
+    # Refit on everything, keeping the calibrated temperature
+    final = IntentClassifier.train(examples, n_features=1 << args.feature_bits, alpha=args.alpha)
+    final.temperature = temperature
+    final.save(args.output)
+    print(f"Saved model to {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Train the local intent classifier from a routing log.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train = subparsers.add_parser("train", help="Train and calibrate a model from routing log JSONL")
+    train.add_argument("--input", required=True, help="Routing log JSONL (query, workflow_id, confidence)")
+    train.add_argument("--output", required=True, help="Model file to write")
+    train.add_argument("--min-confidence", type=float, default=0.7, help="Drop logged routes below this confidence")
+    train.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for calibration")
+    train.add_argument("--feature-bits", type=int, default=DEFAULT_FEATURE_BITS, help="log2 of hash buckets")
+    train.add_argument("--alpha", type=float, default=0.1, help="Additive smoothing")
+    train.add_argument("--threshold", type=float, default=0.9, help="Probability threshold to report coverage for")
+    train.add_argument("--seed", type=int, default=13)
+    train.set_defaults(func=_train_command)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+__all__ = [
+    "IntentClassifier",
+    "load_intent_classifier",
+    "get_intent_classifier",
+    "classifier_threshold",
+    "log_routing_decision"
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Process-wide LLM client registry.
+
+Every node used to build its own ChatOpenAI / ChatGoogleGenerativeAI /
+AsyncOpenAI objects per message, paying object setup and fresh TLS
+handshakes each time. The registry is created once in the FastAPI lifespan,
+hands out one cached client per (provider, model, temperature, ...) and routes
+all OpenAI traffic through a single keep-alive httpx connection pool.
+"""
+import os
+import logging
+from functools import partial
+from typing import Any, Dict, Optional, Sequence, Tuple, Type
+
+import httpx
+from openai import AsyncOpenAI
+from langchain_core.runnables import RunnableLambda
+from langchain_openai import ChatOpenAI
+from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import BaseModel, SecretStr, ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+def _secret(key: str) -> Optional[SecretStr]:
+    """Read an API key from the environment."""
+    val = os.getenv(key)
+    return SecretStr(val) if val else None
+
+
+def inline_schema_refs(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return a JSON schema with every "$ref" replaced by its "$defs" entry.
+
+    Gemini response schemas can't hold references, and langchain-google-genai
+    does not resolve the ones nested in lists (the anyOf of an Optional field),
+    so a model with an Optional[List[SubModel]] field fails at request time.
+
+    Args:
+        schema: JSON schema, e.g. from BaseModel.model_json_schema()
+
+    Returns:
+        Self-contained schema without "$defs"
+    """
+    defs = schema.get("$defs", {})
+
+    def resolve(node: Any) -> Any:
+        if isinstance(node, dict):
+            if "$ref" in node:
+                target = defs[node["$ref"].rsplit("/", 1)[-1]]
+                return resolve({**target, **{k: v for k, v in node.items() if k != "$ref"}})
+            return {k: resolve(v) for k, v in node.items() if k != "$defs"}
+        if isinstance(node, list):
+            return [resolve(item) for item in node]
+        return node
+
+    return resolve(schema)
+
+
+def _validate_parsed(schema: Type[BaseModel], output: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a parsed JSON-mode response into `schema`; a mismatch becomes the parsing_error."""
+    if output.get("parsing_error") is not None or output.get("parsed") is None:
+        return output
+    try:
+        return {**output, "parsed": schema.model_validate(output["parsed"])}
+    except ValidationError as e:
+        return {**output, "parsed": None, "parsing_error": e}
+
+
+class LLMClientRegistry:
+    """
+    Cache of LLM clients sharing one keep-alive connection pool.
+
+    Pool limits are read from the environment:
+    - LLM_MAX_CONNECTIONS (default 100)
+    - LLM_MAX_KEEPALIVE_CONNECTIONS (default 20)
+    - LLM_KEEPALIVE_EXPIRY_SECONDS (default 30)
+    - LLM_TIMEOUT_SECONDS (default 60)
+    """
+
+    def __init__(self):
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+                keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "30"))
+            ),
+            timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+        )
+        self._clients: Dict[Tuple, Any] = {}
+        self._openai: Optional[AsyncOpenAI] = None
+
+    def chat_openai(self, model: str, temperature: float, tags: Sequence[str] = ()) -> ChatOpenAI:
+        """
+        Get the shared ChatOpenAI client for a model/temperature.
+
+        Args:
+            model: OpenAI model name
+            temperature: Sampling temperature
+            tags: Run tags attached to every call (e.g. RESPONSE_STREAM_TAG)
+
+        Returns:
+            Cached ChatOpenAI instance
+        """
+        key = ("openai", model, temperature, tuple(tags))
+        if key not in self._clients:
+            self._clients[key] = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                api_key=_secret("OPENAI_API_KEY"),
+                http_async_client=self.http_client,
+                tags=list(tags) or None
+            )
+        return self._clients[key]
+
+    def gemini(self, model: str, temperature: float) -> ChatGoogleGenerativeAI:
+        """
+        Get the shared Gemini client for a model/temperature.
+
+        The Google SDK manages its own transport, so reuse comes from keeping
+        one client (and its channel) alive instead of rebuilding it.
+        """
+        key = ("gemini", model, temperature)
+        if key not in self._clients:
+            self._clients[key] = ChatGoogleGenerativeAI(
+                model=model,
+                temperature=temperature,
+                api_key=_secret("GOOGLE_AI_API_KEY")
+            )
+        return self._clients[key]
+
+    def structured_gemini(
+        self,
+        model: str,
+        temperature: float,
+        schema: Type[BaseModel],
+        method: str = "json_mode"
+    ):
+        """
+        Get a cached schema-constrained binding of a shared Gemini client.
+
+        Args:
+            model: Gemini model name
+            temperature: Sampling temperature
+            schema: Pydantic model for the structured output
+            method: "json_mode" (native response schema) or "function_calling"
+
+        Returns:
+            Runnable returning {"raw", "parsed", "parsing_error"} (include_raw=True);
+            "parsed" is a schema instance, and a response that is not valid
+            JSON or does not validate against the schema sets "parsing_error"
+        """
+        key = ("gemini_structured", model, temperature, schema, method)
+        if key not in self._clients:
+            llm = self.gemini(model, temperature)
+            if method == "json_mode":
+                # Send a reference-free schema and validate the parsed dict ourselves
+                self._clients[key] = llm.with_structured_output(
+                    inline_schema_refs(schema.model_json_schema()), method=method, include_raw=True
+                ) | RunnableLambda(partial(_validate_parsed, schema))
+            else:
+                self._clients[key] = llm.with_structured_output(schema, method=method, include_raw=True)
+        return self._clients[key]
+
+    def structured_openai(
+        self,
+        model: str,
+        temperature: float,
+        schema: Type[BaseModel],
+        method: Optional[str] = None
+    ):
+        """
+        Get a cached with_structured_output binding of a shared ChatOpenAI client.
+
+        Args:
+            model: OpenAI model name
+            temperature: Sampling temperature
+            schema: Pydantic model for the structured output
+            method: Structured output method passed to with_structured_output
+
+        Returns:
+            Runnable returning instances of schema
+        """
+        key = ("openai_structured", model, temperature, schema, method)
+        if key not in self._clients:
+            llm = self.chat_openai(model, temperature)
+            kwargs = {"method": method} if method else {}
+            self._clients[key] = llm.with_structured_output(schema, **kwargs)
+        return self._clients[key]
+
+    def openai(self) -> AsyncOpenAI:
+        """Get the shared raw AsyncOpenAI client (used for tool calls)."""
+        if self._openai is None:
+            self._openai = AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                http_client=self.http_client
+            )
+        return self._openai
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool and drop cached clients."""
+        self._clients.clear()
+        self._openai = None
+        await self.http_client.aclose()
+
+
+_registry: Optional[LLMClientRegistry] = None
+
+
+def init_llm_clients() -> LLMClientRegistry:
+    """Create the process-wide registry (called from the FastAPI lifespan)."""
+    global _registry
+    if _registry is None:
+        _registry = LLMClientRegistry()
+        logger.info("LLM client registry initialized")
+    return _registry
+
+
+def get_llm_clients() -> LLMClientRegistry:
+    """Return the process-wide registry, creating it lazily outside the app."""
+    return _registry or init_llm_clients()
+
+
+async def close_llm_clients() -> None:
+    """Close the process-wide registry on shutdown."""
+    global _registry
+    if _registry is not None:
+        await _registry.aclose()
+        _registry = None
+        logger.info("LLM client registry closed")
+
+
+__all__ = ["inline_schema_refs", "LLMClientRegistry", "init_llm_clients", "get_llm_clients", "close_llm_clients"]
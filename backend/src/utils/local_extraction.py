@@ -0,0 +1,221 @@
+"""
+Deterministic pre-extraction of contact details, URLs and numeric vehicle hints.
+
+Many collection turns are just a URL, a phone number or a pasted list of
+vehicle detail page URLs. local_extract() pulls those out with regexes before
+the extraction LLM runs; when nothing else is left in the message the LLM call
+can be skipped entirely. Phones are normalized to E.164 and price / mileage /
+year phrases ("under 40k", "below 10k miles", "2020 or newer") become
+vehiclesearchpreference hints.
+
+Phones and emails are only taken as the salesperson's own (user_phone /
+user_email) when their clause doesn't refer to someone else ("my customer's
+number is ..."); those are left to the LLM.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+URL_RE = re.compile(r"(?:https?://|www\.)[^\s<>\"',;]+", re.IGNORECASE)
+BARE_DOMAIN_RE = re.compile(r"\b(?:[a-z0-9-]+\.)+(?:com|net|org|us|ca|auto|cars|dealer|biz|co)(?:/[^\s<>\"',;]*)?\b", re.IGNORECASE)
+EMAIL_RE = re.compile(r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b")
+PHONE_RE = re.compile(
+    r"(?<![\w$])(?:\+\d{1,3}(?:[\s.\-]?\(?\d{1,4}\)?){2,5}|(?:1[\s.\-]?)?\(?\d{3}\)?[\s.\-]?\d{3}[\s.\-]?\d{4})(?!\w)"
+)
+
+AMOUNT = r"\$?\s?(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s?(k|K|thousand)?"
+MILES = r"\s?(?:miles|mi)\b"
+BELOW = r"(?:under|below|less than|max(?:imum)?|up to|no more than|at most)"
+ABOVE = r"(?:over|above|more than|min(?:imum)?|at least)"
+
+MILES_MAX_RE = re.compile(rf"\b{BELOW}\s+{AMOUNT}{MILES}", re.IGNORECASE)
+MILES_MIN_RE = re.compile(rf"\b{ABOVE}\s+{AMOUNT}{MILES}", re.IGNORECASE)
+PRICE_RANGE_RE = re.compile(rf"\bbetween\s+{AMOUNT}\s+(?:and|to|-)\s+{AMOUNT}(?!{MILES})", re.IGNORECASE)
+PRICE_MAX_RE = re.compile(rf"\b{BELOW}\s+{AMOUNT}(?!{MILES}|\d)", re.IGNORECASE)
+PRICE_MIN_RE = re.compile(rf"\b{ABOVE}\s+{AMOUNT}(?!{MILES}|\d)", re.IGNORECASE)
+YEAR_RANGE_RE = re.compile(r"\b((?:19|20)\d{2})\s?(?:-|to|through)\s?((?:19|20)\d{2})\b", re.IGNORECASE)
+YEAR_MIN_RE = re.compile(r"\b((?:19|20)\d{2})\s?(?:\+|or newer|and newer|or later|and up)|\b(?:newer than|after)\s+((?:19|20)\d{2})\b", re.IGNORECASE)
+
+# Words that carry no data of their own ("my phone is ...", "here are the links")
+FILLER_WORDS = {
+    "my", "our", "his", "her", "their", "the", "a", "an", "is", "are", "it", "it's", "its", "here", "here's",
+    "and", "or", "also", "plus", "to", "for", "of", "at", "me", "you", "can", "reach", "call", "text",
+    "phone", "number", "cell", "mobile", "email", "e-mail", "address", "website", "site", "url", "urls",
+    "link", "links", "page", "pages", "vdp", "vdps", "dealership", "dealer", "vehicle", "vehicles",
+    "these", "this", "that", "those", "ones", "one", "them", "they", "use", "try", "price", "budget",
+    "looking", "wants", "want", "miles", "mileage", "year", "years", "ok", "okay", "sure", "yes", "thanks"
+}
+WORD_RE = re.compile(r"[a-z][a-z'\-]*", re.IGNORECASE)
+# Someone other than the salesperson, in the clause before a phone or email
+THIRD_PARTY_RE = re.compile(
+    r"\b(?:customer|client|shopper|buyer|he|she|his|her|him|they|their|them|wife|husband|son|daughter|"
+    r"mom|dad|mother|father|friend|boss|manager|partner)(?:'s)?\b",
+    re.IGNORECASE
+)
+# Where one clause ends and the next begins
+CLAUSE_BREAK_RE = re.compile(r"[.;!?\n,]|\b(?:and|but)\b", re.IGNORECASE)
+# Path segments that mark a vehicle detail page rather than a dealership home page
+VDP_PATH_RE = re.compile(r"/(?:inventory|vehicle|vehicles|used|new|certified|vdp|detail|details|cars?)\b|[A-HJ-NPR-Z0-9]{17}", re.IGNORECASE)
+
+
+@dataclass
+class LocalExtraction:
+    """Result of local_extract()."""
+    data: Dict[str, Any] = field(default_factory=dict)
+    fully_explained: bool = False
+
+    def merge_into(self, extracted_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combine with an LLM extraction of the same message.
+
+        Local values only fill keys the LLM left empty (normalization repairs
+        the LLM's formatting later); numeric hints fill the empty keys of a
+        single LLM vehicle preference.
+        """
+        if not self.data:
+            return extracted_data
+        merged = {} if extracted_data.get("extracted") is False else dict(extracted_data)
+        merged.pop("extracted", None)
+
+        for key, value in self.data.items():
+            if key != "vehiclesearchpreference":
+                if merged.get(key) in (None, "", []):
+                    merged[key] = value
+                continue
+            hints = value[0]
+            preferences = merged.get("vehiclesearchpreference")
+            if not preferences:
+                merged[key] = value
+            elif isinstance(preferences, list) and len(preferences) == 1 and isinstance(preferences[0], dict):
+                for hint_key, hint_value in hints.items():
+                    if preferences[0].get(hint_key) is None:
+                        preferences[0][hint_key] = hint_value
+        return merged
+
+
+def normalize_phone(raw: str) -> Optional[str]:
+    """
+    Normalize a phone number to E.164, assuming US/Canada (+1) without a country code.
+
+    Returns:
+        E.164 string, or None if the digits don't form a dialable number
+    """
+    digits = re.sub(r"\D", "", raw)
+    if raw.strip().startswith("+"):
+        return f"+{digits}" if 8 <= len(digits) <= 15 else None
+    if len(digits) == 10:
+        return f"+1{digits}"
+    if len(digits) == 11 and digits.startswith("1"):
+        return f"+{digits}"
+    return None
+
+
+def _amount(number: str, suffix: Optional[str]) -> float:
+    value = float(number.replace(",", ""))
+    return value * 1000 if suffix else value
+
+
+def _clean_url(url: str) -> str:
+    url = url.rstrip(".)!?:")
+    if not url.lower().startswith(("http://", "https://")):
+        url = f"https://{url}"
+    return url
+
+
+def _refers_to_third_party(text: str, start: int) -> bool:
+    """Whether the clause leading up to `start` is about someone other than the user."""
+    # A bare value after a comma ("my client Allie, 555-...") belongs to the clause before it
+    clauses = [c for c in CLAUSE_BREAK_RE.split(text[:start]) if c and WORD_RE.search(c)]
+    return bool(clauses) and bool(THIRD_PARTY_RE.search(clauses[-1]))
+
+
+def _is_vdp(url: str) -> bool:
+    path = urlparse(url).path
+    return bool(path.strip("/")) and bool(VDP_PATH_RE.search(path) or path.strip("/").count("/") >= 1)
+
+
+def local_extract(text: str, current_field: Optional[str] = None) -> LocalExtraction:
+    """
+    Extract what can be extracted deterministically from a message.
+
+    Args:
+        text: User message
+        current_field: Field the assistant last asked for, used to place
+            ambiguous URLs and bare domains
+
+    Returns:
+        LocalExtraction with the fields found and whether they explain the
+        whole message
+    """
+    data: Dict[str, Any] = {}
+    remainder = text
+
+    def consume(pattern: re.Pattern) -> List[re.Match]:
+        nonlocal remainder
+        matches = list(pattern.finditer(remainder))
+        remainder = pattern.sub(" ", remainder)
+        return matches
+
+    # Someone else's phone or email still needs the LLM to place it
+    unresolved = False
+
+    # Emails first so their domains aren't mistaken for URLs
+    for match in consume(EMAIL_RE):
+        if _refers_to_third_party(text, text.find(match.group())):
+            unresolved = True
+        elif "user_email" not in data:
+            data["user_email"] = match.group()
+
+    urls = [_clean_url(m.group()) for m in consume(URL_RE)]
+    if current_field in ("dealershipwebsite_url", "vehicledetailspage_urls"):
+        urls += [_clean_url(m.group()) for m in consume(BARE_DOMAIN_RE)]
+    if urls:
+        if current_field == "vehicledetailspage_urls":
+            vdps, homes = urls, []
+        elif current_field == "dealershipwebsite_url" and len(urls) == 1:
+            vdps, homes = [], urls
+        else:
+            vdps = [u for u in urls if _is_vdp(u)]
+            homes = [u for u in urls if not _is_vdp(u)]
+        if homes:
+            data["dealershipwebsite_url"] = homes[0]
+        if vdps:
+            data["vehicledetailspage_urls"] = list(dict.fromkeys(vdps))
+
+    # Phone-shaped text that can't be normalized still needs the LLM
+    for match in consume(PHONE_RE):
+        phone = normalize_phone(match.group())
+        if phone and _refers_to_third_party(text, text.find(match.group())):
+            unresolved = True
+        elif phone and "user_phone" not in data:
+            data["user_phone"] = phone
+        elif not phone:
+            unresolved = True
+
+    hints: Dict[str, Any] = {}
+    for match in consume(MILES_MAX_RE):
+        hints["miles_max"] = int(_amount(match.group(1), match.group(2)))
+    for match in consume(MILES_MIN_RE):
+        hints["miles_min"] = int(_amount(match.group(1), match.group(2)))
+    for match in consume(PRICE_RANGE_RE):
+        hints["price_min"] = _amount(match.group(1), match.group(2))
+        hints["price_max"] = _amount(match.group(3), match.group(4))
+    for match in consume(PRICE_MAX_RE):
+        hints["price_max"] = _amount(match.group(1), match.group(2))
+    for match in consume(PRICE_MIN_RE):
+        hints["price_min"] = _amount(match.group(1), match.group(2))
+    for match in consume(YEAR_RANGE_RE):
+        hints["year_min"], hints["year_max"] = int(match.group(1)), int(match.group(2))
+    for match in consume(YEAR_MIN_RE):
+        hints["year_min"] = int(match.group(1) or match.group(2))
+    if hints:
+        data["vehiclesearchpreference"] = [hints]
+
+    leftover = [w for w in WORD_RE.findall(remainder) if w.lower() not in FILLER_WORDS]
+    leftover_digits = re.search(r"\d", remainder)
+    fully_explained = bool(data) and not leftover and not leftover_digits and not unresolved
+    return LocalExtraction(data=data, fully_explained=fully_explained)
+
+
+__all__ = ["LocalExtraction", "local_extract", "normalize_phone"]
@@ -0,0 +1,87 @@
+"""
+Precompiled multi-pattern substring matcher (Aho-Corasick).
+
+Keyword checks used to loop over every pattern and run `pattern in text` for
+each one. PatternMatcher compiles all patterns into a single automaton once,
+so a message is scanned in one pass no matter how many patterns there are.
+"""
+import logging
+from collections import deque
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PatternMatcher:
+    """
+    Case-insensitive Aho-Corasick automaton over labelled substring patterns.
+
+    Example:
+        matcher = PatternMatcher([("my customer", 2), ("how does", 1)])
+        matcher.find("How does it work for my customer?")
+        # -> [("my customer", 2), ("how does", 1)]
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Hashable]]):
+        self.patterns: List[Tuple[str, Hashable]] = [(p.lower(), label) for p, label in patterns]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._build()
+
+    def _build(self) -> None:
+        """Build the trie, then the failure links breadth-first."""
+        for index, (pattern, _) in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = nxt
+            self._output[state].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                # Depth-1 states fail back to the root, not to themselves
+                self._fail[nxt] = target if target != nxt else 0
+                self._output[nxt].extend(self._output[self._fail[nxt]])
+
+    def _matched_indices(self, text: str) -> Set[int]:
+        state = 0
+        matched: Set[int] = set()
+        for char in text.lower():
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            matched.update(self._output[state])
+        return matched
+
+    def find(self, text: str) -> List[Tuple[str, Hashable]]:
+        """
+        Find every pattern occurring in the text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Distinct (pattern, label) pairs, in the order the patterns were registered
+        """
+        return [self.patterns[i] for i in sorted(self._matched_indices(text))]
+
+    def labels(self, text: str) -> Set[Hashable]:
+        """Labels of all patterns occurring in the text."""
+        return {self.patterns[i][1] for i in self._matched_indices(text)}
+
+
+__all__ = ["PatternMatcher"]
@@ -0,0 +1,189 @@
+"""
+SimHash fingerprints and a banded LSH index for near-duplicate lookups.
+
+Salespeople reuse the same phrasings with different customers, vehicles and
+numbers ("my customer John wants an SUV" / "my customer Jane wants an SUV").
+normalize_for_similarity() masks those variable parts, simhash() turns the
+result into a 64-bit locality-sensitive fingerprint, and SimHashIndex finds a
+stored fingerprint within a Hamming distance without scanning every entry:
+fingerprints are split into bands, and by the pigeonhole principle any
+neighbour within `max_distance < bands` bits shares at least one band exactly.
+"""
+import re
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+
+URL_RE = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")
+NUMBER_RE = re.compile(r"[$]?\d[\d,.\-/()]*[kK]?")
+TOKEN_RE = re.compile(r"<\w+>|[\w']+")
+# Capitalized word that does not start a sentence - most likely a name
+NAME_RE = re.compile(r"(?<![.!?]\s)(?<!^)\b[A-Z][a-z]+\b")
+# Capitalized words that carry meaning and must not be masked as names
+UNMASKED_WORDS = {"Drift"}
+
+
+def normalize_for_similarity(text: str) -> str:
+    """
+    Mask URLs, emails, numbers and names, then lowercase.
+
+    Args:
+        text: Raw user message
+
+    Returns:
+        Normalized message, e.g. "my customer <name> wants <num> suvs"
+    """
+    text = URL_RE.sub(" <url> ", text)
+    text = EMAIL_RE.sub(" <email> ", text)
+    text = NUMBER_RE.sub(" <num> ", text)
+    text = NAME_RE.sub(lambda m: m.group() if m.group() in UNMASKED_WORDS else "<name>", text.strip())
+    return " ".join(TOKEN_RE.findall(text.lower()))
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash over word unigrams and bigrams of an already-normalized text.
+
+    Args:
+        text: Normalized message (see normalize_for_similarity)
+
+    Returns:
+        Fingerprint as an int
+    """
+    tokens = text.split()
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """
+    Bounded LRU + TTL map from SimHash fingerprints to values, with banded LSH lookup.
+
+    Keys are (namespace, fingerprint) so callers can keep separate neighbourhoods
+    (e.g. per incoming workflow) in one index.
+    """
+
+    def __init__(self, max_distance: int = 3, bands: int = 8, maxsize: int = 1000, ttl: float = 3600):
+        if FINGERPRINT_BITS % bands:
+            raise ValueError(f"bands must divide {FINGERPRINT_BITS}")
+        if max_distance >= bands:
+            raise ValueError("max_distance must be smaller than the number of bands")
+        self.max_distance = max_distance
+        self.bands = bands
+        self.band_bits = FINGERPRINT_BITS // bands
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Hashable, int], Tuple[float, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[Hashable, int, int], Set[int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _band_keys(self, namespace: Hashable, fingerprint: int) -> List[Tuple[Hashable, int, int]]:
+        mask = (1 << self.band_bits) - 1
+        return [
+            (namespace, band, fingerprint >> (band * self.band_bits) & mask)
+            for band in range(self.bands)
+        ]
+
+    def _remove(self, key: Tuple[Hashable, int]) -> None:
+        namespace, fingerprint = key
+        self._entries.pop(key, None)
+        for band_key in self._band_keys(namespace, fingerprint):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def add(self, fingerprint: int, value: Any, namespace: Hashable = None) -> None:
+        """Store a value under a fingerprint, evicting the least recently used entry if full."""
+        key = (namespace, fingerprint)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        else:
+            for band_key in self._band_keys(namespace, fingerprint):
+                self._buckets.setdefault(band_key, set()).add(fingerprint)
+        self._entries[key] = (time.monotonic(), value)
+
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def lookup(self, fingerprint: int, namespace: Hashable = None) -> Optional[Tuple[Any, int]]:
+        """
+        Find the nearest stored fingerprint within max_distance.
+
+        Args:
+            fingerprint: Query fingerprint
+            namespace: Neighbourhood to search
+
+        Returns:
+            Tuple of (value, Hamming distance), or None on a miss
+        """
+        now = time.monotonic()
+        candidates: Set[int] = set()
+        for band_key in self._band_keys(namespace, fingerprint):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best: Optional[Tuple[int, int]] = None
+        for candidate in candidates:
+            distance = hamming_distance(fingerprint, candidate)
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                key = (namespace, candidate)
+                stored_at, _ = self._entries[key]
+                if now - stored_at > self.ttl:
+                    self._remove(key)
+                    continue
+                best = (distance, candidate)
+
+        if best is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        key = (namespace, best[1])
+        self._entries.move_to_end(key)
+        return self._entries[key][1], best[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the index counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "max_distance": self.max_distance,
+            "bands": self.bands,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+__all__ = ["normalize_for_similarity", "simhash", "hamming_distance", "SimHashIndex"]
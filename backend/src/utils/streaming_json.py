@@ -0,0 +1,110 @@
+"""
+Incremental JSON parsing for streamed LLM output.
+
+The extraction LLM answers with a single JSON object, optionally wrapped in a
+markdown code fence. When the response is streamed token by token, this parser
+reports every top-level member of that object as soon as its value is closed,
+instead of waiting for the whole document and calling json.loads once.
+"""
+import json
+import logging
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalJSONObjectParser:
+    """
+    Streaming parser for a single top-level JSON object.
+
+    Feed it text chunks as they arrive; each call returns the (key, value)
+    pairs whose values were completed by that chunk. Anything before the
+    opening brace (e.g. a ```json fence) and after the closing brace is ignored.
+
+    Example:
+        parser = IncrementalJSONObjectParser()
+        parser.feed('```json\\n{"shopper_name": "Al')   # -> []
+        parser.feed('lie", "user_phone": "555"')        # -> [("shopper_name", "Allie")]
+        parser.feed('}\\n```')                           # -> [("user_phone", "555")]
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = None
+        self.started = False
+        self.complete = False
+        self.result: Dict[str, Any] = {}
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Consume the next chunk of streamed text.
+
+        Args:
+            text: Newly received text
+
+        Returns:
+            List of (key, value) pairs completed by this chunk, in document order
+        """
+        if self.complete or not text:
+            return []
+
+        self._buffer += text
+        completed: List[Tuple[str, Any]] = []
+
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._close_member(self._pos))
+                    self.complete = True
+                    self._pos += 1
+                    break
+            elif char == "," and self._depth == 1:
+                completed.extend(self._close_member(self._pos))
+                self._member_start = self._pos + 1
+
+            self._pos += 1
+
+        return completed
+
+    def _close_member(self, end: int) -> List[Tuple[str, Any]]:
+        """Parse the `"key": value` text between the last separator and `end`."""
+        member = self._buffer[self._member_start:end].strip()
+        if not member:
+            return []
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping unparseable streamed JSON member: {member[:100]} ({e})")
+            return []
+
+        self.result.update(parsed)
+        return list(parsed.items())
+
+
+__all__ = ["IncrementalJSONObjectParser"]
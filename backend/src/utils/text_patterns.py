@@ -0,0 +1,112 @@
+"""
+Cheap regex checks for whether a message answers a collection question.
+
+Used by the sticky-workflow fast path: when the salesperson is just replying
+to the next_field question (a phone number, a URL, a name), the message does
+not need to go back through intent detection. The looser FIELD_CUES decide
+which fields the pruned extraction prompt has to describe.
+"""
+import re
+from typing import Callable, Dict, List
+
+URL_RE = re.compile(r"(?:https?://|www\.)\S+|\b[\w-]+(?:\.[\w-]+)*\.(?:com|net|org|us|ca|auto|cars|dealer|biz|co)\b", re.IGNORECASE)
+EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b")
+PHONE_RE = re.compile(r"(?:\+?\d[\s.\-()]*){7,15}")
+NAME_RE = re.compile(r"^(?:(?:my|his|her|their|the customer'?s?|customer'?s?) name is |it'?s |i'?m |this is )?(?P<name>[A-Za-z][A-Za-z'.\-]*(?: [A-Za-z][A-Za-z'.\-]*){0,3})[.!]?$", re.IGNORECASE)
+# Words that make a short alphabetic phrase a sentence rather than a name
+NAME_STOP_WORDS = {
+    "a", "an", "the", "and", "or", "but", "not", "no", "yes", "to", "of", "for", "with", "about",
+    "i", "me", "my", "you", "your", "we", "us", "it", "this", "that", "these", "those", "there",
+    "is", "are", "was", "be", "do", "does", "did", "have", "has", "can", "could", "would", "should",
+    "want", "wants", "need", "needs", "like", "let", "lets", "let's", "go", "get", "make", "help",
+    "switch", "change", "cancel", "stop", "forget", "nevermind", "never", "mind", "actually", "please",
+    "instead", "new", "question", "later", "now", "again", "back", "over", "else", "something",
+    "showroom", "personal", "customer", "shopper", "workflow", "ok", "okay", "sure", "thanks"
+}
+GENDER_RE = re.compile(r"\b(?:he|him|his|she|her|man|woman|male|female|guy|lady)\b", re.IGNORECASE)
+AGE_RE = re.compile(r"\b(?:[2-8]0'?s|[1-9]\d)\b|\b(?:twenties|thirties|forties|fifties|sixties|seventies|eighties)\b", re.IGNORECASE)
+VEHICLE_RE = re.compile(
+    r"\b(?:19|20)\d{2}\b|\$\s?\d|\b\d+\s?k\b|\b(?:suv|sedan|truck|pickup|coupe|convertible|minivan|van|"
+    r"hatchback|wagon|crossover|ev|hybrid|electric|new|used|certified|cpo|"
+    r"acura|audi|bmw|buick|cadillac|chevy|chevrolet|chrysler|dodge|ford|gmc|honda|hyundai|infiniti|jeep|"
+    r"kia|lexus|lincoln|mazda|mercedes|nissan|ram|subaru|tesla|toyota|volkswagen|vw|volvo)\b",
+    re.IGNORECASE
+)
+QUESTION_RE = re.compile(r"\?\s*$|^(?:how|what|why|when|where|who|which|can|could|does|do|is|are)\b", re.IGNORECASE)
+
+# Field -> check that the message contains a plausible value for it
+FIELD_ANSWER_CHECKS: Dict[str, Callable[[str], bool]] = {
+    "dealershipwebsite_url": lambda text: bool(URL_RE.search(text)),
+    "vehicledetailspage_urls": lambda text: bool(URL_RE.search(text)),
+    "user_phone": lambda text: bool(PHONE_RE.search(text)),
+    "user_email": lambda text: bool(EMAIL_RE.search(text)),
+    "shopper_name": lambda text: looks_like_name(text),
+    "user_name": lambda text: looks_like_name(text),
+    "gender_descriptor": lambda text: bool(GENDER_RE.search(text)),
+    "age_descriptor": lambda text: bool(AGE_RE.search(text)),
+    "vehiclesearchpreference": lambda text: bool(VEHICLE_RE.search(text))
+    # shopper_notes is free text with no recognizable shape, so notes always
+    # go through intent detection
+}
+
+
+# Field -> cue that the message may carry a value for it (looser than the answer checks)
+FIELD_CUES: Dict[str, re.Pattern] = {
+    "dealershipwebsite_url": URL_RE,
+    "vehicledetailspage_urls": URL_RE,
+    "user_phone": re.compile(r"\d{3}\D{0,2}\d{4}|\b(?:phone|cell|number|call|text)\b", re.IGNORECASE),
+    "user_email": re.compile(r"@|\be-?mail\b", re.IGNORECASE),
+    "shopper_name": re.compile(r"\b(?:name|named|called|for|customer|client|shopper)\b", re.IGNORECASE),
+    "user_name": re.compile(r"\b(?:name|i'?m|i am|this is|me)\b", re.IGNORECASE),
+    "gender_descriptor": GENDER_RE,
+    "age_descriptor": re.compile(AGE_RE.pattern + r"|\b(?:age|aged|old|young|older|younger|retired)\b", re.IGNORECASE),
+    "vehiclesearchpreference": VEHICLE_RE,
+    "shopper_notes": re.compile(
+        r"\b(?:kids?|child|children|family|wife|husband|married|dog|cat|pets?|likes?|loves?|enjoys?|"
+        r"lives?|works?|commutes?|hobby|hobbies|job|retired|student|location)\b",
+        re.IGNORECASE
+    )
+}
+
+
+def looks_like_name(text: str) -> bool:
+    """Whether a message is just a person's name (optionally "my name is ..." / "it's ...")."""
+    match = NAME_RE.match(text.strip())
+    if not match:
+        return False
+    words = match.group("name").lower().replace(".", " ").split()
+    return not any(word in NAME_STOP_WORDS for word in words)
+
+
+def plausible_fields(text: str) -> List[str]:
+    """Fields the message plausibly carries a value for, based on FIELD_CUES."""
+    without_emails = EMAIL_RE.sub(" @ ", text)
+    return [field for field, cue in FIELD_CUES.items() if cue.search(without_emails)]
+
+
+def is_question(text: str) -> bool:
+    """Whether the message reads as a question rather than an answer."""
+    return bool(QUESTION_RE.search(text.strip()))
+
+
+def looks_like_field_answer(text: str, field: str) -> bool:
+    """
+    Whether a message looks like an answer to the question for `field`.
+
+    Args:
+        text: User message
+        field: Field the assistant asked for (ConversationState.current_field)
+
+    Returns:
+        True if the message is not a question and contains a plausible value
+    """
+    check = FIELD_ANSWER_CHECKS.get(field)
+    if check is None or not text.strip() or is_question(text):
+        return False
+    return check(text)
+
+
+__all__ = [
+    "FIELD_ANSWER_CHECKS", "FIELD_CUES", "looks_like_name", "plausible_fields", "is_question",
+    "looks_like_field_answer"
+]
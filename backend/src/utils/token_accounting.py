@@ -0,0 +1,277 @@
+"""
+Per-call token accounting, per-node input budgets and cost estimates.
+
+Every LLM call records its prompt and completion tokens on
+ConversationState.token_usage (per node and in total) and in the logs.
+Provider-reported usage is used when the result carries it, otherwise tokens
+are counted with tiktoken (see tokens.py).
+
+Each node has an input budget (TOKEN_BUDGET_<NODE>, e.g.
+TOKEN_BUDGET_DATA_COLLECTION=4000). When a call would exceed it, the
+collected_data JSON and then the user message are trimmed to fit - except for
+data collection, which never trims the message it extracts from and switches
+to chunked extraction instead.
+"""
+import os
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .tokens import count_tokens, encode, get_encoding
+from ..prompts.registry import get_prompt_registry
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens: (input, output)
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40)
+}
+
+# Default input budgets (prompt tokens per call) by node
+DEFAULT_NODE_BUDGETS: Dict[str, int] = {
+    "intent_detection": 2000,
+    "data_collection": 4000,
+    "shopper_showroom": 3000,
+    "personal_showroom": 3000,
+    "general_workflow": 2000,
+    "response_generation": 2000,
+    "ui_generation": 3000
+}
+
+# Tokens added per chat message by the chat format, plus reply priming
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+TRUNCATION_MARKER = " ...[truncated]"
+
+
+def node_budget(node: str) -> int:
+    """Input token budget for a node (TOKEN_BUDGET_<NODE>, falling back to the default)."""
+    default = DEFAULT_NODE_BUDGETS.get(node, 4000)
+    return int(os.getenv(f"TOKEN_BUDGET_{node.upper()}", str(default)))
+
+
+def _content(message: Any) -> str:
+    content = message.get("content", "") if isinstance(message, dict) else getattr(message, "content", message)
+    if isinstance(content, list):
+        content = " ".join(str(x) for x in content)
+    return str(content)
+
+
+def messages_tokens(messages: Iterable[Any], model: Optional[str] = None) -> int:
+    """
+    Prompt tokens for a list of chat messages (dicts or LangChain messages).
+
+    Args:
+        messages: Messages sent to the model
+        model: Model whose tokenizer to use
+
+    Returns:
+        Token count including the per-message chat overhead
+    """
+    return sum(count_tokens(_content(m), model) + MESSAGE_OVERHEAD_TOKENS for m in messages) + REPLY_PRIMING_TOKENS
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call (0.0 for models without pricing)."""
+    input_price, output_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def trim_text(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """
+    Cut `text` to at most `max_tokens` tokens, marking the cut.
+
+    Args:
+        text: Text to trim
+        max_tokens: Token limit
+        model: Model whose tokenizer to use
+
+    Returns:
+        The text unchanged if it fits, otherwise its head plus a truncation marker
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    keep = max(max_tokens - count_tokens(TRUNCATION_MARKER, model), 0)
+    tokens = encode(text, model)
+    if tokens is not None:
+        head = get_encoding(model).decode(list(tokens[:keep]))
+    else:
+        head = text[:keep * 4]
+    return head + TRUNCATION_MARKER
+
+
+def trim_collected_data(data: Dict[str, Any], max_tokens: int, model: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Shrink collected_data until its JSON fits in `max_tokens`.
+
+    Long strings are cut first (halving the per-string limit each round), then
+    lists are cut to their first items. As a last resort only the field names
+    are kept.
+
+    Args:
+        data: Collected data
+        max_tokens: Token limit for json.dumps(data, indent=2)
+        model: Model whose tokenizer to use
+
+    Returns:
+        The data unchanged if it fits, otherwise a trimmed copy
+    """
+    def size(value: Dict[str, Any]) -> int:
+        return count_tokens(json.dumps(value, indent=2), model)
+
+    if size(data) <= max_tokens:
+        return data
+
+    def shrink(value: Any, string_limit: int, list_limit: int) -> Any:
+        if isinstance(value, str):
+            return trim_text(value, string_limit, model)
+        if isinstance(value, list):
+            return [shrink(v, string_limit, list_limit) for v in value[:list_limit]]
+        if isinstance(value, dict):
+            return {k: shrink(v, string_limit, list_limit) for k, v in value.items()}
+        return value
+
+    string_limit, list_limit = 256, 8
+    while string_limit >= 8:
+        trimmed = {k: shrink(v, string_limit, list_limit) for k, v in data.items()}
+        if size(trimmed) <= max_tokens:
+            return trimmed
+        string_limit //= 2
+        list_limit = max(list_limit // 2, 1)
+    return {key: "...[truncated]" for key in data}
+
+
+def apply_input_budget(
+    node: str,
+    fixed_tokens: int,
+    user_query: str,
+    collected_data: Optional[Dict[str, Any]] = None,
+    model: Optional[str] = None
+) -> Tuple[str, Optional[Dict[str, Any]], bool]:
+    """
+    Fit the variable parts of a node's prompt into its input budget.
+
+    collected_data may use up to half of what the fixed prompt leaves; the
+    user message gets the rest.
+
+    Args:
+        node: Node name (selects the budget)
+        fixed_tokens: Tokens of everything else in the prompt
+        user_query: User message
+        collected_data: Collected data embedded in the prompt, if any
+        model: Model whose tokenizer to use
+
+    Returns:
+        Tuple of (user_query, collected_data, whether anything was trimmed)
+    """
+    available = max(node_budget(node) - fixed_tokens, 0)
+    trimmed = False
+    if collected_data:
+        data_tokens = count_tokens(json.dumps(collected_data, indent=2), model)
+        query_tokens = count_tokens(user_query, model)
+        if data_tokens + query_tokens > available:
+            fitted = trim_collected_data(collected_data, max(available // 2, available - query_tokens), model)
+            trimmed = fitted is not collected_data
+            collected_data = fitted
+        available -= count_tokens(json.dumps(collected_data, indent=2), model)
+    fitted_query = trim_text(user_query, max(available, 0), model)
+    if fitted_query != user_query or trimmed:
+        logger.warning(f"Trimmed {node} input to fit its {node_budget(node)}-token budget")
+        return fitted_query, collected_data, True
+    return user_query, collected_data, False
+
+
+def _reported_usage(result: Any) -> Optional[Tuple[int, int]]:
+    """(input, output) tokens reported by the provider on a LangChain or OpenAI result."""
+    metadata = getattr(result, "usage_metadata", None)
+    if metadata:
+        return metadata.get("input_tokens", 0), metadata.get("output_tokens", 0)
+    usage = getattr(result, "usage", None)
+    if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+        return usage.prompt_tokens, usage.completion_tokens or 0
+    return None
+
+
+def record_llm_call(
+    state: Any,
+    node: str,
+    model: str,
+    messages: Iterable[Any],
+    result: Any = None,
+    completion_text: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Record one LLM call's tokens and cost on the state and in the logs.
+
+    Args:
+        state: ConversationState (token_usage is updated in place); None to only log
+        node: Node that made the call
+        model: Model name
+        messages: Messages sent
+        result: LLM result, used for provider-reported usage
+        completion_text: Completion text, counted when the result carries no usage
+
+    Returns:
+        The recorded call ({"prompt_tokens", "completion_tokens", "cost_usd"})
+    """
+    messages = list(messages)
+    reported = _reported_usage(result) if result is not None else None
+    if reported is not None:
+        prompt_tokens, completion_tokens = reported
+    else:
+        prompt_tokens = messages_tokens(messages, model)
+        if completion_text is None and result is not None:
+            completion_text = _content(result) if hasattr(result, "content") else (
+                result.model_dump_json() if hasattr(result, "model_dump_json") else json.dumps(result, default=str)
+            )
+        completion_tokens = count_tokens(completion_text, model) if completion_text else 0
+    cost = estimate_cost(model, prompt_tokens, completion_tokens)
+    call = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "cost_usd": cost}
+
+    # Tie the call to the prompt template version it was sent with
+    version = get_prompt_registry().version_for(_content(messages[0])) if messages else None
+    logger.info(
+        f"LLM call {node} ({model}{f', prompt {version}' if version else ''}): "
+        f"{prompt_tokens} prompt + {completion_tokens} completion tokens, ${cost:.6f}"
+    )
+    if state is not None:
+        usage = state.token_usage
+        nodes = usage.setdefault("nodes", {})
+        entry = nodes.setdefault(node, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0})
+        entry["calls"] += 1
+        for key, value in (("prompt_tokens", prompt_tokens), ("completion_tokens", completion_tokens), ("cost_usd", cost)):
+            entry[key] += value
+            usage[key] = usage.get(key, 0) + value
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    return call
+
+
+def log_token_usage(token_usage: Dict[str, Any], label: str) -> None:
+    """Log the per-message token and cost totals."""
+    if not token_usage:
+        return
+    per_node = ", ".join(
+        f"{node}={entry['prompt_tokens']}+{entry['completion_tokens']}"
+        for node, entry in token_usage.get("nodes", {}).items()
+    )
+    logger.info(
+        f"Token usage for {label}: {token_usage.get('total_tokens', 0)} tokens "
+        f"(${token_usage.get('cost_usd', 0.0):.6f}) [{per_node}]"
+    )
+
+
+__all__ = [
+    "MODEL_PRICING",
+    "node_budget",
+    "messages_tokens",
+    "estimate_cost",
+    "trim_text",
+    "trim_collected_data",
+    "apply_input_budget",
+    "record_llm_call",
+    "log_token_usage"
+]
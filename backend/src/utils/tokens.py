@@ -0,0 +1,65 @@
+"""
+Token counting for prompts and completions.
+
+Uses tiktoken when its encoding can be loaded (tiktoken downloads the BPE files
+on first use, so air-gapped deployments should set TIKTOKEN_CACHE_DIR). When no
+encoding is available, counts fall back to a ~4 characters per token estimate.
+"""
+import logging
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=8)
+def get_encoding(model: Optional[str] = None) -> Optional[Any]:
+    """
+    Return the tiktoken encoding for a model, loaded once per process.
+
+    Args:
+        model: Model name (e.g. "gpt-4o-mini"); non-OpenAI models use DEFAULT_ENCODING
+
+    Returns:
+        tiktoken Encoding, or None if tiktoken or its BPE files are unavailable
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating token counts: {str(e)}")
+        return None
+
+
+def encode(text: str, model: Optional[str] = None) -> Optional[Sequence[int]]:
+    """Token ids for `text`, or None if no encoding is available."""
+    encoding = get_encoding(model)
+    return encoding.encode(text) if encoding is not None else None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count the tokens in `text`.
+
+    Args:
+        text: Text to count
+        model: Model whose tokenizer to use
+
+    Returns:
+        Exact count with tiktoken, otherwise an estimate
+    """
+    tokens = encode(text, model)
+    if tokens is not None:
+        return len(tokens)
+    return max(1, len(text) // 4) if text else 0
+
+
+__all__ = ["get_encoding", "encode", "count_tokens"]
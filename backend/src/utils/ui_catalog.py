@@ -0,0 +1,188 @@
+"""
+Deterministic field -> UI component catalog.
+
+The ENFORCED RULES in get_ui_generation_prompt already fix which component
+each kind of field gets (render_input for names/emails/URLs, render_textarea
+for notes, render_vehicle_preferences_form for preferences, ...). This module
+applies those rules ahead of time: it is built once at startup from
+FIELD_SPECIFICATIONS and generate_jsx_for_tool, so known fields get their JSX
+without a GPT tool call. Values already in collected_data are injected as
+pre-fill at render time. Fields outside the catalog still go to the LLM.
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from ..config.field_specifications import FIELD_SPECIFICATIONS, WORKFLOW_SPEC_KEYS
+from .ui_tools import generate_jsx_for_tool
+
+logger = logging.getLogger(__name__)
+
+# Choices for inferred descriptors (must match validation.py)
+GENDER_OPTIONS = ["man", "woman"]
+AGE_OPTIONS = ["20s", "30s", "40s", "50s", "60s", "70s", "80s"]
+
+# Placeholders for text inputs
+PLACEHOLDERS = {
+    "dealershipwebsite_url": "https://www.yourdealership.com",
+    "vehicledetailspage_urls": "https://www.yourdealership.com/inventory/...",
+    "shopper_name": "Customer's full name",
+    "user_name": "Your full name",
+    "user_phone": "(555) 123-4567",
+    "user_email": "you@yourdealership.com",
+    "shopper_notes": "Lifestyle, family, interests, location..."
+}
+
+
+def _wrap(jsx: str) -> str:
+    """Wrap component JSX in the same container generate_ui_jsx uses."""
+    return f"""<div className="ui-generated-form space-y-4">
+{jsx}
+</div>"""
+
+
+def _escape(value: Any) -> str:
+    """Escape a pre-fill value for use inside a double-quoted JSX attribute."""
+    return str(value).replace("&", "&amp;").replace('"', "&quot;")
+
+
+def _tool_for_field(field: str, field_type: str, label: str, required: bool) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Map a field to its tool call following the ENFORCED RULES.
+
+    Returns:
+        Tuple of (tool name, tool args), or None if no rule applies
+    """
+    if field == "vehiclesearchpreference":
+        return "render_vehicle_preferences_form", {
+            "vehicleCount": 1,
+            "currentData": {},
+            "showAddButton": True
+        }
+    if field == "gender_descriptor":
+        return "render_select", {
+            "name": field,
+            "label": label,
+            "options": [{"value": v, "label": v.capitalize()} for v in GENDER_OPTIONS]
+        }
+    if field == "age_descriptor":
+        return "render_select", {
+            "name": field,
+            "label": label,
+            "options": [{"value": v, "label": v} for v in AGE_OPTIONS]
+        }
+    if field.endswith("_notes"):
+        return "render_textarea", {
+            "name": field,
+            "label": label,
+            "placeholder": PLACEHOLDERS.get(field, "")
+        }
+    if field_type == "array":
+        return "render_array_input", {
+            "name": field,
+            "label": label,
+            "itemType": "url" if field.endswith("_urls") else "text",
+            "placeholder": PLACEHOLDERS.get(field, "")
+        }
+    if field_type == "string":
+        if field.endswith("_url"):
+            input_type = "url"
+        elif field.endswith("_email"):
+            input_type = "email"
+        elif field.endswith("_phone"):
+            input_type = "tel"
+        else:
+            input_type = "text"
+        return "render_input", {
+            "name": field,
+            "type": input_type,
+            "label": label,
+            "placeholder": PLACEHOLDERS.get(field, ""),
+            "required": required
+        }
+    return None
+
+
+class UICatalog:
+    """
+    Precomputed JSX for every known (workflow_id, field) pair.
+
+    Entries keep the tool name and arguments next to the pre-rendered JSX,
+    so a field with a value in collected_data can be re-rendered with
+    pre-fill without going back to the LLM.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Tuple[int, str], Dict[str, Any]] = {}
+
+    def build(self) -> "UICatalog":
+        """Populate the catalog from FIELD_SPECIFICATIONS."""
+        for workflow_id, spec_key in WORKFLOW_SPEC_KEYS.items():
+            spec = FIELD_SPECIFICATIONS[spec_key]
+            required_fields = set(spec.get("required_fields", []))
+            for group in spec.get("conditional_required", []):
+                required_fields.update(group)
+
+            for field, field_type in spec["field_types"].items():
+                label = spec["field_descriptions"].get(field, field).replace(" (optional)", "")
+                tool = _tool_for_field(field, field_type, label, field in required_fields)
+                if tool is None:
+                    continue
+                tool_name, args = tool
+                self._entries[(workflow_id, field)] = {
+                    "tool_name": tool_name,
+                    "args": args,
+                    "jsx": _wrap(generate_jsx_for_tool(tool_name, args))
+                }
+
+        logger.info(f"UI catalog built with {len(self._entries)} field components")
+        return self
+
+    def __contains__(self, key: Tuple[int, str]) -> bool:
+        return key in self._entries
+
+    def render(self, workflow_id: int, field: str, collected_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Render the JSX for a field, pre-filled from collected_data.
+
+        Args:
+            workflow_id: Current workflow ID
+            field: Field the form should collect
+            collected_data: Data collected so far
+
+        Returns:
+            Wrapped JSX, or None if the field is not in the catalog
+        """
+        entry = self._entries.get((workflow_id, field))
+        if entry is None:
+            return None
+
+        value = (collected_data or {}).get(field)
+        if not value:
+            return entry["jsx"]
+
+        args = dict(entry["args"])
+        tool_name = entry["tool_name"]
+        if tool_name == "render_vehicle_preferences_form":
+            preferences = value if isinstance(value, list) else [value]
+            args["currentData"] = {field: preferences}
+            args["vehicleCount"] = max(1, len(preferences))
+        elif tool_name == "render_array_input":
+            # An expression prop serialized as JSON; entities would reach the form verbatim
+            args["defaultValue"] = [str(v) for v in (value if isinstance(value, list) else [value])]
+        else:
+            args["defaultValue"] = _escape(value)
+        return _wrap(generate_jsx_for_tool(tool_name, args))
+
+
+_ui_catalog: Optional[UICatalog] = None
+
+
+def get_ui_catalog() -> UICatalog:
+    """Return the process-wide UI catalog, building it on first use."""
+    global _ui_catalog
+    if _ui_catalog is None:
+        _ui_catalog = UICatalog().build()
+    return _ui_catalog
+
+
+__all__ = ["UICatalog", "get_ui_catalog"]
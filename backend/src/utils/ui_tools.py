@@ -6,8 +6,17 @@ UI components dynamically based on the data collection requirements.
 """
 
 import json
+import logging
 from typing import List, Dict, Any, Optional
 
+from .llm_clients import get_llm_clients
+from .token_accounting import apply_input_budget, record_llm_call
+from .tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+UI_MODEL = "gpt-3.5-turbo"  # Tool calls for fields outside the UI catalog
+
 # Drift brand color
 DRIFT_THEME_COLOR = "#fe3500"
 
@@ -343,6 +352,16 @@ def create_ui_tools() -> List[Dict[str, Any]]:
     ]
 
 
+def _expression(value: Any, **kwargs) -> str:
+    """
+    Serialize a value for a JSX expression prop ({...}).
+
+    JSON is already a valid JS literal, so only "</" is escaped, keeping the
+    JSX safe to embed in HTML. Entity escaping is for quoted attributes only.
+    """
+    return json.dumps(value, **kwargs).replace("</", "<\\/")
+
+
 def generate_jsx_for_tool(tool_name: str, args: Dict[str, Any]) -> str:
     """
     Generate JSX string for a specific tool call.
@@ -355,7 +374,7 @@ def generate_jsx_for_tool(tool_name: str, args: Dict[str, Any]) -> str:
   label="{args.get('label')}"
   min={{{args.get('min')}}}
   max={{{args.get('max')}}}
-  defaultValue={{{json.dumps(args.get('defaultValue', [args.get('min'), args.get('max')])}}}
+  defaultValue={{{_expression(args.get('defaultValue', [args.get('min'), args.get('max')]))}}}
   step={{{args.get('step', 1)}}}
   className="w-full"
   style={{{{ "--primary": "{DRIFT_THEME_COLOR}" }}}}
@@ -381,8 +400,8 @@ def generate_jsx_for_tool(tool_name: str, args: Dict[str, Any]) -> str:
         return f"""<MultiSelect
   name="{args.get('name')}"
   label="{args.get('label')}"
-  options={{{json.dumps(args.get('options', []))}}}
-  defaultValue={{{json.dumps(args.get('defaultValue', []))}}}
+  options={{{_expression(args.get('options', []))}}}
+  defaultValue={{{_expression(args.get('defaultValue', []))}}}
   maxSelections={{{args.get('maxSelections', 'undefined')}}}
   className="w-full"
   style={{{{ "--primary": "{DRIFT_THEME_COLOR}" }}}}
@@ -414,7 +433,7 @@ def generate_jsx_for_tool(tool_name: str, args: Dict[str, Any]) -> str:
     elif tool_name == "render_vehicle_preferences_form":
         return f"""<VehiclePreferencesForm
   vehicleCount={{{args.get('vehicleCount', 1)}}}
-  currentData={{{json.dumps(args.get('currentData', {}))}}}
+  currentData={{{_expression(args.get('currentData', {}))}}}
   showAddButton={{{str(args.get('showAddButton', True)).lower()}}}
   themeColor="{DRIFT_THEME_COLOR}"
 />"""
@@ -425,13 +444,13 @@ def generate_jsx_for_tool(tool_name: str, args: Dict[str, Any]) -> str:
   label="{args.get('label')}"
   itemType="{args.get('itemType', 'text')}"
   placeholder="{args.get('placeholder', '')}"
-  defaultValue={{{json.dumps(args.get('defaultValue', []))}}}
+  defaultValue={{{_expression(args.get('defaultValue', []))}}}
   className="w-full"
   style={{{{ "--primary": "{DRIFT_THEME_COLOR}" }}}}
 />"""
 
     elif tool_name == "render_vehicle_cards_slider":
-        vehicles_jsx = json.dumps(args.get('vehicles', []), indent=2)
+        vehicles_jsx = _expression(args.get('vehicles', []), indent=2)
         return f"""<VehicleCardsSlider
   vehicles={{{vehicles_jsx}}}
   title="{args.get('title', 'Vehicle Results')}"
@@ -443,7 +462,7 @@ def generate_jsx_for_tool(tool_name: str, args: Dict[str, Any]) -> str:
   title="{args.get('title')}"
   description="{args.get('description', '')}"
   submitLabel="{args.get('submitLabel', 'Submit')}"
-  fields={{{json.dumps(args.get('fields', []))}}}
+  fields={{{_expression(args.get('fields', []))}}}
   themeColor="{DRIFT_THEME_COLOR}"
   onSubmit={{(data) => handleFormSubmit(data)}}
 />"""
@@ -477,4 +496,74 @@ Based on the current field and context, generate the appropriate UI component(s)
 If multiple fields need collection, use render_form to wrap them.
 Always maintain the brand theme color in all components."""
 
-    return base_prompt
\ No newline at end of file
+    return base_prompt
+
+
+async def generate_ui_jsx(
+    current_field: str,
+    collected_data: Dict[str, Any],
+    workflow_id: int,
+    state: Any = None
+) -> Optional[str]:
+    """
+    Generate the JSX form for collecting the current field.
+    
+    Fields in the deterministic UI catalog are rendered without an LLM call;
+    anything else goes through OpenAI tool calls. Only depends on the field,
+    the collected data and the workflow, so the workflow nodes can run it
+    concurrently with the response-text call.
+    
+    Args:
+        current_field: Field the form should collect
+        collected_data: Data collected so far (for pre-filling)
+        workflow_id: Current workflow ID
+        state: Conversation state to record token usage on
+        
+    Returns:
+        JSX wrapped in the ui-generated-form container, or None if no tool was called
+    """
+    # Known fields map to a fixed component - no need to ask the LLM
+    from .ui_catalog import get_ui_catalog
+    catalog_jsx = get_ui_catalog().render(workflow_id, current_field, collected_data)
+    if catalog_jsx is not None:
+        logger.info(f"Rendered UI for {current_field} from catalog")
+        return catalog_jsx
+    
+    openai_client = get_llm_clients().openai()
+    
+    # Get UI generation prompt and tools, with collected_data trimmed to the input budget
+    base_tokens = count_tokens(get_ui_generation_prompt(current_field, {}, workflow_id), UI_MODEL)
+    _, collected_data, _ = apply_input_budget("ui_generation", base_tokens, "", collected_data, model=UI_MODEL)
+    ui_prompt = get_ui_generation_prompt(current_field, collected_data, workflow_id)
+    messages = [
+        {"role": "system", "content": ui_prompt},
+        {"role": "user", "content": f"Generate UI for collecting: {current_field}"}
+    ]
+    
+    # Create the completion with tools
+    completion = await openai_client.chat.completions.create(
+        model=UI_MODEL,
+        messages=messages,
+        tools=create_ui_tools(),
+        tool_choice="auto",
+        temperature=0.3
+    )
+    record_llm_call(state, "ui_generation", UI_MODEL, messages, completion)
+    
+    # Process tool calls and generate JSX
+    ui_components = []
+    if completion.choices[0].message.tool_calls:
+        for tool_call in completion.choices[0].message.tool_calls:
+            tool_name = tool_call.function.name
+            tool_args = json.loads(tool_call.function.arguments)
+            jsx = generate_jsx_for_tool(tool_name, tool_args)
+            ui_components.append(jsx)
+    
+    if not ui_components:
+        return None
+    
+    ui_jsx = "\n".join(ui_components)
+    # Wrap in a container div
+    return f"""<div className="ui-generated-form space-y-4">
+{ui_jsx}
+</div>"""
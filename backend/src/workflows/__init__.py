@@ -19,7 +19,7 @@ with the existing Xano backend APIs.
 from .routing import create_chat_workflow, route_after_data_collection
 
 # Import workflow nodes
-from .intent_detection import intent_detection_node, route_by_intent
+from .intent_detection import intent_detection_node, route_by_intent, route_at_entry, sticky_workflow_node
 from .data_collection import data_collection_node
 from .general_workflow import general_workflow_node
 from .shopper_showroom_workflow import shopper_showroom_workflow_node
@@ -33,9 +33,11 @@ __all__ = [
     # Routing functions
     'route_after_data_collection',
     'route_by_intent',
+    'route_at_entry',
     
     # Workflow nodes
     'intent_detection_node',
+    'sticky_workflow_node',
     'data_collection_node', 
     'general_workflow_node',
     'shopper_showroom_workflow_node',
@@ -0,0 +1,185 @@
+"""
+Map-reduce extraction for very long messages.
+
+Pasted inventory listings and email threads are split into token-bounded
+chunks (see utils/chunking.py); each chunk is extracted with its own LLM call,
+at most EXTRACTION_CHUNK_CONCURRENCY at a time, and the partial results are
+merged deterministically in chunk order:
+
+- list fields (vehicledetailspage_urls, colors, ...) are unioned, first seen first
+- vehiclesearchpreference entries describing the same make/model are combined
+- shopper_notes from different chunks are joined
+- any other field keeps the first value found
+
+Enabled for messages longer than LONG_INPUT_TOKEN_THRESHOLD tokens.
+"""
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..utils.chunking import split_into_chunks
+from ..utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Smallest chunk worth an extraction call, whatever the budget leaves
+MIN_CHUNK_TOKENS = 200
+
+# Text fields where every chunk's value is kept
+JOINED_FIELDS = ("shopper_notes",)
+
+
+def long_input_threshold() -> int:
+    """Token length above which a message is extracted in chunks (0 disables)."""
+    return int(os.getenv("LONG_INPUT_TOKEN_THRESHOLD", "1500"))
+
+
+def chunk_tokens() -> int:
+    """Token limit per extraction chunk (EXTRACTION_CHUNK_TOKENS)."""
+    return int(os.getenv("EXTRACTION_CHUNK_TOKENS", "800"))
+
+
+def chunk_concurrency() -> int:
+    """Maximum concurrent chunk extraction calls (EXTRACTION_CHUNK_CONCURRENCY)."""
+    return max(1, int(os.getenv("EXTRACTION_CHUNK_CONCURRENCY", "4")))
+
+
+def is_long_input(text: str, model: Optional[str] = None) -> bool:
+    """Whether a message should go through chunked extraction."""
+    threshold = long_input_threshold()
+    return threshold > 0 and count_tokens(text, model) > threshold
+
+
+def _union(first: List[Any], second: List[Any]) -> List[Any]:
+    merged = list(first)
+    for item in second:
+        if item not in merged:
+            merged.append(item)
+    return merged
+
+
+def _preference_key(preference: Dict[str, Any]) -> Tuple[str, str]:
+    return (
+        str(preference.get("make") or "").strip().lower(),
+        str(preference.get("model") or "").strip().lower()
+    )
+
+
+def _merge_preference(base: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(base)
+    for key, value in other.items():
+        if value is None:
+            continue
+        if merged.get(key) is None:
+            merged[key] = value
+        elif isinstance(merged[key], list) and isinstance(value, list):
+            merged[key] = _union(merged[key], value)
+    return merged
+
+
+def merge_preferences(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Combine vehiclesearchpreference entries from several chunks.
+
+    Entries with the same make and model (case-insensitive) become one entry;
+    an entry with neither make nor model is kept as-is.
+
+    Args:
+        entries: Preference objects in chunk order
+
+    Returns:
+        Merged entries in first-seen order
+    """
+    merged: List[Dict[str, Any]] = []
+    index: Dict[Tuple[str, str], int] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        key = _preference_key(entry)
+        if key == ("", ""):
+            merged.append(dict(entry))
+        elif key in index:
+            merged[index[key]] = _merge_preference(merged[index[key]], entry)
+        else:
+            index[key] = len(merged)
+            merged.append(dict(entry))
+    return merged
+
+
+def merge_chunk_extractions(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk extraction results, in chunk order.
+
+    Args:
+        results: Extraction dictionaries, one per chunk
+
+    Returns:
+        Merged extraction ({"extracted": False} if no chunk found anything)
+    """
+    merged: Dict[str, Any] = {}
+    for result in results:
+        if not result or result.get("extracted") is False:
+            continue
+        for field, value in result.items():
+            if field == "extracted" or value is None:
+                continue
+            current = merged.get(field)
+            if current is None:
+                merged[field] = list(value) if isinstance(value, list) else value
+            elif field == "vehiclesearchpreference" and isinstance(current, list) and isinstance(value, list):
+                merged[field] = merge_preferences(current + value)
+            elif isinstance(current, list) and isinstance(value, list):
+                merged[field] = _union(current, value)
+            elif field in JOINED_FIELDS and isinstance(value, str) and value not in current:
+                merged[field] = f"{current} {value}"
+    if "vehiclesearchpreference" in merged:
+        merged["vehiclesearchpreference"] = merge_preferences(merged["vehiclesearchpreference"])
+    return merged or {"extracted": False}
+
+
+async def extract_in_chunks(
+    text: str,
+    extract: Callable[[str], Awaitable[Dict[str, Any]]],
+    model: Optional[str] = None,
+    max_chunk_tokens: Optional[int] = None
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Run `extract` on token-bounded chunks of `text` with bounded parallelism.
+
+    A chunk whose extraction fails counts as {"extracted": False}; the other
+    chunks still contribute.
+
+    Args:
+        text: Long user message
+        extract: Coroutine function extracting one chunk
+        model: Model whose tokenizer sizes the chunks
+        max_chunk_tokens: Tighter chunk limit than EXTRACTION_CHUNK_TOKENS
+            (e.g. what the node's input budget leaves next to the prompt)
+
+    Returns:
+        Tuple of (merged extraction, number of chunks)
+    """
+    limit = chunk_tokens() if max_chunk_tokens is None else max(min(chunk_tokens(), max_chunk_tokens), MIN_CHUNK_TOKENS)
+    chunks = split_into_chunks(text, limit, model)
+    semaphore = asyncio.Semaphore(chunk_concurrency())
+
+    async def run(index: int, chunk: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await extract(chunk)
+            except Exception as e:
+                logger.warning(f"Extraction of chunk {index + 1}/{len(chunks)} failed: {str(e)}")
+                return {"extracted": False}
+
+    logger.info(f"Extracting long message in {len(chunks)} chunks (concurrency {chunk_concurrency()})")
+    results = await asyncio.gather(*(run(i, chunk) for i, chunk in enumerate(chunks)))
+    return merge_chunk_extractions(list(results)), len(chunks)
+
+
+__all__ = [
+    "is_long_input",
+    "merge_preferences",
+    "merge_chunk_extractions",
+    "extract_in_chunks"
+]
@@ -0,0 +1,139 @@
+"""
+Single-call "extract + respond" data collection for workflows 2 and 3.
+
+The default pipeline spends one LLM call on extraction (Gemini) and another on
+the reply text (GPT) in the showroom workflow node. This node makes one
+structured-output call that returns the extracted fields and the assistant
+reply together. The reply is stored in ConversationState.drafted_response and
+the showroom workflow nodes use it instead of calling the response LLM again.
+The reply is drafted before validation picks the next field, so a draft that
+asks for a different field than current_field is discarded and the showroom
+node writes the reply as in the pipeline mode.
+
+Selected per deployment with DATA_COLLECTION_MODE=combined (see routing.py).
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.field_specifications import FIELD_SPECIFICATIONS, WORKFLOW_SPEC_KEYS
+from ..models.schemas import ConversationState, ExtractAndRespond
+from ..utils.llm_clients import get_llm_clients
+from ..utils.token_accounting import record_llm_call
+from .data_collection import DataCollectionNode
+
+logger = logging.getLogger(__name__)
+
+# Model configuration
+COMBINED_MODEL = "gpt-4o-mini"  # Structured output for extraction + reply in one call
+
+
+class CombinedCollectionNode(DataCollectionNode):
+    """
+    Data collection node that extracts fields and drafts the reply in one call.
+
+    Reuses DataCollectionNode for prompts, field merging, PRD validation and
+    next-field selection; only the LLM call itself is replaced.
+    """
+    # One reply per turn - long messages go out in a single call, untrimmed, instead of chunked
+    chunked_extraction = False
+
+    def __init__(self, llm_client=None):
+        clients = get_llm_clients()
+        llm = llm_client or clients.chat_openai(COMBINED_MODEL, 0.3)
+        super().__init__(llm_client=llm, streaming=False)
+        self.model = COMBINED_MODEL
+        if llm_client is None:
+            self.responder = clients.structured_openai(
+                COMBINED_MODEL, 0.3, ExtractAndRespond, method="function_calling"
+            )
+        else:
+            self.responder = llm.with_structured_output(ExtractAndRespond, method="function_calling")
+        self._drafted_field: Optional[str] = None
+
+    async def collect_data(self, state: ConversationState) -> ConversationState:
+        """Collect data, keeping the drafted reply only if it asks for the field the node settled on."""
+        # A reply drafted on an earlier turn must never be reused
+        state.drafted_response = None
+        self._drafted_field = None
+        state = await super().collect_data(state)
+
+        # Validation can reject a field the reply already thanked them for, so the
+        # draft may ask for a different field than current_field and the UI form
+        if state.drafted_response and self._drafted_field != state.current_field:
+            logger.info(
+                f"Drafted reply asks for {self._drafted_field}, but the next field is "
+                f"{state.current_field}; discarding it"
+            )
+            state.drafted_response = None
+            state.processing_steps.append("drafted_response_discarded")
+        return state
+
+    def _extraction_prompt(self, state: ConversationState) -> Optional[str]:
+        """Extend the workflow's extraction prompt with reply instructions."""
+        extraction_prompt = super()._extraction_prompt(state)
+        spec = FIELD_SPECIFICATIONS.get(WORKFLOW_SPEC_KEYS.get(state.workflow_id, ""))
+        if extraction_prompt is None or spec is None:
+            return None
+        return f"{extraction_prompt}\n\n{self._response_instructions(state, spec)}"
+
+    def _response_instructions(self, state: ConversationState, spec: Dict[str, Any]) -> str:
+        """Build the reply-drafting section of the combined prompt."""
+        required = "\n".join(
+            f"  {i}. `{field}`: {spec['field_descriptions'].get(field, field)}"
+            for i, field in enumerate(spec["required_fields"], start=1)
+        )
+        conditional = ""
+        for group in spec.get("conditional_required", []):
+            conditional += f"\n- At least one of {', '.join(f'`{f}`' for f in group)} is also required"
+
+        return f"""## OUTPUT FORMAT (overrides "Return ONLY the extracted data as JSON")
+Return BOTH results in a single structured response:
+- `extracted_data`: the JSON object described above (use {{"extracted": false}} if nothing relevant was found)
+- `assistant_message`: your conversational reply to the salesperson for this turn
+- `next_field`: the exact field name your reply asks for (null if it asks for none)
+
+## Reply Instructions
+Required fields, in the order they must be collected:
+{required}{conditional}
+
+1. **Acknowledge what you collected** in this message - be specific about what you understood
+2. **Ask for the next priority field**: the first required field above that is neither already collected nor in your `extracted_data`
+   - Ask for ONLY that one field, with helpful context or an example
+   - When asking for vehicle detail page URLs, ask for the specific webpage URL of each vehicle
+3. If every required field is collected, ask if they want to add optional details or proceed with creation
+4. If workflow_status is "optional_collection", remind them they can proceed with creation at any time
+
+Address them as a salesperson. Never list all required fields upfront. Keep a friendly, encouraging tone."""
+
+    async def _run_extraction(
+        self,
+        state: ConversationState,
+        messages: List[Dict[str, str]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Make the combined structured-output call.
+
+        Returns:
+            Tuple of (extracted data, serialized raw result)
+        """
+        logger.info("Sending combined extract + respond request to LLM...")
+        result = await self.responder.ainvoke(messages)
+        if isinstance(result, dict):
+            result = ExtractAndRespond(**result)
+        record_llm_call(state, "data_collection", self.model, messages, result)
+
+        state.drafted_response = result.assistant_message.strip() or None
+        self._drafted_field = result.next_field
+        state.processing_steps.append("combined_extract_and_respond")
+        return result.extracted_data or {"extracted": False}, json.dumps(result.model_dump())
+
+
+# Node function for LangGraph integration
+async def combined_collection_node(state: ConversationState) -> ConversationState:
+    """LangGraph node wrapper for CombinedCollectionNode."""
+    node = CombinedCollectionNode()
+    return await node.collect_data(state)
+
+
+__all__ = ["CombinedCollectionNode", "combined_collection_node"]
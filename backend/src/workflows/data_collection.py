@@ -1,14 +1,30 @@
 import os
+import json
 import logging
-from typing import Any, Dict, Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Any, Dict, List, Optional, Tuple
 from ..models.schemas import ConversationState
-from ..models.validation import validate_collected_data
-from pydantic import ValidationError, SecretStr
+from ..models.normalization import normalize_collected_data
+from ..models.validation import EXTRACTION_MODELS, validate_collected_data
+from ..prompts import get_prompt_registry, render_prompt
+from ..utils.streaming_json import IncrementalJSONObjectParser
+from .streaming import emit_stream_event
+from pydantic import BaseModel, ValidationError
+from ..utils.llm_clients import get_llm_clients
+from ..utils.local_extraction import local_extract
+from ..utils.token_accounting import messages_tokens, node_budget, record_llm_call
+from .chunked_extraction import extract_in_chunks, is_long_input
+from .extraction_prompt import build_extraction_prompt, estimate_tokens, extraction_prompt_mode
 
 logger = logging.getLogger(__name__)
 
 GEMINI_MODEL = "gemini-2.5-flash"
+RETRY_MODEL = "gemini-2.5-flash-lite"  # Cheaper model for the one retry after a malformed response
+
+# Keys in the extraction output that are metadata, not collected fields
+NON_FIELD_KEYS = ("extracted", "workflow_id")
+
+# Registered prompt template with the full extraction prompt for each workflow
+EXTRACTION_TEMPLATES = {2: "shopper_extraction", 3: "personal_extraction"}
 
 # FIELD_DESCRIPTIONS: Maps field names to human-readable descriptions for prompts.
 FIELD_DESCRIPTIONS = {
@@ -21,15 +37,39 @@ FIELD_DESCRIPTIONS = {
     "vehiclesearchpreference": "vehicle preferences"
 }
 
+def structured_extraction_enabled() -> bool:
+    """Whether extraction uses schema-constrained output (EXTRACTION_OUTPUT_MODE=structured, the default) or JSON text."""
+    return os.getenv("EXTRACTION_OUTPUT_MODE", "structured").lower() == "structured"
+
+
+def local_extraction_enabled() -> bool:
+    """Whether URLs/emails/phones/numeric hints are pre-extracted locally (ENABLE_LOCAL_EXTRACTION, default true)."""
+    return os.getenv("ENABLE_LOCAL_EXTRACTION", "true").lower() == "true"
+
+
+def reuse_collected_extraction() -> bool:
+    """
+    Whether the showroom workflow nodes should reuse this node's extraction.
+    
+    SHOWROOM_EXTRACTION_MODE=reuse (default) makes the workflow 2/3 nodes consume
+    the collected_data already in ConversationState; "llm" restores their own
+    second Gemini extraction pass.
+    """
+    return os.getenv("SHOWROOM_EXTRACTION_MODE", "reuse").lower() != "llm"
+
+
 class DataCollectionNode:
-    def __init__(self, llm_client=None):
-        api_key = os.getenv("GOOGLE_AI_API_KEY")
-        self.llm = llm_client or ChatGoogleGenerativeAI(
-            model=GEMINI_MODEL,
-            temperature=0,
-            api_key=SecretStr(api_key) if api_key is not None else None
-        )
+    # Very long messages are split into chunks and extracted concurrently
+    chunked_extraction = True
+
+    def __init__(self, llm_client=None, streaming: Optional[bool] = None):
+        self.llm = llm_client or get_llm_clients().gemini(GEMINI_MODEL, 0)
         self.model = GEMINI_MODEL
+        self._injected_llm = llm_client is not None
+        # Streaming extraction announces each field as soon as its JSON value closes
+        if streaming is None:
+            streaming = os.getenv("ENABLE_STREAMING_EXTRACTION", "false").lower() == "true"
+        self.streaming = streaming
 
     async def collect_data(self, state: ConversationState) -> ConversationState:
         workflow_id = state.workflow_id
@@ -42,39 +82,40 @@ class DataCollectionNode:
             return state
 
         # Build extraction prompt based on workflow with n8n-style context
-        if workflow_id == 2:
-            extraction_prompt = self._shopper_showroom_prompt_v2(state)
-        elif workflow_id == 3:
-            extraction_prompt = self._personal_showroom_prompt_v2(state)
-        else:
+        extraction_prompt = self._extraction_prompt(state)
+        if extraction_prompt is None:
             logger.warning(f"Unknown workflow_id: {workflow_id}, skipping data extraction.")
             return state
 
+        # The extraction input is never trimmed (that would drop data): very
+        # long messages, and any message that would exceed the node's input
+        # budget together with the prompt, are extracted in chunks instead
+        over_budget = messages_tokens([extraction_prompt, user_query], self.model) > node_budget("data_collection")
+        long_input = self.chunked_extraction and (over_budget or is_long_input(user_query, self.model))
+        if over_budget and not long_input:
+            logger.warning("Extraction input exceeds the data_collection budget; sending it untrimmed")
         messages = [
             {"role": "system", "content": extraction_prompt},
             {"role": "user", "content": user_query}
         ]
+        content = None
         try:
-            logger.info(f"Sending extraction request to LLM...")
-            result = await self.llm.ainvoke(messages)
-            import json
-            # Handle result.content as str or list
-            content = getattr(result, "content", result)
-            if isinstance(content, list):
-                content = " ".join(str(x) for x in content)
-            # Clean up markdown code blocks if present
-            content_str = str(content).strip()
-            if content_str.startswith("```json"):
-                content_str = content_str[7:]  # Remove ```json
-            if content_str.startswith("```"):
-                content_str = content_str[3:]  # Remove ```
-            if content_str.endswith("```"):
-                content_str = content_str[:-3]  # Remove trailing ```
-            content_str = content_str.strip()
-            
-            logger.info(f"Raw LLM response: {content}")
-            logger.info(f"Cleaned content: {content_str}")
-            extracted_data = json.loads(content_str)
+            # Deterministic pre-extraction; skip the LLM when it explains the whole message
+            local = local_extract(user_query, state.current_field) if local_extraction_enabled() else None
+            if local is not None and local.fully_explained:
+                extracted_data, content = dict(local.data), json.dumps(local.data)
+                state.processing_steps.append("local_extraction_only")
+                if self.streaming:
+                    for field, value in extracted_data.items():
+                        emit_stream_event("field", {"field": field, "value": value})
+            else:
+                if long_input:
+                    extracted_data, content = await self._run_chunked_extraction(state, extraction_prompt)
+                else:
+                    extracted_data, content = await self._run_extraction(state, messages)
+                if local is not None and local.data:
+                    extracted_data = local.merge_into(extracted_data)
+                    state.processing_steps.append("local_extraction_merged")
             logger.info(f"Extracted data: {extracted_data}")
         except json.JSONDecodeError as e:
             logger.error(f"JSON decode error: {e}")
@@ -95,7 +136,7 @@ class DataCollectionNode:
         if extracted_data.get("extracted") is not False:
             for field, value in extracted_data.items():
                 # Skip metadata fields and workflow_id
-                if field in ["extracted", "workflow_id"]:
+                if field in NON_FIELD_KEYS:
                     continue
                 if value is not None:
                     # Only count as newly collected if it wasn't in completed_fields
@@ -115,6 +156,11 @@ class DataCollectionNode:
         validation_status = "pending"
         validation_error = None
         
+        # Repair recoverable formatting issues so they don't cost a repair turn
+        state.collected_data, coerced_fields = normalize_collected_data(state.collected_data)
+        if coerced_fields:
+            state.processing_steps.append(f"data_normalized: {coerced_fields}")
+        
         try:
             # Validate data using our strict validation models
             validated_data = validate_collected_data(state.collected_data, workflow_id)
@@ -169,150 +215,226 @@ class DataCollectionNode:
 
         return state
 
-    def _shopper_showroom_prompt(self) -> str:
-        return (
-            """Extract shopper showroom information from the salesperson's message.\n\nCONTEXT: The salesperson is creating a showroom FOR a specific customer/shopper.\n\nExtract and return JSON with these exact fields from PRD when mentioned:\n{\n  \"dealershipwebsite_url\": \"salesperson's dealership website URL\",\n  \"vehicledetailspage_urls\": [\"specific vehicle page URLs for the customer\"],\n  \"shopper_name\": \"customer/shopper's name\",\n  \"user_name\": \"salesperson's name\",\n  \"user_phone\": \"salesperson's phone number\",\n  \"user_email\": \"salesperson's email (optional)\",\n  \"vehiclesearchpreference\": [{\n    \"make\": \"vehicle make\",\n    \"model\": \"vehicle model\",\n    \"year_min\": minimum_year,\n    \"year_max\": maximum_year,\n    \"price_min\": minimum_price,\n    \"price_max\": maximum_price,\n    \"exterior_color\": [\"color preferences\"],\n    \"interior_color\": [\"interior color preferences\"],\n    \"miles_min\": minimum_mileage,\n    \"miles_max\": maximum_mileage,\n    \"condition\": [\"New\", \"Used\", \"Certified\"],\n    \"body_style\": \"SUV/sedan/truck/etc\"\n  }],\n  \"gender_descriptor\": \"inferred from pronouns (he/she/they)\",\n  \"age_descriptor\": \"inferred age range like '30s', '40s'\",\n  \"shopper_notes\": \"free text about customer lifestyle, location, notes\"\n}\n\nIMPORTANT: \n- gender_descriptor and age_descriptor are INFERRED from conversation, not asked directly\n- shopper_notes captures free-form customer information\n- Only include fields that are explicitly mentioned or can be inferred\nReturn {\"extracted\": false} if no relevant data found."""
+    def _extraction_prompt(self, state: ConversationState) -> Optional[str]:
+        """Return the extraction system prompt for the workflow, or None if unknown."""
+        template = EXTRACTION_TEMPLATES.get(state.workflow_id)
+        if template is None:
+            return None
+        if extraction_prompt_mode() == "full":
+            return self._full_extraction_prompt(state)
+        
+        pruned_prompt = build_extraction_prompt(state)
+        full_tokens = get_prompt_registry().measure(template, **self._prompt_context(state))
+        pruned_tokens = estimate_tokens(pruned_prompt)
+        saved = full_tokens - pruned_tokens
+        if saved <= 0:
+            return self._full_extraction_prompt(state)
+        logger.info(
+            f"Pruned extraction prompt: ~{pruned_tokens} tokens vs ~{full_tokens} full "
+            f"({saved} saved, {saved / full_tokens:.0%})"
         )
-    
+        state.processing_steps.append(f"extraction_prompt_pruned: ~{saved} tokens saved")
+        return pruned_prompt
+
+    def _full_extraction_prompt(self, state: ConversationState) -> Optional[str]:
+        """Return the original full extraction prompt for the workflow, or None if unknown."""
+        if state.workflow_id == 2:
+            return self._shopper_showroom_prompt_v2(state)
+        if state.workflow_id == 3:
+            return self._personal_showroom_prompt_v2(state)
+        return None
+
+    async def _run_extraction(
+        self,
+        state: ConversationState,
+        messages: List[Dict[str, str]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Call the extraction LLM and parse its output.
+        
+        Returns:
+            Tuple of (extracted data, raw LLM content)
+            
+        Raises:
+            json.JSONDecodeError: If the response is not valid JSON
+        """
+        logger.info(f"Sending extraction request to LLM (streaming={self.streaming})...")
+        if self.streaming:
+            return await self._stream_extraction(state, messages)
+        
+        return await self._invoke_extraction(state, messages)
+
+    def _structured_extractor(self, workflow_id: int, model: str):
+        """Schema-constrained extraction runnable for a workflow (returns raw + parsed output)."""
+        schema = EXTRACTION_MODELS[workflow_id]
+        if self._injected_llm:
+            return self.llm.with_structured_output(schema, include_raw=True)
+        return get_llm_clients().structured_gemini(model, 0, schema)
+
+    async def _invoke_extraction(
+        self,
+        state: ConversationState,
+        messages: List[Dict[str, str]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Make one non-streaming extraction call.
+        
+        With structured output (EXTRACTION_OUTPUT_MODE=structured, the default)
+        the response is constrained to the workflow's extraction schema; a
+        response that is not valid JSON or fails schema validation is retried
+        once on RETRY_MODEL. Otherwise the JSON text response is parsed.
+        
+        Returns:
+            Tuple of (extracted data, raw LLM content)
+            
+        Raises:
+            json.JSONDecodeError: If a JSON text response is not valid JSON
+            Exception: Provider errors (network, auth, quota) are not retried here
+        """
+        if not structured_extraction_enabled() or state.workflow_id not in EXTRACTION_MODELS:
+            result = await self.llm.ainvoke(messages)
+            content = self._message_text(result)
+            record_llm_call(state, "data_collection", self.model, messages, result)
+            return self._parse_extraction_content(content), content
+        
+        # An injected client (tests, combined mode) is retried as-is
+        # Only malformed output (parsing_error) is retried; provider errors propagate
+        models = [self.model, self.model if self._injected_llm else RETRY_MODEL]
+        for attempt, model in enumerate(models):
+            output = await self._structured_extractor(state.workflow_id, model).ainvoke(messages)
+            record_llm_call(state, "data_collection", model, messages, output.get("raw"))
+            
+            parsed = output.get("parsed")
+            if parsed is not None and output.get("parsing_error") is None:
+                if attempt > 0:
+                    state.processing_steps.append(f"structured_extraction_retried: {model}")
+                data = parsed.model_dump(exclude_none=True) if isinstance(parsed, BaseModel) else dict(parsed)
+                content = json.dumps(data)
+                logger.info(f"Structured extraction ({model}): {content}")
+                return (data or {"extracted": False}), content
+            logger.warning(f"Malformed structured extraction from {model}: {output.get('parsing_error')}")
+        
+        state.processing_steps.append("structured_extraction_failed")
+        return {"extracted": False}, ""
+
+    async def _run_chunked_extraction(
+        self,
+        state: ConversationState,
+        extraction_prompt: str
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Extract a very long message chunk by chunk and merge the results.
+        
+        Returns:
+            Tuple of (merged extracted data, merged data as JSON)
+        """
+        async def extract(chunk: str) -> Dict[str, Any]:
+            messages = [
+                {"role": "system", "content": extraction_prompt},
+                {"role": "user", "content": chunk}
+            ]
+            extracted_data, _ = await self._invoke_extraction(state, messages)
+            return extracted_data
+        
+        room = node_budget("data_collection") - messages_tokens([extraction_prompt, ""], self.model)
+        extracted_data, chunk_count = await extract_in_chunks(
+            state.user_query, extract, self.model, max_chunk_tokens=room
+        )
+        state.processing_steps.append(f"chunked_extraction: {chunk_count} chunks")
+        if self.streaming:
+            for field, value in extracted_data.items():
+                if field not in NON_FIELD_KEYS and value is not None:
+                    emit_stream_event("field", {"field": field, "value": value})
+        return extracted_data, json.dumps(extracted_data)
+
+    @staticmethod
+    def _message_text(result: Any) -> str:
+        """Return the text content of an LLM result or stream chunk."""
+        # Handle result.content as str or list
+        content = getattr(result, "content", result)
+        if isinstance(content, list):
+            content = " ".join(str(x) for x in content)
+        return str(content)
+
+    def _parse_extraction_content(self, content: str) -> Dict[str, Any]:
+        """
+        Parse a complete extraction response into a dictionary.
+        
+        Raises:
+            json.JSONDecodeError: If the response is not valid JSON
+        """
+        # Clean up markdown code blocks if present
+        content_str = content.strip()
+        if content_str.startswith("```json"):
+            content_str = content_str[7:]  # Remove ```json
+        if content_str.startswith("```"):
+            content_str = content_str[3:]  # Remove ```
+        if content_str.endswith("```"):
+            content_str = content_str[:-3]  # Remove trailing ```
+        content_str = content_str.strip()
+        
+        logger.info(f"Raw LLM response: {content}")
+        logger.info(f"Cleaned content: {content_str}")
+        return json.loads(content_str)
+
+    async def _stream_extraction(
+        self,
+        state: ConversationState,
+        messages: List[Dict[str, str]]
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Run extraction on the LLM token stream with an incremental JSON parser.
+        
+        Each top-level field is announced on the graph's custom stream as a
+        "field" event as soon as its value closes, instead of after the whole
+        response has arrived. Nothing is written to state here: collect_data
+        merges, normalizes and validates the parsed result like any other
+        extraction, so a stream that fails to parse leaves collected_data as
+        it was.
+        
+        Returns:
+            Tuple of (extracted data, raw streamed content)
+            
+        Raises:
+            json.JSONDecodeError: If the stream did not contain a JSON object
+        """
+        parser = IncrementalJSONObjectParser()
+        parts: List[str] = []
+        
+        async for chunk in self.llm.astream(messages):
+            text = self._message_text(chunk)
+            parts.append(text)
+            for field, value in parser.feed(text):
+                if field in NON_FIELD_KEYS or value is None:
+                    continue
+                emit_stream_event("field", {"field": field, "value": value})
+        
+        content = "".join(parts)
+        record_llm_call(state, "data_collection", self.model, messages, completion_text=content)
+        if parser.complete:
+            return parser.result, content
+        
+        # The stream never closed a JSON object - fall back to a full parse
+        logger.warning("Streaming extraction did not produce a complete JSON object")
+        return self._parse_extraction_content(content), content
+
     def _shopper_showroom_prompt_v2(self, state: ConversationState) -> str:
         """Enhanced prompt matching n8n's comprehensive approach"""
-        return f"""## Current Context
-- Workflow ID: {state.workflow_id}
-- Already collected fields: {state.completed_fields}
-- Next priority field: {state.current_field}
-- Current workflow_status: {state.workflow_status}
-
-## CRITICAL INSTRUCTION: EXTRACT ALL AVAILABLE DATA
-**You MUST extract ALL data you can identify from the user's message, starting with `next_field`, and proceeding to other required fields, then optional fields. Parse the entire message thoroughly and capture every piece of relevant information.**
-
-**DO NOT EXTRACT OR INCLUDE WORKFLOW_ID IN YOUR RESPONSE - IT IS ALREADY SET IN THE CONTEXT**
-
-**Example:**
-- If `shopper_name` already exists (field is in collected_fields), and user mentions "John", do NOT extract it again
-- Only extract if the field was previously missing or user says "change my name to..."
-
-## Field Definitions
-
-### Workflow 2 (Create Shopper Drift Showroom)
-**Required Fields:**
-- `dealershipwebsite_url` (string): Dealership website URL
-- `vehicledetailspage_urls` (array of strings): Vehicle detail page URLs from the dealership website the shopper is interested in.
-- `user_name` (string): Your name
-- `shopper_name` (string): Name of person showroom is for
-- `user_phone` (string): Contact phone number
-- `vehiclesearchpreference` (array of objects): Vehicle criteria with:
-  - `make`, `model`, `trim` (array), `year_min/max`, `price_min/max`
-  - `exterior_color` (array), `interior_color` (array), `miles_min/max`
-  - `condition` (array: "New", "Used", "Certified"), `body_style`
-
-**Optional Fields:**
-- `gender_descriptor`: "man" or "woman" - inferred from pronouns used to describe the shopper (lowercase only)
-- `age_descriptor`: "20s", "30s", "40s", "50s", "60s", "70s", "80s"  
-- `shopper_notes` (string): Lifestyle, interests, family details
-- `location_descriptor` (string): Geographic location
-- `user_email` (string): Contact email
-
-## Data Extraction Examples
-
-**Input:** "I want to create a shopper drift for allie davis. she's mid-20's in age, likes her 2 kids and dog, and wants either a blue mercedes c-class sedan or BMW x3. price range is under 40k and miles needs to be below 10k. years 2022 and 2023 are what she wants. The vehicle pages are https://dealer.com/bmw-x3-2023 and https://dealer.com/mercedes-c-class-2022"
-
-**Should Extract:**
-```json
-{{
-  "shopper_name": "allie davis",
-  "gender_descriptor": "woman",
-  "age_descriptor": "20s", 
-  "shopper_notes": "allie davis has 2 kids and dog",
-  "vehicledetailspage_urls": ["https://dealer.com/bmw-x3-2023", "https://dealer.com/mercedes-c-class-2022"],
-  "vehiclesearchpreference": [
-    {{
-      "make": "Mercedes",
-      "model": "C-Class",
-      "body_style": "sedan", 
-      "exterior_color": ["blue"],
-      "price_max": 40000,
-      "miles_max": 10000,
-      "year_min": 2022,
-      "year_max": 2023
-    }},
-    {{
-      "make": "BMW", 
-      "model": "X3",
-      "price_max": 40000,
-      "miles_max": 10000,
-      "year_min": 2022,
-      "year_max": 2023
-    }}
-  ]
-}}
-```
-
-## Processing Instructions
-
-1. **OPTIONAL DATA COLLECTION**: If workflow_status is "optional_collection", user can proceed with creation at any time
-
-2. **COMPREHENSIVE DATA EXTRACTION**: 
-   - Scan the entire user message for ANY field data
-   - Extract everything you can identify, not just the `next_field`
-   - Include partial/incomplete data - don't wait for complete information
-
-3. **Age Translation**:
-   - "mid-20's" or "20's" → "20s"
-   - "early 30s" or "30's" → "30s"
-   - etc.
-
-4. **Vehicle Preferences**:
-   - Create separate objects for each vehicle mentioned
-   - Convert "under 40k" → `price_max: 40000`
-   - Convert "below 10k miles" → `miles_max: 10000`
-
-5. **Gender Translation**:
-   - "him" or "he" or "his" → "man"
-   - "her" or "she" or "hers" → "woman"
-   - Infer from conversation context
-
-6. **Shopper Notes**:
-   - Combine personal details: "allie davis has 2 kids and dog"
-   - Include lifestyle mentions, interests, family info
-
-Return ONLY the extracted data as JSON. Include "extracted": false if no relevant data found."""
-
-    def _personal_showroom_prompt(self) -> str:
-        return (
-            """Extract salesperson's personal vehicle showcase information from their message.\n\nCONTEXT: The salesperson is creating their own personal vehicle showcase (like a digital business card with their favorite vehicles).\n\nExtract and return JSON with these fields when mentioned:\n{\n  \"dealershipwebsite_url\": \"salesperson's dealership website URL\",\n  \"vehicledetailspage_urls\": [\"URLs of specific vehicles they want to showcase\"],\n  \"user_name\": \"salesperson's name\",\n  \"user_phone\": \"salesperson's phone number\",\n  \"user_email\": \"salesperson's email\",\n  \"vehiclesearchpreference\": [{\n    \"make\": \"vehicle make\",\n    \"model\": \"vehicle model\",\n    \"year_min\": minimum_year,\n    \"year_max\": maximum_year,\n    \"price_min\": minimum_price,\n    \"price_max\": maximum_price,\n    \"body_style\": \"SUV/sedan/truck/etc\",\n    \"condition\": [\"New\", \"Used\", \"Certified\"]\n  }]\n}\n\nOnly include fields that are explicitly mentioned. Return {\"extracted\": false} if no relevant data found."""
-        )
-    
+        return render_prompt("shopper_extraction", **self._prompt_context(state)).text
+
     def _personal_showroom_prompt_v2(self, state: ConversationState) -> str:
         """Enhanced prompt for personal showroom matching n8n approach"""
-        return f"""## Current Context
-- Workflow ID: {state.workflow_id}
-- Already collected fields: {state.completed_fields}
-- Next priority field: {state.current_field}
-- Current workflow_status: {state.workflow_status}
-
-## CRITICAL INSTRUCTION: EXTRACT ALL AVAILABLE DATA
-**Extract ALL data from the user's message. Parse thoroughly and capture every piece of relevant information.**
-
-## Field Definitions
-
-### Workflow 3 (Create Personal Drift Showroom)
-**Required Fields:**
-- `dealershipwebsite_url`: Dealership website URL
-- `vehicledetailspage_urls`: URLs of specific vehicles to showcase
-- `user_name`: Your name
-- `user_phone`: Your phone number
-- `user_email`: Your email address
-
-**Optional Fields:**
-- `vehiclesearchpreference` (array of objects): Vehicle criteria with same structure as workflow 2
-
-## Processing Instructions
-
-1. Extract everything you can identify from the message
-2. Only include fields that are explicitly mentioned
-3. Skip fields already in collected_fields unless user is updating them
-
-Return ONLY the extracted data as JSON. Include "extracted": false if no relevant data found."""
+        return render_prompt("personal_extraction", **self._prompt_context(state)).text
+
+    @staticmethod
+    def _prompt_context(state: ConversationState) -> Dict[str, Any]:
+        """Per-turn values for the dynamic suffix of the extraction prompts."""
+        return {
+            "workflow_id": state.workflow_id,
+            "completed_fields": state.completed_fields,
+            "current_field": state.current_field,
+            "workflow_status": state.workflow_status
+        }
     
     def _determine_next_field(self, state: ConversationState) -> Optional[str]:
         """
@@ -367,4 +489,4 @@ async def data_collection_node(state: ConversationState) -> ConversationState:
     node = DataCollectionNode()
     return await node.collect_data(state)
 
-__all__ = ["data_collection_node", "FIELD_DESCRIPTIONS"] 
\ No newline at end of file
+__all__ = ["data_collection_node", "reuse_collected_extraction", "FIELD_DESCRIPTIONS"] 
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Pruned extraction prompt builder for workflows 2 and 3.
+
+The full extraction prompts describe every field, a long worked example and all
+processing rules on every turn, even when a single field is still missing.
+build_extraction_prompt() assembles the prompt from FIELD_SPECIFICATIONS with
+only the fields that are still missing or plausibly present in the message
+(FIELD_CUES in utils/text_patterns.py), and includes rules and examples only
+for those fields, so the prompt shrinks as fields are collected. The selected
+fields follow the short static instruction prefix of the "pruned_extraction"
+template, which both workflows share. Where the pruned prompt is not smaller
+than the full one (workflow 3 on its first turns, whose full prompt has no
+rules or examples), data collection sends the full prompt instead.
+
+EXTRACTION_PROMPT_MODE=pruned (default) uses this builder, "full" keeps the
+original prompts.
+"""
+import os
+import json
+import logging
+from typing import List, Optional
+
+from ..config.field_specifications import (
+    FIELD_EXTRACTION_HINTS,
+    FIELD_SPECIFICATIONS,
+    VEHICLE_SEARCH_PREFERENCE_SCHEMA,
+    WORKFLOW_SPEC_KEYS
+)
+from ..models.schemas import ConversationState
+from ..prompts import render_prompt
+from ..utils.text_patterns import plausible_fields
+from ..utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def extraction_prompt_mode() -> str:
+    """Return the configured extraction prompt mode ("pruned" or "full")."""
+    return os.getenv("EXTRACTION_PROMPT_MODE", "pruned").lower()
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of a prompt (tiktoken when available, else ~4 characters per token)."""
+    return count_tokens(text)
+
+
+def select_prompt_fields(state: ConversationState) -> List[str]:
+    """
+    Pick the fields the extraction prompt has to describe this turn.
+
+    A field is included if it is the next priority field, a required field
+    that is still missing, an optional field that is still missing during
+    optional collection, or any field the message plausibly mentions (so
+    updates to collected fields still work). An either/or group of required
+    fields stops being missing once any of its fields is collected, so the
+    prompt shrinks with every field collected.
+
+    Args:
+        state: Current conversation state
+
+    Returns:
+        Field names in FIELD_SPECIFICATIONS order
+    """
+    spec = FIELD_SPECIFICATIONS[WORKFLOW_SPEC_KEYS[state.workflow_id]]
+    completed = set(state.completed_fields or [])
+    required = list(spec["required_fields"])
+    for group in spec.get("conditional_required", []):
+        required.extend(f for f in group if not completed.intersection(group))
+    conditional = [f for group in spec.get("conditional_required", []) for f in group]
+    all_fields = list(dict.fromkeys(spec["required_fields"] + conditional + spec.get("optional_fields", [])))
+
+    cues = set(plausible_fields(state.user_query))
+    optional_phase = state.workflow_status == "optional_collection"
+
+    selected = []
+    for field in all_fields:
+        missing = field not in completed
+        if (
+            field == state.current_field
+            or field in cues
+            or (missing and field in required)
+            or (missing and optional_phase)
+        ):
+            selected.append(field)
+    return selected
+
+
+def _field_line(field: str, spec: dict) -> str:
+    field_type = spec["field_types"].get(field, "string")
+    type_label = "array of strings" if field_type == "array" and field != "vehiclesearchpreference" else field_type
+    if field == "vehiclesearchpreference":
+        type_label = "array of objects"
+    line = f"- `{field}` ({type_label}): {spec['field_descriptions'].get(field, field)}"
+    if field == "vehiclesearchpreference":
+        keys = ", ".join(f"`{key}`" for key in VEHICLE_SEARCH_PREFERENCE_SCHEMA)
+        line += f"\n  - Object keys: {keys}\n  - `condition` values: \"New\", \"Used\", \"Certified\""
+    return line
+
+
+def build_extraction_prompt(state: ConversationState) -> Optional[str]:
+    """
+    Build the pruned extraction prompt for the current turn.
+
+    Args:
+        state: Current conversation state
+
+    Returns:
+        Prompt text, or None for workflows without data collection
+    """
+    spec_key = WORKFLOW_SPEC_KEYS.get(state.workflow_id)
+    if spec_key is None:
+        return None
+    spec = FIELD_SPECIFICATIONS[spec_key]
+    fields = select_prompt_fields(state)
+
+    required = set(spec["required_fields"])
+    for group in spec.get("conditional_required", []):
+        required.update(group)
+    required_lines = [_field_line(f, spec) for f in fields if f in required]
+    optional_lines = [_field_line(f, spec) for f in fields if f not in required]
+
+    sections = ["## Fields"]
+    if required_lines:
+        sections.append("**Required:**\n" + "\n".join(required_lines))
+    if optional_lines:
+        sections.append("**Optional:**\n" + "\n".join(optional_lines))
+
+    rules = [rule for f in fields for rule in FIELD_EXTRACTION_HINTS.get(f, {}).get("rules", [])]
+    if rules:
+        sections.append("## Rules\n" + "\n".join(f"- {rule}" for rule in rules))
+
+    examples = [FIELD_EXTRACTION_HINTS[f]["example"] for f in fields if "example" in FIELD_EXTRACTION_HINTS.get(f, {})]
+    if examples:
+        sections.append("## Examples\n" + "\n".join(
+            f'Input: "{text}"\nOutput: {json.dumps(output)}' for text, output in examples
+        ))
+
+    return render_prompt(
+        "pruned_extraction",
+        fields="\n\n".join(sections),
+        workflow_id=state.workflow_id,
+        completed_fields=state.completed_fields,
+        current_field=state.current_field,
+        workflow_status=state.workflow_status
+    ).text
+
+
+__all__ = ["extraction_prompt_mode", "estimate_tokens", "select_prompt_fields", "build_extraction_prompt"]
@@ -4,16 +4,17 @@ General workflow node for handling general conversation and support queries.
 This workflow (workflow_id = 1) handles general questions about Drift,
 technical support, and other non-showroom creation queries.
 """
-import os
 import logging
 from typing import Dict, Any
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from pydantic import SecretStr
 
 from ..models.schemas import ConversationState
+from ..prompts import render_prompt
 from .data_collection import FIELD_DESCRIPTIONS
+from .streaming import RESPONSE_STREAM_TAG, emit_stream_event
+from ..utils.llm_clients import get_llm_clients
+from ..utils.token_accounting import apply_input_budget, messages_tokens, record_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -38,28 +39,21 @@ async def general_workflow_node(state: ConversationState) -> ConversationState:
     
     try:
         # Initialize GPT model for general conversation
-        llm = ChatOpenAI(
-            model=GPT_MODEL,
-            temperature=0.7,
-            api_key=get_secret("OPENAI_API_KEY")
-        )
+        # Streamed to the frontend as SSE deltas via RESPONSE_STREAM_TAG
+        llm = get_llm_clients().chat_openai(GPT_MODEL, 0.7, tags=[RESPONSE_STREAM_TAG])
         
-        system_prompt = """You are a helpful assistant for Drift, a B2B SaaS platform for automotive dealership salespeople.
-
-IMPORTANT: All users are dealership salespeople. Help them with:
-- Understanding how Drift works for sales teams
-- General questions about creating showrooms for customers
-- Technical support and guidance for salespeople
-- Explaining features and capabilities for dealership use
-
-Be friendly, informative, and concise. Always address them as salespeople and guide them toward creating showrooms for their customers when appropriate."""
+        system_prompt = render_prompt("general_assistant").text
+        user_query, _, _ = apply_input_budget(
+            "general_workflow", messages_tokens([system_prompt], GPT_MODEL), state.user_query, model=GPT_MODEL
+        )
 
         messages = [
             SystemMessage(content=system_prompt),
-            HumanMessage(content=state.user_query)
+            HumanMessage(content=user_query)
         ]
         
         result = await llm.ainvoke(messages)
+        record_llm_call(state, "general_workflow", GPT_MODEL, messages, result)
         
         # Handle result.content robustly
         content = getattr(result, "content", result)
@@ -68,6 +62,7 @@ Be friendly, informative, and concise. Always address them as salespeople and gu
         content_str = str(content)
         
         state.assistant_message = content_str.strip() if hasattr(content_str, "strip") else content_str
+        emit_stream_event("text", {"content": state.assistant_message})
         state.processing_steps.append("general_workflow_processed")
         state.llm_model_used = GPT_MODEL
         
@@ -81,18 +76,4 @@ Be friendly, informative, and concise. Always address them as salespeople and gu
     return state
 
 
-def get_secret(key: str) -> SecretStr:
-    """
-    Get secret value from environment variable.
-    
-    Args:
-        key: Environment variable name
-        
-    Returns:
-        SecretStr containing the value or None
-    """
-    val = os.getenv(key)
-    return SecretStr(val) if val else None
-
-
 __all__ = ["general_workflow_node"]
\ No newline at end of file
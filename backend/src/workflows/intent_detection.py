@@ -9,16 +9,91 @@ Uses GPT-3.5-turbo for cost efficiency as specified in the PRD.
 
 import os
 import json
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+import re
+import string
+from typing import Dict, Any, Optional, Tuple, Union
 from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_openai import ChatOpenAI
-from pydantic import SecretStr
 
+from ..config.intent_patterns import GROUP_WORKFLOWS, SIGNAL_MATCHER
 from ..models.schemas import IntentRoute, ConversationState
+from ..prompts import render_prompt
+from ..utils.cache import StatsTTLCache
+from ..utils.intent_classifier import classifier_threshold, get_intent_classifier, log_routing_decision
+from ..utils.llm_clients import get_llm_clients
+from ..utils.simhash import SimHashIndex, normalize_for_similarity, simhash
+from ..utils.text_patterns import looks_like_field_answer
+from ..utils.token_accounting import apply_input_budget, messages_tokens, record_llm_call
 
 logger = logging.getLogger(__name__)
 
+# Model configuration
+INTENT_MODEL = "gpt-3.5-turbo"  # Cost-efficient routing as specified in PRD
+
+# Short replies that continue the current workflow - never worth a GPT call
+SHORT_REPLIES = {
+    "yes", "yep", "yeah", "yup", "sure", "ok", "okay", "k", "sounds good",
+    "no", "nope", "not now", "skip", "next", "done", "that's it", "thats it",
+    "proceed", "continue", "go ahead", "go", "create", "create it", "lets go", "let's go",
+    "thanks", "thank you", "thx", "great", "perfect", "cool", "awesome",
+    "hi", "hello", "hey", "good morning", "good afternoon", "good evening"
+}
+
+CUSTOMER_NAME_RE = re.compile(r"(?:customer|client) (?:named |called )?([A-Z][a-z]+ ?[A-Z]?[a-z]*)")
+
+# Base confidence of a rule-based route before pattern boosts
+RULE_BASE_CONFIDENCE = 0.6
+
+_intent_cache: Optional[StatsTTLCache] = None
+_similarity_index: Optional[SimHashIndex] = None
+
+
+def get_intent_cache() -> StatsTTLCache:
+    """
+    Return the process-wide intent cache, creating it on first use.
+    
+    Size and TTL come from INTENT_CACHE_SIZE (default 1000) and
+    INTENT_CACHE_TTL_SECONDS (default 3600).
+    """
+    global _intent_cache
+    if _intent_cache is None:
+        _intent_cache = StatsTTLCache(
+            maxsize=int(os.getenv("INTENT_CACHE_SIZE", "1000")),
+            ttl=float(os.getenv("INTENT_CACHE_TTL_SECONDS", "3600"))
+        )
+    return _intent_cache
+
+
+def get_similarity_index() -> Optional[SimHashIndex]:
+    """
+    Return the process-wide near-duplicate intent index, or None if disabled.
+    
+    Controlled by INTENT_SIMHASH_ENABLED (default true) and
+    INTENT_SIMHASH_MAX_DISTANCE (Hamming bits, default 3); size and TTL follow
+    the exact intent cache.
+    """
+    global _similarity_index
+    if os.getenv("INTENT_SIMHASH_ENABLED", "true").lower() != "true":
+        return None
+    if _similarity_index is None:
+        _similarity_index = SimHashIndex(
+            max_distance=int(os.getenv("INTENT_SIMHASH_MAX_DISTANCE", "3")),
+            maxsize=int(os.getenv("INTENT_CACHE_SIZE", "1000")),
+            ttl=float(os.getenv("INTENT_CACHE_TTL_SECONDS", "3600"))
+        )
+    return _similarity_index
+
+
+def cache_key_includes_workflow() -> bool:
+    """Whether intent cache lookups are scoped to the incoming workflow_id."""
+    return os.getenv("INTENT_CACHE_KEY_WORKFLOW", "false").lower() == "true"
+
+
+def normalize_short_reply(user_query: str) -> str:
+    """Lowercase a message and strip surrounding punctuation/whitespace."""
+    return " ".join(user_query.lower().split()).strip(string.punctuation + " ")
+
 
 class IntentDetectionNode:
     """
@@ -30,19 +105,18 @@ class IntentDetectionNode:
     
     def __init__(self):
         """Initialize the Intent Detection Node with GPT-3.5-turbo."""
-        # Use GPT-3.5-turbo for cost efficiency as specified in PRD
-        api_key = os.getenv("OPENAI_API_KEY")
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0.1,  # Low temperature for consistent routing
-            api_key=SecretStr(api_key) if api_key else None
-        )
+        # Use GPT-3.5-turbo for cost efficiency as specified in PRD,
+        # low temperature for consistent routing
+        clients = get_llm_clients()
+        self.llm = clients.chat_openai(INTENT_MODEL, 0.1)
         
-        # Bind structured output schema for intent routing
-        self.router = self.llm.with_structured_output(IntentRoute)
+        # Bind structured output schema for intent routing (cached per process)
+        self.router = clients.structured_openai(INTENT_MODEL, 0.1, IntentRoute)
         
-        # Cache for similar queries (simple in-memory cache)
-        self._intent_cache: Dict[str, IntentRoute] = {}
+        # Process-level LRU + TTL cache shared by every node instance
+        self._intent_cache = get_intent_cache()
+        # Near-duplicate lookup for templated phrasings (None when disabled)
+        self._similarity_index = get_similarity_index()
         
     def _get_intent_prompt(self) -> str:
         """
@@ -50,55 +124,39 @@ class IntentDetectionNode:
         
         Based on Drift PRD workflow specifications.
         """
-        return """You are an intelligent routing assistant for Drift, a B2B SaaS platform for automotive dealership salespeople.
-
-CRITICAL CONTEXT: ALL users are dealership salespeople. They use Drift to create personalized vehicle showrooms FOR their customers. This is a B2B2C model where:
-- Drift serves dealerships (B2B)
-- Dealerships serve customers (B2C)
-- All users are salespeople creating showrooms for their customers
-
-Your job is to analyze salesperson messages and route them to the correct workflow:
-
-**Workflow 1 (General)**: Route here when salespeople are:
-- Asking general questions about how Drift works
-- Requesting support or help with the platform
-- Making small talk or unclear requests
-- Asking about platform features or pricing
-- Having technical issues
-
-**Workflow 2 (Shopper Showroom)**: Route here when salespeople are:
-- Creating a showroom FOR a customer who is shopping for a vehicle
-- Setting up a personalized experience for a specific customer
-- Mentioning customer names, customer preferences, or customer needs
-- Saying things like "my customer wants", "create a showroom for", "customer is looking for"
-- Collecting data to personalize a customer's vehicle shopping experience
-
-**Workflow 3 (Personal Showroom)**: Route here when salespeople are:
-- Creating their own personal vehicle showcase (like a digital business card)
-- Building their personal collection of favorite vehicles to show customers
-- Creating a showcase of their top vehicle picks
-- Setting up their individual salesperson profile with preferred vehicles
-
-**Key Detection Patterns:**
-- Shopper Showroom signals: "my customer", "for [customer name]", "customer wants", "create showroom for", "customer is looking"
-- Personal Showroom signals: "my showroom", "my personal", "my favorite vehicles", "my top picks", "my vehicle showcase"
-- General signals: "how does this work", "help", "support", "what can Drift do", greetings
-
-**Entity Extraction:**
-Extract relevant entities like customer names, vehicle preferences, dealership info, salesperson details.
-
-Provide a confidence score based on how clear the intent is:
-- 0.9-1.0: Very clear intent with strong signals
-- 0.7-0.8: Moderately clear intent
-- 0.5-0.6: Somewhat unclear, best guess
-- 0.3-0.4: Very unclear, defaulting to general
-
-Always provide reasoning for your routing decision."""
-
-    def _extract_cache_key(self, user_query: str) -> str:
-        """Generate a cache key for the user query."""
-        # Simple cache key based on normalized query
-        return user_query.lower().strip()[:100]
+        return render_prompt("intent_router").text
+
+    def _extract_cache_key(self, user_query: str, workflow_id: Optional[int] = None) -> Union[str, Tuple[int, str]]:
+        """
+        Generate a cache key for the user query.
+        
+        The key hashes the whole lowercased, whitespace-collapsed message, so
+        long messages that only share a prefix never share an entry. With
+        INTENT_CACHE_KEY_WORKFLOW=true the incoming workflow_id is part of the
+        key, so the same message can route differently per workflow.
+        """
+        key = hashlib.sha256(" ".join(user_query.lower().split()).encode()).hexdigest()
+        if cache_key_includes_workflow():
+            return (workflow_id or 1, key)
+        return key
+    
+    def _short_reply_route(self, user_query: str, workflow_id: Optional[int]) -> Optional[IntentRoute]:
+        """
+        Route acknowledgements and greetings without the LLM.
+        
+        "yes", "proceed", "thanks", "hi" etc. carry no routing signal of
+        their own, so they stay in the incoming workflow.
+        
+        Returns:
+            IntentRoute for a short reply, None otherwise
+        """
+        if normalize_short_reply(user_query) not in SHORT_REPLIES:
+            return None
+        return IntentRoute(
+            workflow_id=workflow_id if workflow_id in (1, 2, 3) else 1,
+            confidence=0.9,
+            reasoning="Short reply with no routing signal, continuing the current workflow."
+        )
     
     def _extract_salesperson_patterns(self, user_query: str) -> Dict[str, Any]:
         """
@@ -110,59 +168,64 @@ Always provide reasoning for your routing decision."""
         Returns:
             Dictionary of detected patterns and entities
         """
-        query_lower = user_query.lower()
         patterns = {
             "customer_references": [],
             "workflow_signals": [],
             "confidence_boost": 0.0
         }
         
-        # Customer reference patterns (strong signal for Workflow 2)
-        customer_patterns = [
-            "my customer", "my client", "customer wants", "customer needs", 
-            "customer is looking", "client is looking", "for my customer",
-            "customer who", "client who", "customer named", "client named",
-            "create a showroom for", "build a showroom for", "showroom for"
-        ]
-        
-        for pattern in customer_patterns:
-            if pattern in query_lower:
+        # One pass over the message for every keyword group
+        for pattern, group in SIGNAL_MATCHER.find(user_query):
+            if group == "customer":
                 patterns["customer_references"].append(pattern)
                 patterns["workflow_signals"].append(2)  # Shopper Showroom
                 patterns["confidence_boost"] += 0.1
-        
-        # Personal showroom patterns (strong signal for Workflow 3)
-        personal_patterns = [
-            "my showroom", "my personal", "my favorite vehicles",
-            "my top picks", "my vehicle showcase", "my own showroom",
-            "personal showcase", "my preferred vehicles"
-        ]
-        
-        for pattern in personal_patterns:
-            if pattern in query_lower:
+            elif group == "personal":
                 patterns["workflow_signals"].append(3)  # Personal Showroom
                 patterns["confidence_boost"] += 0.1
-        
-        # General/support patterns (signal for Workflow 1)
-        support_patterns = [
-            "how does", "how do i", "what is", "what are", "help me understand",
-            "can you explain", "i need help", "technical issue", "problem with"
-        ]
-        
-        for pattern in support_patterns:
-            if pattern in query_lower:
+            elif group == "support":
                 patterns["workflow_signals"].append(1)  # General
                 patterns["confidence_boost"] += 0.05
         
         # Extract customer names (helps with entity extraction)
-        import re
-        name_patterns = re.findall(r"(?:customer|client) (?:named |called )?([A-Z][a-z]+ ?[A-Z]?[a-z]*)", user_query)
+        name_patterns = CUSTOMER_NAME_RE.findall(user_query)
         if name_patterns:
             patterns["customer_names"] = name_patterns
             patterns["confidence_boost"] += 0.05
         
         return patterns
     
+    def _rule_based_route(self, patterns: Dict[str, Any]) -> Optional[IntentRoute]:
+        """
+        Route directly from keyword evidence, skipping the LLM.
+        
+        Only used when every detected signal points to the same workflow and
+        the boosted confidence reaches INTENT_RULE_CONFIDENCE_THRESHOLD
+        (default 0.8; set above 1 to disable).
+        
+        Args:
+            patterns: Output of _extract_salesperson_patterns
+            
+        Returns:
+            IntentRoute, or None if the evidence is ambiguous or too weak
+        """
+        signals = set(patterns.get("workflow_signals", []))
+        if len(signals) != 1:
+            return None
+        
+        confidence = min(RULE_BASE_CONFIDENCE + patterns.get("confidence_boost", 0.0), 1.0)
+        threshold = float(os.getenv("INTENT_RULE_CONFIDENCE_THRESHOLD", "0.8"))
+        if confidence < threshold:
+            return None
+        
+        workflow_id = signals.pop()
+        matched = ", ".join(patterns.get("customer_references", [])) or f"workflow {workflow_id} keywords"
+        return IntentRoute(
+            workflow_id=workflow_id,
+            confidence=round(confidence, 2),
+            reasoning=f"Rule-based routing from unambiguous pattern evidence: {matched}."
+        )
+    
     async def detect_intent(self, state: ConversationState) -> ConversationState:
         """
         Detect user intent and route to appropriate workflow.
@@ -175,31 +238,68 @@ Always provide reasoning for your routing decision."""
         """
         try:
             user_query = state.user_query
-            cache_key = self._extract_cache_key(user_query)
-            
-            # Extract salesperson patterns for enhanced classification
-            salesperson_patterns = self._extract_salesperson_patterns(user_query)
-            if salesperson_patterns is None:
-                salesperson_patterns = {}
+            cache_key = self._extract_cache_key(user_query, state.workflow_id)
+            detection_step = "intent_llm"
             
-            # Check cache first
-            if cache_key in self._intent_cache:
-                logger.info(f"Cache hit for query: {user_query[:50]}...")
-                intent_result = self._intent_cache[cache_key]
+            # Short replies never reach GPT
+            intent_result = self._short_reply_route(user_query, state.workflow_id)
+            if intent_result is not None:
+                detection_step = "intent_short_reply"
             else:
-                # Run intent detection with LLM
+                # Check cache first
+                cached = self._intent_cache.lookup(cache_key)
+                if cached is not None:
+                    logger.info(f"Cache hit for query: {user_query[:50]}...")
+                    # Only the route is reused; entities come from this turn's extraction
+                    intent_result = cached.model_copy(update={"extracted_entities": {}}, deep=True)
+                    detection_step = "intent_cache_hit"
+            
+            # Unambiguous keyword evidence routes without the LLM
+            salesperson_patterns: Dict[str, Any] = {}
+            if intent_result is None:
+                salesperson_patterns = self._extract_salesperson_patterns(user_query) or {}
+                intent_result = self._rule_based_route(salesperson_patterns)
+                if intent_result is not None:
+                    detection_step = "intent_rule_based"
+            
+            # Near-duplicate lookup: same phrasing with different names/numbers/URLs
+            fingerprint = None
+            namespace = (state.workflow_id or 1) if cache_key_includes_workflow() else None
+            if intent_result is None and self._similarity_index is not None:
+                fingerprint = simhash(normalize_for_similarity(user_query))
+                similar = self._similarity_index.lookup(fingerprint, namespace)
+                if similar is not None:
+                    cached, distance = similar
+                    logger.info(f"Near-duplicate cache hit (distance={distance}) for query: {user_query[:50]}...")
+                    # Entities belong to the original message, not this one
+                    intent_result = cached.model_copy(update={"extracted_entities": {}}, deep=True)
+                    detection_step = "intent_similarity_hit"
+            
+            # Local trained classifier, trusted above its calibrated threshold
+            classifier = get_intent_classifier()
+            if intent_result is None and classifier is not None:
+                predicted_workflow, probability = classifier.predict(user_query)
+                if probability >= classifier_threshold():
+                    intent_result = IntentRoute(
+                        workflow_id=predicted_workflow,
+                        confidence=round(probability, 4),
+                        reasoning=f"Local intent classifier (p={probability:.2f})."
+                    )
+                    detection_step = "intent_classifier"
+            
+            if intent_result is None:
+                # Run intent detection with LLM, using the patterns for enhanced classification
                 logger.info(f"Running intent detection for: {user_query[:50]}...")
                 
-                intent_result = await self._run_intent_detection(user_query, salesperson_patterns)
+                intent_result = await self._run_intent_detection(user_query, salesperson_patterns, state=state)
                 
-                # Cache the result
-                self._intent_cache[cache_key] = intent_result
+                # Training data for the local classifier
+                await log_routing_decision(user_query, intent_result.workflow_id, intent_result.confidence, "llm")
                 
-                # Keep cache size reasonable (simple LRU)
-                if len(self._intent_cache) > 100:
-                    # Remove oldest entry
-                    oldest_key = next(iter(self._intent_cache))
-                    del self._intent_cache[oldest_key]
+                # Cache the result (LRU + TTL eviction handled by the cache)
+                self._intent_cache[cache_key] = intent_result.model_copy(deep=True)
+                if fingerprint is not None:
+                    self._similarity_index.add(fingerprint, intent_result.model_copy(deep=True), namespace)
             
             # Update state with intent detection results
             state_dict = state.model_dump()
@@ -210,6 +310,7 @@ Always provide reasoning for your routing decision."""
             updated_state.intent_reasoning = intent_result.reasoning
             updated_state.llm_model_used = "gpt-3.5-turbo"
             updated_state.processing_steps.append("intent_detection")
+            updated_state.processing_steps.append(detection_step)
             
             # Ensure collected_data is always a dict
             if updated_state.collected_data is None:
@@ -241,13 +342,19 @@ Always provide reasoning for your routing decision."""
             
             return updated_state
     
-    async def _run_intent_detection(self, user_query: str, patterns: Optional[Dict[str, Any]] = None) -> IntentRoute:
+    async def _run_intent_detection(
+        self,
+        user_query: str,
+        patterns: Optional[Dict[str, Any]] = None,
+        state: Optional[ConversationState] = None
+    ) -> IntentRoute:
         """
         Run the actual intent detection using the LLM with enhanced pattern analysis.
         
         Args:
             user_query: User's message to analyze
             patterns: Extracted salesperson patterns for enhanced classification
+            state: Conversation state to record token usage on
             
         Returns:
             IntentRoute with workflow_id and metadata
@@ -266,10 +373,13 @@ Always provide reasoning for your routing decision."""
             if patterns.get("customer_names"):
                 pattern_context += f"\nCUSTOMER NAMES DETECTED: {', '.join(patterns['customer_names'])}"
         
+        system_prompt = self._get_intent_prompt()
+        fixed_tokens = messages_tokens([system_prompt, pattern_context], INTENT_MODEL)
+        user_query, _, _ = apply_input_budget("intent_detection", fixed_tokens, user_query, model=INTENT_MODEL)
         enhanced_message = f"Salesperson message: {user_query}{pattern_context}"
         
         messages = [
-            SystemMessage(content=self._get_intent_prompt()),
+            SystemMessage(content=system_prompt),
             HumanMessage(content=enhanced_message)
         ]
         
@@ -279,6 +389,7 @@ Always provide reasoning for your routing decision."""
         # If result is a dict, convert to IntentRoute
         if isinstance(result, dict):
             result = IntentRoute(**result)
+        record_llm_call(state, "intent_detection", INTENT_MODEL, messages, result)
             
         # Apply confidence boost from pattern analysis
         if patterns and patterns.get("confidence_boost", 0) > 0:
@@ -328,6 +439,63 @@ async def intent_detection_node(state: ConversationState) -> ConversationState:
     return await node.detect_intent(state)
 
 
+def sticky_workflow_enabled() -> bool:
+    """Whether in-progress collections may skip intent detection (ENABLE_STICKY_WORKFLOW, default true)."""
+    return os.getenv("ENABLE_STICKY_WORKFLOW", "true").lower() == "true"
+
+
+def is_sticky_turn(state: ConversationState) -> bool:
+    """
+    Whether this message continues the current showroom collection as-is.
+    
+    True when workflow 2/3 is active or in optional collection, the message
+    carries no switch/cancel request and no signal for another workflow, and
+    it looks like an answer to current_field (or, with no current_field, a
+    short reply / proceed request).
+    
+    Args:
+        state: Incoming conversation state
+        
+    Returns:
+        True if intent detection can be skipped
+    """
+    if state.workflow_id not in (2, 3) or state.workflow_status not in ("active", "optional_collection"):
+        return False
+    
+    labels = SIGNAL_MATCHER.labels(state.user_query)
+    if "switch" in labels:
+        return False
+    if any(GROUP_WORKFLOWS[label] != state.workflow_id for label in labels if label in GROUP_WORKFLOWS):
+        return False
+    
+    if state.current_field:
+        return looks_like_field_answer(state.user_query, state.current_field)
+    return "proceed" in labels or normalize_short_reply(state.user_query) in SHORT_REPLIES
+
+
+# Conditional entry point for LangGraph routing
+def route_at_entry(state: ConversationState) -> str:
+    """Skip intent detection for answers inside an in-progress collection."""
+    if sticky_workflow_enabled() and is_sticky_turn(state):
+        logger.info(f"Sticky workflow {state.workflow_id}: message answers {state.current_field}, skipping intent detection")
+        return "sticky_workflow"
+    return "intent_detection"
+
+
+async def sticky_workflow_node(state: ConversationState) -> ConversationState:
+    """
+    Keep the incoming workflow without an LLM call.
+    
+    Mirrors the state intent_detection_node hands to data collection:
+    collected_data starts empty for this message.
+    """
+    state.collected_data = {}
+    state.intent_confidence = 1.0
+    state.intent_reasoning = f"Continuing workflow {state.workflow_id}: message answers {state.current_field or 'the last question'}."
+    state.processing_steps.append("intent_sticky")
+    return state
+
+
 # Conditional edge function for LangGraph routing
 def route_by_intent(state: ConversationState) -> str:
     """Route to the correct workflow based on ConversationState.workflow_id."""
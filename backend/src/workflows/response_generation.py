@@ -4,16 +4,16 @@ Response generation and next step determination nodes.
 These nodes handle final response processing and determine
 whether the conversation should continue with additional questions.
 """
-import os
 import logging
 from typing import Dict, Any
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage
-from pydantic import SecretStr
 
 from ..models.schemas import ConversationState
+from ..prompts import get_prompt_registry, render_prompt
 from .data_collection import FIELD_DESCRIPTIONS
+from ..utils.llm_clients import get_llm_clients
+from ..utils.token_accounting import apply_input_budget, record_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -45,32 +45,33 @@ async def generate_response_node(state: ConversationState) -> ConversationState:
             return state
         
         # Fallback response generation if needed
-        llm = ChatOpenAI(
-            model=GPT_MODEL,
-            temperature=0.7,
-            api_key=get_secret("OPENAI_API_KEY")
-        )
+        llm = get_llm_clients().chat_openai(GPT_MODEL, 0.7)
         
         # Build context from collected data
         data_context = getattr(state, "collected_data", {})
+        user_query, data_context, _ = apply_input_budget(
+            "response_generation",
+            get_prompt_registry().get("fallback_response").prefix_token_count,
+            state.user_query,
+            data_context,
+            model=GPT_MODEL
+        )
         data_summary = f"\nCollected data: {data_context}" if data_context else ""
         
-        system_prompt = f"""You are a helpful assistant for Drift, a B2B SaaS platform for automotive dealership salespeople.
-
-Context:
-- Salesperson query: {state.user_query}
-- Workflow ID: {getattr(state, 'workflow_id', 'unknown')}{data_summary}
-
-Generate a helpful, conversational response that acknowledges the salesperson's input and guides them toward their showroom creation goals (either for customers or their personal showroom).
-
-Always address them as a salesperson. Keep responses concise and natural."""
+        system_prompt = render_prompt(
+            "fallback_response",
+            user_query=user_query,
+            workflow_id=getattr(state, 'workflow_id', 'unknown'),
+            data_summary=data_summary
+        ).text
 
         messages = [
             SystemMessage(content=system_prompt),
-            HumanMessage(content=state.user_query)
+            HumanMessage(content=user_query)
         ]
         
         result = await llm.ainvoke(messages)
+        record_llm_call(state, "response_generation", GPT_MODEL, messages, result)
         content = getattr(result, "content", result)
         if isinstance(content, list):
             content = " ".join(str(x) for x in content)
@@ -173,18 +174,4 @@ async def determine_next_step_node(state: ConversationState) -> ConversationStat
     return state
 
 
-def get_secret(key: str) -> SecretStr:
-    """
-    Get secret value from environment variable.
-    
-    Args:
-        key: Environment variable name
-        
-    Returns:
-        SecretStr containing the value or None
-    """
-    val = os.getenv(key)
-    return SecretStr(val) if val else None
-
-
 __all__ = ["generate_response_node", "determine_next_step_node"]
\ No newline at end of file
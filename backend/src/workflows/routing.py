@@ -4,15 +4,17 @@ LangGraph workflow routing and orchestration.
 This module manages the workflow state transitions and routing logic
 for the Drift chat processing system.
 """
+import os
 import logging
 from typing import Dict, Any
 
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 
+from ..checkpointing import create_checkpointer, journaled
 from ..models.schemas import ConversationState
-from .intent_detection import intent_detection_node, route_by_intent
+from .intent_detection import intent_detection_node, route_by_intent, route_at_entry, sticky_workflow_node
 from .data_collection import data_collection_node
+from .combined_collection import combined_collection_node
 
 # Import workflow nodes - these will be imported from their respective modules
 from .general_workflow import general_workflow_node
@@ -31,25 +33,45 @@ def create_chat_workflow():
     and edges according to the PRD specifications.
     
     Returns:
-        Compiled LangGraph workflow with memory persistence
+        Compiled LangGraph workflow with checkpoint persistence
     """
     
     # Define the state graph using ConversationState
     workflow = StateGraph(ConversationState)
     
-    # Add all workflow nodes
-    workflow.add_node("intent_detection", intent_detection_node)
-    workflow.add_node("data_collection", data_collection_node)
-    workflow.add_node("general_workflow", general_workflow_node)
-    workflow.add_node("shopper_showroom_workflow", shopper_showroom_workflow_node)
-    workflow.add_node("personal_showroom_workflow", personal_showroom_workflow_node)
-    workflow.add_node("generate_response", generate_response_node)
-    workflow.add_node("determine_next_step", determine_next_step_node)
+    # Select the data collection implementation for this deployment:
+    # "pipeline" (default) extracts with Gemini and lets the workflow node write the reply,
+    # "combined" extracts and drafts the reply in a single structured-output call
+    collection_mode = os.getenv("DATA_COLLECTION_MODE", "pipeline").lower()
+    collection_node = combined_collection_node if collection_mode == "combined" else data_collection_node
+    logger.info(f"Using data collection mode: {collection_mode}")
+    
+    # Add all workflow nodes; outputs are logged per message so a retried
+    # message replays finished nodes instead of calling the LLMs again
+    workflow.add_node("intent_detection", journaled("intent_detection", intent_detection_node))
+    workflow.add_node("sticky_workflow", journaled("sticky_workflow", sticky_workflow_node))
+    workflow.add_node("data_collection", journaled("data_collection", collection_node))
+    workflow.add_node("general_workflow", journaled("general_workflow", general_workflow_node))
+    workflow.add_node("shopper_showroom_workflow", journaled("shopper_showroom_workflow", shopper_showroom_workflow_node))
+    workflow.add_node("personal_showroom_workflow", journaled("personal_showroom_workflow", personal_showroom_workflow_node))
+    workflow.add_node("generate_response", journaled("generate_response", generate_response_node))
+    workflow.add_node("determine_next_step", journaled("determine_next_step", determine_next_step_node))
     
     # Define workflow edges
     
-    # Entry point: Start with intent detection
-    workflow.add_edge(START, "intent_detection")
+    # Entry point: intent detection, unless the message just answers the
+    # current field of an in-progress showroom collection
+    workflow.add_conditional_edges(
+        START,
+        route_at_entry,
+        {
+            "intent_detection": "intent_detection",
+            "sticky_workflow": "sticky_workflow"
+        }
+    )
+    
+    # Sticky turns keep workflow 2/3 and go straight to data collection
+    workflow.add_edge("sticky_workflow", "data_collection")
     
     # Intent detection routes to appropriate workflow
     workflow.add_conditional_edges(
@@ -83,9 +105,8 @@ def create_chat_workflow():
     # Next step determination leads to end
     workflow.add_edge("determine_next_step", END)
     
-    # Compile the workflow with memory for state persistence
-    memory = MemorySaver()
-    app = workflow.compile(checkpointer=memory)
+    # Compile the workflow with the configured checkpointer (CHECKPOINTER_BACKEND)
+    app = workflow.compile(checkpointer=create_checkpointer())
     
     logger.info("Chat workflow created and compiled successfully")
     
@@ -120,9 +141,8 @@ def route_after_data_collection(state: ConversationState) -> str:
 
 
 # TODO: Implement these additional features as specified in Task 8:
-# 1. Redis state persistence (currently using MemorySaver)
-# 2. Timeout handling for long-running operations
-# 3. Metrics collection for performance monitoring
-# 4. Enhanced error handling and recovery mechanisms
+# 1. Timeout handling for long-running operations
+# 2. Metrics collection for performance monitoring
+# 3. Enhanced error handling and recovery mechanisms
 
 __all__ = ["create_chat_workflow", "route_after_data_collection"]
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Streaming helpers for the LangGraph chat workflow.
+
+The /webhook/chat/stream endpoint drives the compiled graph with LangGraph's
+"messages" stream mode. Every chat model invoked inside a node then emits its
+tokens as they are generated, so the workflow nodes tag the LLM that writes
+the assistant reply and only chunks carrying that tag are forwarded to the
+frontend. Extraction, routing and UI-generation calls are never streamed.
+
+Typed progress events are sent alongside the tokens, in pipeline order:
+  intent -> fields -> text -> ui
+"intent" and "fields" come from the "updates" stream mode as soon as
+intent_detection (or sticky_workflow, which stands in for it on sticky turns)
+and data_collection finish. The workflow nodes emit "text"
+and "ui" themselves through the "custom" stream mode, so the reply text goes
+out before the UI-generation call has returned.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from langgraph.config import get_stream_writer
+
+# Tag attached to the chat model that produces the user-visible reply
+RESPONSE_STREAM_TAG = "assistant_response"
+
+# Markers the workflow nodes use to embed generated JSX in assistant_message
+UI_COMPONENT_START = "[UI_COMPONENT_START]"
+UI_COMPONENT_END = "[UI_COMPONENT_END]"
+
+# Nodes that decide the workflow for the message, each followed by an "intent" event
+INTENT_NODES = ("intent_detection", "sticky_workflow")
+
+# Nodes whose tagged LLM output is forwarded as SSE delta events
+STREAMING_NODES = (
+    "general_workflow",
+    "shopper_showroom_workflow",
+    "personal_showroom_workflow",
+)
+
+
+def extract_text_delta(chunk: Any, metadata: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Return the assistant text carried by a "messages" stream chunk.
+
+    Args:
+        chunk: Message chunk emitted by LangGraph
+        metadata: Stream metadata for the chunk (node name, tags, ...)
+
+    Returns:
+        Text delta to forward to the client, or None if the chunk should be dropped
+    """
+    metadata = metadata or {}
+    if metadata.get("langgraph_node") not in STREAMING_NODES:
+        return None
+    if RESPONSE_STREAM_TAG not in (metadata.get("tags") or []):
+        return None
+
+    content = getattr(chunk, "content", None)
+    if isinstance(content, list):
+        # Some providers stream content as a list of parts
+        content = "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    if not content:
+        return None
+    return str(content)
+
+
+def emit_stream_event(event: str, data: Dict[str, Any]) -> None:
+    """
+    Send a typed event to the "custom" stream of the running graph.
+
+    This is a no-op when the node is not executed inside a graph run
+    (e.g. when called directly), so nodes can emit unconditionally.
+
+    Args:
+        event: SSE event name
+        data: JSON-serializable payload
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer({"event": event, "data": data})
+
+
+def node_update_events(node: str, update: Any) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Map a finished graph node to the typed SSE events it should produce.
+
+    Only the INTENT_NODES and data_collection are mapped here; the workflow
+    nodes emit their "text" and "ui" events through emit_stream_event.
+
+    Args:
+        node: Name of the node that just finished
+        update: State written by the node ("updates" stream mode)
+
+    Returns:
+        List of (event name, payload) tuples, possibly empty
+    """
+    if not isinstance(update, dict):
+        update = update.model_dump() if hasattr(update, "model_dump") else {}
+
+    if node in INTENT_NODES:
+        return [("intent", {
+            "workflow_id": update.get("workflow_id"),
+            "confidence": update.get("intent_confidence")
+        })]
+
+    if node == "data_collection":
+        return [("fields", {
+            "newly_collected_fields": update.get("newly_collected_fields", []),
+            "current_field": update.get("current_field"),
+            "validation_status": update.get("validation_status")
+        })]
+
+    return []
+
+
+__all__ = [
+    "RESPONSE_STREAM_TAG",
+    "INTENT_NODES",
+    "STREAMING_NODES",
+    "UI_COMPONENT_START",
+    "UI_COMPONENT_END",
+    "extract_text_delta",
+    "emit_stream_event",
+    "node_update_events"
+]
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the bounded in-memory checkpointer (CHECKPOINTER_BACKEND=memory).
+
+Runs a small LangGraph workflow against BoundedMemorySaver and checks that
+each thread keeps only its last checkpoints (and only the blobs and writes
+they still reference) without changing the conversation state, and that the
+byte budget evicts least recently used threads - never the one being written -
+while the byte count stays exact.
+
+No running service or API keys needed.
+
+Usage: python test_checkpoint_memory.py
+"""
+
+import asyncio
+import logging
+import operator
+from typing import Annotated, TypedDict
+
+logging.disable(logging.CRITICAL)
+
+from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.checkpointing import BoundedMemorySaver
+
+
+class State(TypedDict):
+    items: Annotated[list, operator.add]
+    turns: int
+
+
+def build(saver):
+    workflow = StateGraph(State)
+    workflow.add_node("collect", lambda state: {"items": ["collected"], "turns": state.get("turns", 0) + 1})
+    workflow.add_node("respond", lambda state: {"items": ["responded"]})
+    workflow.add_edge(START, "collect")
+    workflow.add_edge("collect", "respond")
+    workflow.add_edge("respond", END)
+    return workflow.compile(checkpointer=saver)
+
+
+def thread(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def consistent(saver: BoundedMemorySaver) -> bool:
+    """Whether the tracked byte count matches a fresh measurement of every thread."""
+    return saver._bytes == sum(saver._thread_bytes(thread_id) for thread_id in saver._lru)
+
+
+async def pruning_checks() -> list:
+    bounded = BoundedMemorySaver(max_checkpoints_per_thread=3, max_bytes=0)
+    unbounded = InMemorySaver()
+    graph, reference = build(bounded), build(unbounded)
+    for turn in range(6):
+        state = await graph.ainvoke({"items": [f"message {turn}"]}, thread("t1"))
+        expected = await reference.ainvoke({"items": [f"message {turn}"]}, thread("t1"))
+
+    history = [item async for item in graph.aget_state_history(thread("t1"))]
+    live_versions = {
+        (channel, version)
+        for checkpoints in bounded.storage["t1"].values()
+        for checkpoint, _, _ in checkpoints.values()
+        for channel, version in bounded.serde.loads_typed(checkpoint)["channel_versions"].items()
+    }
+    return [
+        ("pruning leaves the conversation state unchanged", state == expected and state["turns"] == 6),
+        ("only the last checkpoints are kept", len(history) == 3 and bounded.stats()["checkpoints"] == 3),
+        ("pruned checkpoints are counted", bounded.stats()["pruned_checkpoints"] == len(unbounded.storage["t1"][""]) - 3),
+        ("blobs of pruned checkpoints are dropped",
+         all((key[2], key[3]) in live_versions for key in bounded.blobs) and len(bounded.blobs) < len(unbounded.blobs)),
+        ("writes of pruned checkpoints are dropped",
+         all(key[2] in bounded.storage["t1"][""] for key in bounded.writes)),
+        ("latest state still loads", (await graph.aget_state(thread("t1"))).values["turns"] == 6),
+        ("byte count is exact", consistent(bounded))
+    ]
+
+
+async def budget_checks() -> list:
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=2, max_bytes=9000)
+    graph = build(saver)
+    for index in range(6):
+        await graph.ainvoke({"items": ["x" * 300]}, thread(f"u{index}"))
+        if index == 3:
+            # Touch u0 so it becomes the most recently used of the first four
+            await graph.aget_state(thread("u0"))
+
+    stats = saver.stats()
+    checks = [
+        ("memory stays within the budget", 0 < stats["bytes"] <= 9000),
+        ("threads were evicted", stats["evictions"] > 0 and stats["threads"] < 6),
+        ("the thread just written is kept", list(saver._lru)[-1] == "u5"),
+        ("least recently used threads go first, a recently read one stays",
+         "u1" not in saver._lru and "u0" in saver._lru),
+        ("evicted threads are gone without a cold store", (await graph.aget_state(thread("u1"))).values == {}),
+        ("byte count is exact after evictions", consistent(saver))
+    ]
+
+    huge = BoundedMemorySaver(max_bytes=500)
+    state = await build(huge).ainvoke({"items": ["y" * 2000]}, thread("big"))
+    checks.append(("a thread larger than the budget is still served",
+                   state["items"][0] == "y" * 2000 and "big" in huge._lru))
+
+    saver.delete_thread("u5")
+    checks.append(("delete_thread releases its bytes", "u5" not in saver._lru and consistent(saver)))
+    return checks
+
+
+async def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing bounded checkpoint memory...")
+    print("=" * 50)
+    checks = await pruning_checks() + await budget_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Checkpoint memory is pruned and bounded.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact checkpoint serializer (CHECKPOINT_SERIALIZER=compact).
+
+Checks that checkpoint values round-trip through msgpack + zstd, that the
+shipped dictionary compresses sample states and keeps its id however
+sample_states() changes, that payloads written with an older shipped
+dictionary still decode after a new version is added, and that a checkpoint
+written with an unknown dictionary is treated as missing by both
+checkpointers instead of failing the conversation.
+
+No running service or API keys needed.
+
+Usage: python test_checkpoint_serde.py
+"""
+
+import io
+import os
+import asyncio
+import logging
+import operator
+import tempfile
+import contextlib
+from typing import Annotated, TypedDict
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+logging.disable(logging.CRITICAL)
+
+from langgraph.graph import StateGraph, START, END
+
+from src.checkpointing import BoundedMemorySaver, DurableCheckpointSaver, SegmentStore, SQLiteKVStore
+from src.checkpointing import serde
+from src.checkpointing.serde import (
+    CompactSerializer,
+    UnknownDictionaryError,
+    compact_channel_values,
+    load_or_train_dictionary,
+    load_shipped_dictionaries,
+    read_dictionary,
+    sample_states,
+    shipped_dictionary_paths
+)
+from src.models.schemas import ConversationState
+
+
+class State(TypedDict):
+    items: Annotated[list, operator.add]
+    turns: int
+
+
+def build(saver):
+    workflow = StateGraph(State)
+    workflow.add_node("collect", lambda state: {"items": ["collected"], "turns": state.get("turns", 0) + 1})
+    workflow.add_edge(START, "collect")
+    workflow.add_edge("collect", END)
+    return workflow.compile(checkpointer=saver)
+
+
+def thread(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def train(directory: str, name: str, seed: int):
+    """Train a dictionary with the CLI, as a maintainer adding a version would."""
+    path = os.path.join(directory, name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        serde.main(["train", "--output", path, "--samples", "100", "--seed", str(seed)])
+    return read_dictionary(path)
+
+
+def round_trip_checks() -> list:
+    compact = CompactSerializer(load_or_train_dictionary())
+    state = ConversationState(
+        user_query="My customer Allie Davis wants a Tahoe", conversation_id=7, workflow_id=2,
+        collected_data={"shopper_name": "Allie Davis", "vehiclesearchpreference": [{"make": "Chevrolet", "model": "Tahoe"}]}
+    ).model_dump()
+    values = [state, {"items": ["a", "b"], "turns": 3}, "short", 42, None, b"\x00\x01" * 100]
+    checks = [("values round-trip", all(compact.loads_typed(compact.dumps_typed(value)) == value for value in values))]
+    checks.append(("larger payloads are compressed with the dictionary",
+                   compact.dumps_typed(state)[0] == f"msgpack+zstd:{compact.dict_id}"))
+    checks.append(("small payloads stay uncompressed", compact.dumps_typed({"turns": 1})[0] == "msgpack"))
+
+    for sample in sample_states(50, seed=7):
+        compact.loads_typed(compact.dumps_typed(sample))
+    checks.append(("sample states compress", compact.stats()["compression_ratio"] > 2))
+
+    capped = compact_channel_values({"processing_steps": [str(i) for i in range(50)], "token_usage": {"total": 1}, "turns": 1})
+    checks.append(("diagnostic channels are capped",
+                   capped == {"processing_steps": [str(i) for i in range(30, 50)], "turns": 1}))
+    return checks
+
+
+def dictionary_checks(tmp: str) -> list:
+    shipped = read_dictionary(shipped_dictionary_paths()[-1])
+
+    def retrain(*args, **kwargs):
+        raise AssertionError("dictionary was retrained")
+
+    original, serde.sample_states = serde.sample_states, retrain
+    try:
+        loaded = load_or_train_dictionary()
+        stable = loaded.dict_id() == shipped.dict_id()
+    except AssertionError:
+        stable = False
+    finally:
+        serde.sample_states = original
+    checks = [("the shipped dictionary is loaded, not retrained from sample states", stable)]
+
+    directory = os.path.join(tmp, "dictionaries")
+    v1 = train(directory, "checkpoint-v1.zdict", seed=1)
+    v2 = train(directory, "checkpoint-v2.zdict", seed=2)
+    try:
+        train(directory, "checkpoint-v2.zdict", seed=3)
+        refused = False
+    except SystemExit:
+        refused = True
+    checks.append(("the training CLI won't replace a shipped version", refused))
+    checks.append(("versions are ordered by number", [d.dict_id() for d in load_shipped_dictionaries(directory)]
+                   == [v1.dict_id(), v2.dict_id()] and v1.dict_id() != v2.dict_id()))
+
+    old = CompactSerializer(v1)
+    new = CompactSerializer(v2, previous_dictionaries=load_shipped_dictionaries(directory))
+    state = sample_states(1, seed=5)[0]
+    checks.append(("a payload from an older shipped dictionary still decodes",
+                   new.loads_typed(old.dumps_typed(state)) == state))
+    try:
+        CompactSerializer(shipped).loads_typed(old.dumps_typed(state))
+        unknown = False
+    except UnknownDictionaryError:
+        unknown = True
+    checks.append(("an unknown dictionary raises UnknownDictionaryError", unknown))
+    return checks
+
+
+async def checkpointer_checks(tmp: str) -> list:
+    checks = []
+    foreign = CompactSerializer(train(tmp, "foreign.zdict", seed=9))
+    current = CompactSerializer(load_or_train_dictionary(), previous_dictionaries=load_shipped_dictionaries())
+
+    path = os.path.join(tmp, "checkpoints.sqlite3")
+    writer = DurableCheckpointSaver(SQLiteKVStore(path), serde=foreign)
+    await build(writer).ainvoke({"items": ["x" * 200]}, thread("t1"))
+    await writer.aflush()
+    reader = DurableCheckpointSaver(SQLiteKVStore(path), serde=current)
+    graph = build(reader)
+    state = (await graph.aget_state(thread("t1"))).values
+    checks.append(("durable: an unreadable snapshot is a cache miss", state == {} and reader.stats()["unreadable"] == 1))
+    await graph.aget_state(thread("t1"))
+    checks.append(("durable: it is not retried on every access", reader.stats()["unreadable"] == 1))
+    await graph.ainvoke({"items": ["hi"]}, thread("t1"))
+    await reader.aflush()
+    state = (await build(DurableCheckpointSaver(SQLiteKVStore(path), serde=current)).aget_state(thread("t1"))).values
+    checks.append(("durable: the conversation continues and its next flush replaces the snapshot",
+                   state["items"] == ["hi", "collected"] and state["turns"] == 1))
+
+    cold_dir = os.path.join(tmp, "cold")
+    store = SegmentStore(cold_dir)
+    spiller = BoundedMemorySaver(cold_store=store, serde=foreign)
+    await build(spiller).ainvoke({"items": ["y" * 200]}, thread("t2"))
+    spiller._evict("t2")
+    store.close()
+    store = SegmentStore(cold_dir)
+    rehydrating = BoundedMemorySaver(cold_store=store, serde=current)
+    graph = build(rehydrating)
+    state = (await graph.aget_state(thread("t2"))).values
+    checks.append(("memory: an unreadable cold snapshot is a miss and is discarded",
+                   state == {} and rehydrating.stats()["unreadable"] == 1 and "t2" not in store))
+    state = await graph.ainvoke({"items": ["hi"]}, thread("t2"))
+    checks.append(("memory: the conversation starts over", state["items"] == ["hi", "collected"]))
+    store.close()
+    return checks
+
+
+async def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing checkpoint serialization...")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        checks = round_trip_checks() + dictionary_checks(tmp) + await checkpointer_checks(tmp)
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Checkpoints round-trip and survive dictionary changes.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for long-message splitting and the chunked extraction merge.
+
+Checks that split_into_chunks() keeps every chunk within its token limit
+without losing or reordering text, that per-chunk extractions merge
+deterministically (lists unioned, same-vehicle preferences combined, notes
+joined, first value wins), and that a long message goes through data
+collection in chunks without being trimmed.
+
+No running service or API keys needed.
+
+Usage: python test_chunked_extraction.py
+"""
+
+import os
+import json
+import asyncio
+import logging
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+os.environ["EXTRACTION_OUTPUT_MODE"] = "json"
+os.environ["ENABLE_LOCAL_EXTRACTION"] = "false"
+logging.disable(logging.CRITICAL)
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.models.schemas import ConversationState
+from src.utils.chunking import split_into_chunks
+from src.utils.tokens import count_tokens
+from src.workflows.chunked_extraction import extract_in_chunks, merge_chunk_extractions
+from src.workflows.data_collection import DataCollectionNode
+
+LISTING = "\n".join(
+    f"Stock #{i}: 2022 Chevrolet Tahoe LT, {10000 + i * 150} miles, ${45000 + i * 100}. "
+    f"Black exterior, jet black leather interior. https://www.smithmotors.com/inventory/tahoe-{i}"
+    for i in range(40)
+)
+
+
+def chunking_checks() -> list:
+    checks = []
+    chunks = split_into_chunks(LISTING, 200)
+    checks.append(("long listing is split", len(chunks) > 1))
+    checks.append(("every chunk fits the limit", all(count_tokens(chunk) <= 200 for chunk in chunks)))
+    checks.append(("no text lost or reordered", " ".join(chunks).split() == LISTING.split()))
+    checks.append(("lines are not cut when they fit",
+                   all(line in LISTING.splitlines() for chunk in chunks for line in chunk.splitlines())))
+
+    checks.append(("short text is one chunk", split_into_chunks("my customer is Allie", 200) == ["my customer is Allie"]))
+
+    sentence = "word " * 600
+    pieces = split_into_chunks(sentence, 100)
+    checks.append(("over-long sentence is hard-split within the limit",
+                   len(pieces) > 1 and all(count_tokens(piece) <= 100 for piece in pieces)))
+    return checks
+
+
+def merge_checks() -> list:
+    merged = merge_chunk_extractions([
+        {"shopper_name": "Allie Davis", "vehicledetailspage_urls": ["https://a.com/1", "https://a.com/2"],
+         "vehiclesearchpreference": [{"make": "Chevrolet", "model": "Tahoe", "exterior_color": ["black"]}],
+         "shopper_notes": "has 2 kids"},
+        {"extracted": False},
+        {"shopper_name": "Allie", "vehicledetailspage_urls": ["https://a.com/2", "https://a.com/3"],
+         "vehiclesearchpreference": [
+             {"make": "chevrolet", "model": "tahoe", "price_max": 50000, "exterior_color": ["black", "white"]},
+             {"make": "BMW", "model": "X3"}
+         ],
+         "shopper_notes": "likes camping"}
+    ])
+    return [
+        ("first value wins for scalar fields", merged["shopper_name"] == "Allie Davis"),
+        ("list fields are unioned in order",
+         merged["vehicledetailspage_urls"] == ["https://a.com/1", "https://a.com/2", "https://a.com/3"]),
+        ("same make/model preferences are combined", merged["vehiclesearchpreference"] == [
+            {"make": "Chevrolet", "model": "Tahoe", "exterior_color": ["black", "white"], "price_max": 50000},
+            {"make": "BMW", "model": "X3"}
+        ]),
+        ("shopper_notes are joined", merged["shopper_notes"] == "has 2 kids likes camping"),
+        ("nothing found anywhere is 'extracted: false'",
+         merge_chunk_extractions([{"extracted": False}, {}]) == {"extracted": False})
+    ]
+
+
+async def extract_checks() -> list:
+    checks = []
+    seen = []
+
+    async def extract(chunk: str) -> dict:
+        seen.append(chunk)
+        if "Stock #0:" in chunk:
+            raise RuntimeError("provider error")
+        return {"vehicledetailspage_urls": [line.split()[-1] for line in chunk.splitlines()]}
+
+    merged, count = await extract_in_chunks(LISTING, extract, max_chunk_tokens=250)
+    checks.append(("max_chunk_tokens caps the chunk size", all(count_tokens(chunk) <= 250 for chunk in seen)))
+    checks.append(("every chunk is extracted", count == len(seen) > 1))
+    failed = [line.split()[-1] for line in seen[0].splitlines()]
+    checks.append(("a failed chunk does not sink the others",
+                   len(merged["vehicledetailspage_urls"]) == 40 - len(failed)
+                   and not set(failed) & set(merged["vehicledetailspage_urls"])))
+    return checks
+
+
+async def collection_checks() -> list:
+    os.environ["TOKEN_BUDGET_DATA_COLLECTION"] = "1500"
+    seen = []
+
+    class Spy(FakeListChatModel):
+        async def ainvoke(self, messages, *args, **kwargs):
+            seen.append(messages[-1]["content"])
+            return await super().ainvoke(messages, *args, **kwargs)
+
+    try:
+        node = DataCollectionNode(llm_client=Spy(responses=[json.dumps({"shopper_name": "Allie Davis"})] * 50))
+        state = ConversationState(
+            user_query=f"My customer is Allie Davis, she likes these:\n{LISTING}", conversation_id=7, workflow_id=2
+        )
+        state = await node.collect_data(state)
+    finally:
+        del os.environ["TOKEN_BUDGET_DATA_COLLECTION"]
+    return [
+        ("long message goes through chunked extraction",
+         any(step.startswith("chunked_extraction") for step in state.processing_steps) and len(seen) > 1),
+        ("extraction input is not trimmed", " ".join(seen).split() == state.user_query.split()),
+        ("chunk results reach collected_data", state.collected_data.get("shopper_name") == "Allie Davis")
+    ]
+
+
+async def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing chunked extraction...")
+    print("=" * 50)
+    checks = chunking_checks() + merge_checks() + await extract_checks() + await collection_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Long messages are split and merged without losing data.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable checkpointer (CHECKPOINTER_BACKEND=sqlite).
+
+Runs a small LangGraph workflow against DurableCheckpointSaver on a temporary
+SQLiteKVStore and checks that buffered writes only reach the store on flush,
+that a conversation reloads after a restart and continues on another worker,
+that a failed flush keeps its writes, and that threads expire and delete.
+
+No running service or API keys needed.
+
+Usage: python test_durable_checkpoints.py
+"""
+
+import os
+import time
+import asyncio
+import logging
+import operator
+import tempfile
+from typing import Annotated, TypedDict
+
+logging.disable(logging.CRITICAL)
+
+from langgraph.graph import StateGraph, START, END
+
+from src.checkpointing import DurableCheckpointSaver, SQLiteKVStore
+from src.checkpointing.saver import THREAD_KEY
+
+
+class State(TypedDict):
+    items: Annotated[list, operator.add]
+    turns: int
+
+
+def build(saver: DurableCheckpointSaver):
+    workflow = StateGraph(State)
+    workflow.add_node("collect", lambda state: {"items": ["collected"], "turns": state.get("turns", 0) + 1})
+    workflow.add_node("respond", lambda state: {"items": ["responded"]})
+    workflow.add_edge(START, "collect")
+    workflow.add_edge("collect", "respond")
+    workflow.add_edge("respond", END)
+    return workflow.compile(checkpointer=saver)
+
+
+def thread(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+class FailingStore(SQLiteKVStore):
+    """SQLiteKVStore whose next mset fails, like a Redis timeout."""
+
+    fail_next = False
+
+    def mset(self, mapping, ex=None):
+        if self.fail_next:
+            self.fail_next = False
+            raise ConnectionError("store unavailable")
+        super().mset(mapping, ex=ex)
+
+
+def kv_checks(path: str) -> list:
+    store = SQLiteKVStore(path)
+    store.mset({"a": b"1", "b": b"2"}, ex=60)
+    store.set("c", b"3", ex=1)
+    checks = [
+        ("mset / mget round-trip", store.mget(["a", "b", "missing"]) == [b"1", b"2", None]),
+        ("expire resets the expiry of an existing key", store.expire("c", 60) and not store.expire("missing", 60)),
+        ("delete reports existing keys", store.delete("a", "missing") == 1 and store.get("a") is None)
+    ]
+    store.set("d", b"4", ex=1)
+    time.sleep(1.1)
+    checks.append(("expired keys are invisible", store.get("d") is None and store.get("c") == b"3"))
+    store.close()
+    reopened = SQLiteKVStore(path)
+    checks.append(("values survive reopening the file", reopened.get("b") == b"2"))
+    reopened.close()
+    return checks
+
+
+async def saver_checks(path: str) -> list:
+    checks = []
+    worker1 = DurableCheckpointSaver(SQLiteKVStore(path), flush_batch=1000)
+    worker2 = DurableCheckpointSaver(SQLiteKVStore(path), flush_batch=1000)
+    graph1, graph2 = build(worker1), build(worker2)
+
+    await graph1.ainvoke({"items": ["hi"]}, thread("t1"))
+    checks.append(("unflushed writes stay in memory", worker1.store.get(THREAD_KEY.format("t1")) is None
+                   and (await graph2.aget_state(thread("t1"))).values == {}))
+    flushed = await worker1.aflush()
+    checks.append(("flush writes the dirty thread", flushed == 1 and worker1.stats()["dirty_threads"] == 0))
+    checks.append(("another worker loads the flushed thread",
+                   (await graph2.aget_state(thread("t1"))).values["items"] == ["hi", "collected", "responded"]))
+
+    await graph2.ainvoke({"items": ["again"]}, thread("t1"))
+    await worker2.aflush()
+    state = (await graph1.aget_state(thread("t1"))).values
+    checks.append(("first worker reloads the newer revision", state["turns"] == 2 and state["items"][-3:] == ["again", "collected", "responded"]))
+
+    restarted = DurableCheckpointSaver(SQLiteKVStore(path))
+    state = (await build(restarted).aget_state(thread("t1"))).values
+    checks.append(("conversation reloads after a restart", state["turns"] == 2 and restarted.stats()["loads"] == 1))
+    history = [item async for item in build(restarted).aget_state_history(thread("t1"))]
+    checks.append(("only the last checkpoints are kept", 0 < len(history) <= restarted.max_checkpoints_per_thread))
+
+    batched = DurableCheckpointSaver(SQLiteKVStore(path), flush_batch=2)
+    await build(batched).ainvoke({"items": ["x"]}, thread("t2"))
+    checks.append(("writes flush automatically every flush_batch", batched.stats()["flushes"] >= 1))
+
+    failing_store = FailingStore(path)
+    failing = DurableCheckpointSaver(failing_store, flush_batch=1000)
+    await build(failing).ainvoke({"items": ["y"]}, thread("t3"))
+    failing_store.fail_next = True
+    try:
+        await failing.aflush()
+        raised = False
+    except ConnectionError:
+        raised = True
+    checks.append(("a failed flush keeps the thread dirty", raised and failing.stats()["dirty_threads"] == 1))
+    checks.append(("the retry flushes it", await failing.aflush() == 1
+                   and (await graph2.aget_state(thread("t3"))).values["items"][0] == "y"))
+
+    await failing.adelete_thread("t3")
+    checks.append(("deleted thread is gone from every worker", (await graph2.aget_state(thread("t3"))).values == {}))
+
+    expiring = DurableCheckpointSaver(SQLiteKVStore(path), ttl_seconds=1, flush_batch=1000)
+    await build(expiring).ainvoke({"items": ["z"]}, thread("t4"))
+    await expiring.aflush()
+    time.sleep(1.1)
+    fresh = DurableCheckpointSaver(SQLiteKVStore(path))
+    checks.append(("threads expire ttl_seconds after their last flush", (await build(fresh).aget_state(thread("t4"))).values == {}))
+
+    idle = DurableCheckpointSaver(SQLiteKVStore(path), cache_ttl_seconds=0, flush_batch=1000)
+    await build(idle).ainvoke({"items": ["w"]}, thread("t5"))
+    await idle.aflush()
+    checks.append(("idle flushed threads leave the hot cache", idle.stats()["threads"] == 0))
+    state = (await build(idle).aget_state(thread("t5"))).values
+    checks.append(("and reload from the store on access", state["items"][0] == "w" and idle.stats()["loads"] == 1))
+    return checks
+
+
+async def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing durable checkpoints...")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as tmp:
+        checks = kv_checks(os.path.join(tmp, "kv.sqlite3")) + await saver_checks(os.path.join(tmp, "checkpoints.sqlite3"))
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Checkpoints flush, reload and expire as configured.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the pruned extraction prompt (EXTRACTION_PROMPT_MODE=pruned).
+
+Checks that both workflows share one short static prefix, that the prompt
+only describes missing and message-relevant fields and shrinks with every
+field collected, and that data collection sends it whenever it is smaller
+than the full prompt - falling back to the full prompt otherwise (workflow 3
+on its first turns).
+
+No running service or API keys needed.
+
+Usage: python test_extraction_prompt.py
+"""
+
+import os
+import logging
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+os.environ["EXTRACTION_PROMPT_MODE"] = "pruned"
+logging.disable(logging.CRITICAL)
+
+from src.models.schemas import ConversationState
+from src.prompts import get_prompt_registry
+from src.workflows.data_collection import DataCollectionNode
+from src.workflows.extraction_prompt import build_extraction_prompt, estimate_tokens, select_prompt_fields
+
+# Fields in the order the workflows ask for them
+ORDER = {
+    2: ["dealershipwebsite_url", "shopper_name", "user_name", "user_phone", "vehiclesearchpreference"],
+    3: ["dealershipwebsite_url", "vehicledetailspage_urls", "user_name", "user_phone", "user_email"]
+}
+
+
+def turn(workflow_id: int, collected: int, message: str = "ok") -> ConversationState:
+    """State after the first `collected` fields of the workflow were collected."""
+    fields = ORDER[workflow_id]
+    return ConversationState(
+        user_query=message, conversation_id=7, workflow_id=workflow_id, completed_fields=fields[:collected],
+        current_field=fields[collected] if collected < len(fields) else None
+    )
+
+
+def shrink_checks(workflow_id: int) -> list:
+    sizes = [estimate_tokens(build_extraction_prompt(turn(workflow_id, k))) for k in range(len(ORDER[workflow_id]) + 1)]
+    prefix = get_prompt_registry().get("pruned_extraction").static
+    checks = [
+        (f"workflow {workflow_id}: the prompt shrinks with every field collected ({sizes})",
+         all(later < earlier for earlier, later in zip(sizes, sizes[1:]))),
+        (f"workflow {workflow_id}: every turn starts with the shared static prefix",
+         all(build_extraction_prompt(turn(workflow_id, k)).startswith(prefix + "\n\n") for k in range(3)))
+    ]
+    collected = build_extraction_prompt(turn(workflow_id, 2))
+    checks.append((f"workflow {workflow_id}: collected fields lose their spec and example",
+                   "`dealershipwebsite_url`" not in collected and "our site is" not in collected))
+    return checks
+
+
+def selection_checks() -> list:
+    return [
+        ("a message about a collected field brings its spec back",
+         "dealershipwebsite_url" in select_prompt_fields(turn(2, 2, "actually our site is www.smithmotors.com"))),
+        ("vehicle detail URLs drop out once the either/or group has search preferences",
+         "vehicledetailspage_urls" not in select_prompt_fields(turn(2, 5))),
+        ("optional fields are only described during optional collection",
+         "shopper_notes" not in select_prompt_fields(turn(2, 1))
+         and "shopper_notes" in select_prompt_fields(turn(2, 5).model_copy(update={"workflow_status": "optional_collection"})))
+    ]
+
+
+def node_checks() -> list:
+    node = DataCollectionNode()
+    checks = []
+    for workflow_id in (2, 3):
+        sent = []
+        for k in range(len(ORDER[workflow_id]) + 1):
+            state = turn(workflow_id, k)
+            full = estimate_tokens(node._full_extraction_prompt(state))
+            prompt = node._extraction_prompt(state)
+            pruned = prompt == build_extraction_prompt(state)
+            sent.append(pruned)
+            checks.append((f"workflow {workflow_id}, {k} collected: the prompt sent is never larger than the full one",
+                           estimate_tokens(prompt) <= full))
+            checks.append((f"workflow {workflow_id}, {k} collected: pruned exactly when it is smaller",
+                           pruned == (estimate_tokens(build_extraction_prompt(state)) < full)))
+        checks.append((f"workflow {workflow_id}: the pruned prompt is used once fields are collected", all(sent[2:])))
+    return checks
+
+
+def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing the pruned extraction prompt...")
+    print("=" * 50)
+    checks = shrink_checks(2) + shrink_checks(3) + selection_checks() + node_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! The extraction prompt shrinks as fields are collected.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)
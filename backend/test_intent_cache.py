@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the process-wide exact intent cache.
+
+Checks that the cache key covers the whole message, so two long messages
+that share their opening never share an entry, and that a cache hit reuses
+only the route - never the entities extracted from another conversation.
+
+No running service or API keys needed.
+
+Usage: python test_intent_cache.py
+"""
+
+import os
+import asyncio
+import logging
+import warnings
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+os.environ["INTENT_SIMHASH_ENABLED"] = "false"
+os.environ.pop("INTENT_CLASSIFIER_PATH", None)
+logging.disable(logging.CRITICAL)
+warnings.filterwarnings("ignore", message="Cannot use method='json_schema'")
+
+from src.models.schemas import ConversationState, IntentRoute
+from src.workflows.intent_detection import IntentDetectionNode
+
+PREFIX = (
+    "I'd like to set up a page with a few vehicles for somebody who came in on Saturday afternoon "
+    "and test drove a couple of trucks, "
+)
+ALICE = PREFIX + "her name is Alice Moore and she liked the silver one."
+BOB = PREFIX + "his name is Bob Stone and he wants something cheaper."
+
+llm_calls = []
+
+
+async def fake_detection(user_query, salesperson_patterns=None, state=None) -> IntentRoute:
+    """Stands in for the intent LLM: extracts the name the message mentions."""
+    llm_calls.append(user_query)
+    name = "Alice" if "Alice" in user_query else "Bob"
+    return IntentRoute(workflow_id=2, confidence=0.85, reasoning="Shopper page request.",
+                       extracted_entities={"shopper_name": name})
+
+
+async def detect(node: IntentDetectionNode, message: str) -> ConversationState:
+    return await node.detect_intent(ConversationState(user_query=message, conversation_id=7))
+
+
+async def cache_checks() -> list:
+    node = IntentDetectionNode()
+    node._intent_cache.clear()
+    node._run_intent_detection = fake_detection
+
+    alice = await detect(node, ALICE)
+    bob = await detect(node, BOB)
+    checks = [
+        ("the messages share their first 100 characters", ALICE[:100] == BOB[:100]),
+        ("a shared prefix is not a cache hit", len(llm_calls) == 2 and "intent_cache_hit" not in bob.processing_steps),
+        ("each message keeps its own entities",
+         alice.collected_data.get("shopper_name") == "Alice" and bob.collected_data.get("shopper_name") == "Bob"),
+        ("the key covers the whole message", node._extract_cache_key(ALICE) != node._extract_cache_key(BOB))
+    ]
+
+    repeat = await detect(node, "  " + ALICE.upper().replace(" ", "  ") + " ")
+    checks.append(("the same message (case and spacing aside) is a cache hit",
+                   len(llm_calls) == 2 and "intent_cache_hit" in repeat.processing_steps and repeat.workflow_id == 2))
+    checks.append(("a cache hit reuses the route, not the cached entities", "shopper_name" not in repeat.collected_data))
+    return checks
+
+
+async def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing the intent cache...")
+    print("=" * 50)
+    checks = await cache_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Cached routes never carry another message's entities.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the regex pre-extraction (ENABLE_LOCAL_EXTRACTION).
+
+Checks what local_extract() finds, that its values only fill fields the LLM
+left empty, and that someone else's phone or email ("my customer's number
+is ...") is never stored as the salesperson's user_phone / user_email.
+
+No running service or API keys needed.
+
+Usage: python test_local_extraction.py
+"""
+
+import os
+import json
+import asyncio
+import logging
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+os.environ["EXTRACTION_OUTPUT_MODE"] = "json"
+os.environ["ENABLE_LOCAL_EXTRACTION"] = "true"
+logging.disable(logging.CRITICAL)
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.models.schemas import ConversationState
+from src.utils.local_extraction import LocalExtraction, local_extract
+from src.workflows.data_collection import DataCollectionNode
+
+
+def extract_checks() -> list:
+    checks = []
+
+    result = local_extract("555-123-4567", "user_phone")
+    checks.append(("bare phone is the user's and skips the LLM",
+                   result.data == {"user_phone": "+15551234567"} and result.fully_explained))
+
+    result = local_extract("my number is (555) 123-4567", "user_phone")
+    checks.append(("'my number is' is the user's", result.data.get("user_phone") == "+15551234567"))
+
+    for text in [
+        "my customer's number is 555-123-4567",
+        "the customer's cell is 555 123 4567",
+        "her phone is 555.123.4567",
+        "my client Allie, 555-123-4567"
+    ]:
+        result = local_extract(text, "user_phone")
+        checks.append((f"third-party phone not user_phone: {text!r}",
+                       "user_phone" not in result.data and not result.fully_explained))
+
+    result = local_extract("his email is allie@gmail.com", "user_email")
+    checks.append(("third-party email not user_email", "user_email" not in result.data and not result.fully_explained))
+
+    result = local_extract("my customer Allie wants a Tahoe under 40k, my cell is 555-123-4567")
+    checks.append(("user phone in its own clause after a customer clause",
+                   result.data.get("user_phone") == "+15551234567"
+                   and result.data.get("vehiclesearchpreference") == [{"price_max": 40000.0}]))
+
+    result = local_extract("https://www.smithmotors.com/inventory/used-2021-chevrolet-tahoe-12345 and www.smithmotors.com")
+    checks.append(("VDP and home page URLs are told apart",
+                   result.data.get("dealershipwebsite_url") == "https://www.smithmotors.com"
+                   and result.data.get("vehicledetailspage_urls") == ["https://www.smithmotors.com/inventory/used-2021-chevrolet-tahoe-12345"]))
+    return checks
+
+
+def merge_checks() -> list:
+    local = LocalExtraction(data={
+        "user_phone": "+15551234567",
+        "user_email": "mike@smithmotors.com",
+        "vehiclesearchpreference": [{"price_max": 40000.0, "year_min": 2020}]
+    })
+    merged = local.merge_into({
+        "user_phone": "555-987-6543",
+        "vehiclesearchpreference": [{"make": "Chevrolet", "price_max": 35000.0}]
+    })
+    return [
+        ("LLM value is kept over the local one", merged["user_phone"] == "555-987-6543"),
+        ("local value fills a field the LLM left empty", merged["user_email"] == "mike@smithmotors.com"),
+        ("numeric hints only fill empty preference keys",
+         merged["vehiclesearchpreference"] == [{"make": "Chevrolet", "price_max": 35000.0, "year_min": 2020}]),
+        ("'extracted: false' is replaced by the local data",
+         local.merge_into({"extracted": False})["user_phone"] == "+15551234567")
+    ]
+
+
+async def collection_checks() -> list:
+    """Customer's phone through data collection, with an LLM that (correctly) extracts nothing for it."""
+    checks = []
+    for reply, label in [({"extracted": False}, "LLM finds nothing"), ({"shopper_name": "Allie"}, "LLM finds the name")]:
+        node = DataCollectionNode(llm_client=FakeListChatModel(responses=[json.dumps(reply)]))
+        state = ConversationState(
+            user_query="my customer Allie's number is 555-123-4567",
+            conversation_id=7,
+            workflow_id=2,
+            current_field="user_phone"
+        )
+        state = await node.collect_data(state)
+        checks.append((f"data collection: customer phone not stored as user_phone ({label})",
+                       "user_phone" not in state.collected_data))
+    return checks
+
+
+async def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing local pre-extraction...")
+    print("=" * 50)
+    checks = extract_checks() + merge_checks() + await collection_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Local values never override the LLM or misattribute contacts.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the collected-data repair that runs before PRD validation.
+
+Checks each normalizer on the loose formats the LLM returns, that a messy
+payload passes validate_collected_data() once normalized, and that values
+which can't be repaired are left for the validators to reject.
+
+No running service or API keys needed.
+
+Usage: python test_normalization.py
+"""
+
+import os
+import copy
+import logging
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+logging.disable(logging.CRITICAL)
+
+from src.models.normalization import (
+    normalize_age,
+    normalize_collected_data,
+    normalize_condition,
+    normalize_gender,
+    normalize_preference,
+    normalize_url
+)
+from src.models.validation import validate_collected_data
+
+# (function, input, expected output)
+CASES = [
+    (normalize_url, "www.smithmotors.com", "https://www.smithmotors.com"),
+    (normalize_url, " <https://smithmotors.com/inventory/tahoe-1>. ", "https://smithmotors.com/inventory/tahoe-1"),
+    (normalize_url, "http://smithmotors.com", "http://smithmotors.com"),
+    (normalize_url, "not a url", "not a url"),
+    (normalize_gender, "she", "woman"),
+    (normalize_gender, "Male.", "man"),
+    (normalize_gender, "nonbinary", "nonbinary"),
+    (normalize_age, "mid-30's", "30s"),
+    (normalize_age, "thirties", "30s"),
+    (normalize_age, "35 years old", "35"),
+    (normalize_age, "20 to 30", "20-30"),
+    (normalize_age, 42, "42"),
+    (normalize_age, "young at heart", "young at heart"),
+    (normalize_condition, "used", ["Used"]),
+    (normalize_condition, "new, CPO, pre-owned", ["New", "Certified", "Used"]),
+    (normalize_condition, ["Used", "used"], ["Used"]),
+    (normalize_preference,
+     {"price_max": "$40k", "year_min": "2023", "year_max": 2020, "miles_max": "50,000 miles", "exterior_color": "blue, black"},
+     {"price_max": 40000.0, "year_min": 2020, "year_max": 2023, "miles_max": 50000, "exterior_color": ["blue", "black"]}),
+    (normalize_preference, {"price_min": "cheap", "condition": "pre owned"}, {"price_min": "cheap", "condition": ["Used"]})
+]
+
+MESSY = {
+    "dealershipwebsite_url": "www.smithmotors.com",
+    "shopper_name": "  Allie Davis ",
+    "user_name": "Mike Chen",
+    "user_phone": "(555) 123-4567",
+    "user_email": "mailto:Mike@SmithMotors.com",
+    "vehicledetailspage_urls": "smithmotors.com/inventory/tahoe-1, smithmotors.com/inventory/tahoe-1",
+    "vehiclesearchpreference": {"make": "Chevrolet", "model": "Tahoe", "price_max": "40k", "condition": "used"},
+    "gender_descriptor": "her",
+    "age_descriptor": "early 40s",
+    "shopper_notes": None
+}
+
+
+def normalizer_checks() -> list:
+    checks = []
+    for func, value, expected in CASES:
+        result = func(copy.deepcopy(value))
+        checks.append((f"{func.__name__}({value!r})", result == expected))
+    return checks
+
+
+def payload_checks() -> list:
+    checks = []
+    original = copy.deepcopy(MESSY)
+    normalized, coerced = normalize_collected_data(MESSY)
+    checks.append(("input is not modified", MESSY == original))
+    checks.append(("every repaired field is reported", set(coerced) == {
+        "dealershipwebsite_url", "shopper_name", "user_phone", "user_email", "vehicledetailspage_urls",
+        "vehiclesearchpreference", "gender_descriptor", "age_descriptor"
+    }))
+    checks.append(("None values are kept", "shopper_notes" in normalized and normalized["shopper_notes"] is None))
+    checks.append(("duplicate VDP URLs are dropped",
+                   normalized["vehicledetailspage_urls"] == ["https://smithmotors.com/inventory/tahoe-1"]))
+
+    try:
+        validated = validate_collected_data(normalized, 2)
+        valid = validated["user_email"] == "mike@smithmotors.com" and validated["gender_descriptor"] == "woman"
+    except Exception:
+        valid = False
+    checks.append(("normalized payload passes PRD validation", valid))
+
+    try:
+        validate_collected_data(MESSY, 2)
+        raw_rejected = False
+    except Exception:
+        raw_rejected = True
+    checks.append(("the raw payload would have been rejected", raw_rejected))
+
+    clean = {key: value for key, value in normalized.items() if value is not None}
+    checks.append(("normalizing twice changes nothing", normalize_collected_data(clean) == (clean, [])))
+
+    broken, coerced = normalize_collected_data({"user_email": "mike at smithmotors", "user_phone": "call me"})
+    checks.append(("unrepairable values are left untouched",
+                   broken == {"user_email": "mike at smithmotors", "user_phone": "call me"} and coerced == []))
+    return checks
+
+
+def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing collected-data normalization...")
+    print("=" * 50)
+    checks = normalizer_checks() + payload_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Loose LLM formats are repaired before validation.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)
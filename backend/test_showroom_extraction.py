@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Conformance test for SHOWROOM_EXTRACTION_MODE.
+
+Runs data_collection -> showroom workflow node for workflows 2 and 3 with
+fake Gemini outputs, once reusing the data collection extraction ("reuse")
+and once with the legacy second Gemini extraction ("llm"). The legacy pass
+gets a different, weaker extraction, so the checks can tell the modes apart:
+"reuse" must keep the validated collected_data and completed_fields and make
+no second Gemini call, while "llm" makes one and overwrites the data.
+
+No running service or API keys needed.
+
+Usage: python test_showroom_extraction.py
+"""
+
+import os
+import json
+import asyncio
+import logging
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+os.environ["EXTRACTION_OUTPUT_MODE"] = "json"
+os.environ["ENABLE_LOCAL_EXTRACTION"] = "false"
+logging.disable(logging.CRITICAL)
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+import src.utils.llm_clients as llm_clients
+from src.models.schemas import ConversationState
+from src.workflows.data_collection import data_collection_node
+from src.workflows.shopper_showroom_workflow import shopper_showroom_workflow_node
+from src.workflows.personal_showroom_workflow import personal_showroom_workflow_node
+
+# workflow_id -> (showroom node, message, data collection extraction, legacy pass extraction)
+CASES = {
+    2: (
+        shopper_showroom_workflow_node,
+        "My customer Allie Davis wants a used Chevrolet Tahoe, my site is https://www.smithmotors.com",
+        {
+            "shopper_name": "Allie Davis",
+            "dealershipwebsite_url": "https://www.smithmotors.com",
+            "vehiclesearchpreference": [{"make": "Chevrolet", "model": "Tahoe", "condition": ["Used"]}]
+        },
+        {"shopper_name": "Allie", "vehiclesearchpreference": "used Tahoe"}
+    ),
+    3: (
+        personal_showroom_workflow_node,
+        "I'm Mike Chen, mike@premierford.com, showroom for https://www.premierford.com/inventory/used-2021-ford-f-150-12345",
+        {
+            "user_name": "Mike Chen",
+            "user_email": "mike@premierford.com",
+            "vehicledetailspage_urls": ["https://www.premierford.com/inventory/used-2021-ford-f-150-12345"]
+        },
+        {"user_name": "Mike", "vehicledetailspage_urls": "premierford.com"}
+    )
+}
+
+
+class FakeLLMClients(llm_clients.LLMClientRegistry):
+    """Registry whose first Gemini client returns the full extraction and any later one the weaker legacy extraction."""
+
+    def __init__(self, extraction: dict, legacy_extraction: dict):
+        super().__init__()
+        self.extractions = [json.dumps(extraction), json.dumps(legacy_extraction)]
+        self.gemini_calls = 0
+
+    def gemini(self, model, temperature):
+        self.gemini_calls += 1
+        return FakeListChatModel(responses=[self.extractions[min(self.gemini_calls, 2) - 1]])
+
+    def chat_openai(self, model, temperature, tags=()):
+        return FakeListChatModel(responses=["Thanks! What's next?"], tags=list(tags) or None)
+
+
+async def run_turn(workflow_id: int, mode: str) -> tuple:
+    """
+    Run one message through data collection and the showroom node.
+
+    Returns:
+        Tuple of (state after collection, state after the showroom node, Gemini clients used)
+    """
+    node, query, extraction, legacy_extraction = CASES[workflow_id]
+    os.environ["SHOWROOM_EXTRACTION_MODE"] = mode
+    clients = FakeLLMClients(extraction, legacy_extraction)
+    llm_clients._registry = clients
+    state = ConversationState(user_query=query, conversation_id=7, workflow_id=workflow_id)
+    state = await data_collection_node(state)
+    collected = (json.loads(json.dumps(state.collected_data)), list(state.completed_fields))
+    state = await node(state)
+    return collected, (state.collected_data, state.completed_fields), clients.gemini_calls
+
+
+async def main() -> bool:
+    """Run both extraction modes; returns whether every check passed."""
+    print("🧪 Testing showroom extraction reuse...")
+    print("=" * 50)
+    checks = []
+
+    for workflow_id in CASES:
+        collected, reused, reuse_calls = await run_turn(workflow_id, "reuse")
+        legacy_collected, legacy, legacy_calls = await run_turn(workflow_id, "llm")
+        checks.append((f"workflow {workflow_id}: extraction collected data", bool(collected[0])))
+        checks.append((f"workflow {workflow_id}: reuse keeps the validated collected_data", reused[0] == collected[0]))
+        checks.append((f"workflow {workflow_id}: reuse keeps completed_fields", reused[1] == collected[1]))
+        checks.append((f"workflow {workflow_id}: reuse makes no second extraction call", reuse_calls == 1))
+        checks.append((f"workflow {workflow_id}: the legacy pass runs and overwrites the data",
+                       legacy_calls == 2 and legacy[0] != legacy_collected[0]))
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Reuse mode keeps the validated extraction.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
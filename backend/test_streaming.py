@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the typed SSE events of /webhook/chat/stream.
+
+Drives a graph with the real entry routing and sticky_workflow node (intent
+detection and data collection replaced by stand-ins) in "updates" stream
+mode, maps each update with node_update_events() as the endpoint does, and
+checks that every turn sends an "intent" event before "fields" - including
+sticky turns that skip intent detection - and that only the tagged reply
+LLM's tokens become "delta" events.
+
+No running service or API keys needed.
+
+Usage: python test_streaming.py
+"""
+
+import os
+import asyncio
+import logging
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+os.environ["ENABLE_STICKY_WORKFLOW"] = "true"
+logging.disable(logging.CRITICAL)
+
+from langchain_core.messages import AIMessageChunk
+from langgraph.graph import StateGraph, START, END
+
+from src.models.schemas import ConversationState
+from src.workflows.intent_detection import route_at_entry, sticky_workflow_node
+from src.workflows.streaming import RESPONSE_STREAM_TAG, extract_text_delta, node_update_events
+
+
+async def detect(state: ConversationState) -> ConversationState:
+    """Stands in for intent detection: routes to the shopper showroom."""
+    state.workflow_id = 2
+    state.intent_confidence = 0.8
+    state.processing_steps.append("intent_detection")
+    return state
+
+
+async def collect(state: ConversationState) -> ConversationState:
+    """Stands in for data collection: the message answered the current field."""
+    state.newly_collected_fields = [state.current_field] if state.current_field else []
+    state.current_field = "user_phone"
+    state.validation_status = "incomplete"
+    return state
+
+
+def build():
+    workflow = StateGraph(ConversationState)
+    workflow.add_node("intent_detection", detect)
+    workflow.add_node("sticky_workflow", sticky_workflow_node)
+    workflow.add_node("data_collection", collect)
+    workflow.add_conditional_edges(START, route_at_entry, {
+        "intent_detection": "intent_detection",
+        "sticky_workflow": "sticky_workflow"
+    })
+    workflow.add_edge("intent_detection", "data_collection")
+    workflow.add_edge("sticky_workflow", "data_collection")
+    workflow.add_edge("data_collection", END)
+    return workflow.compile()
+
+
+async def events_for(state: ConversationState) -> list:
+    """(event, data) pairs the endpoint would send for the "updates" of one turn."""
+    events = []
+    async for chunk in build().astream(state.model_dump(), stream_mode="updates"):
+        for node, update in chunk.items():
+            events.extend(node_update_events(node, update))
+    return events
+
+
+async def intent_checks() -> list:
+    checks = []
+    detected = await events_for(ConversationState(user_query="my customer Allie wants a Tahoe", workflow_id=1))
+    checks.append(("detected turn: intent then fields", [event for event, _ in detected] == ["intent", "fields"]))
+    checks.append(("detected turn: intent carries the routed workflow",
+                   dict(detected).get("intent") == {"workflow_id": 2, "confidence": 0.8}))
+
+    sticky = await events_for(ConversationState(
+        user_query="555-123-4567", workflow_id=2, workflow_status="active", current_field="user_phone"
+    ))
+    checks.append(("sticky turn: intent then fields", [event for event, _ in sticky] == ["intent", "fields"]))
+    checks.append(("sticky turn: intent carries the kept workflow",
+                   dict(sticky).get("intent") == {"workflow_id": 2, "confidence": 1.0}))
+    checks.append(("sticky turn: fields follow", dict(sticky).get("fields", {}).get("newly_collected_fields") == ["user_phone"]))
+
+    checks.append(("other nodes send no typed events", node_update_events("generate_response", {"workflow_id": 2}) == []))
+    return checks
+
+
+def delta_checks() -> list:
+    chunk = AIMessageChunk(content="Great, ")
+    tagged = {"langgraph_node": "shopper_showroom_workflow", "tags": [RESPONSE_STREAM_TAG]}
+    return [
+        ("tagged reply tokens become deltas", extract_text_delta(chunk, tagged) == "Great, "),
+        ("untagged LLM calls are not streamed",
+         extract_text_delta(chunk, {"langgraph_node": "shopper_showroom_workflow", "tags": []}) is None),
+        ("extraction tokens are not streamed",
+         extract_text_delta(chunk, {"langgraph_node": "data_collection", "tags": [RESPONSE_STREAM_TAG]}) is None)
+    ]
+
+
+async def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing streaming events...")
+    print("=" * 50)
+    checks = await intent_checks() + delta_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Every turn streams its intent, sticky or not.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming extraction (ENABLE_STREAMING_EXTRACTION=true).
+
+Streams a fake Gemini response through data collection inside a graph and
+checks that each field is announced as a "field" event as soon as its value
+closes, that fields only reach collected_data after the whole response has
+parsed - going through normalization and validation like any other
+extraction - and that a stream that breaks off mid-object leaves
+collected_data untouched.
+
+No running service or API keys needed.
+
+Usage: python test_streaming_extraction.py
+"""
+
+import os
+import asyncio
+import logging
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+os.environ["ENABLE_LOCAL_EXTRACTION"] = "false"
+logging.disable(logging.CRITICAL)
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langgraph.graph import StateGraph, START, END
+
+from src.models.schemas import ConversationState
+from src.workflows.data_collection import DataCollectionNode
+
+COLLECTED = {"dealershipwebsite_url": "https://www.smithmotors.com", "shopper_name": "Allie Davis"}
+COMPLETE = '{"user_name": "Mike Chen", "user_phone": "555-123-4567"}'
+# The connection drops after two fields have closed
+BROKEN = '{"user_name": "Mike Chen", "user_phone": "555-123-4567", "vehiclesearchpreference": [{"make": "Chev'
+
+
+async def stream_turn(response: str) -> tuple:
+    """Run one workflow 2 turn; returns (final state, streamed field events)."""
+    node = DataCollectionNode(llm_client=FakeListChatModel(responses=[response]), streaming=True)
+    workflow = StateGraph(ConversationState)
+    workflow.add_node("data_collection", node.collect_data)
+    workflow.add_edge(START, "data_collection")
+    workflow.add_edge("data_collection", END)
+    graph = workflow.compile()
+
+    state = ConversationState(
+        user_query="I'm Mike Chen, 555-123-4567", conversation_id=7, workflow_id=2, current_field="user_name",
+        collected_data=dict(COLLECTED), completed_fields=list(COLLECTED)
+    )
+    events, final = [], None
+    async for mode, chunk in graph.astream(state.model_dump(), stream_mode=["custom", "values"]):
+        if mode == "custom" and chunk["event"] == "field":
+            events.append(chunk["data"]["field"])
+        elif mode == "values":
+            final = chunk
+    return ConversationState(**final), events
+
+
+async def stream_checks() -> list:
+    state, events = await stream_turn(COMPLETE)
+    checks = [
+        ("fields are announced as their values close", events == ["user_name", "user_phone"]),
+        ("a parsed stream commits its fields",
+         state.collected_data.get("user_name") == "Mike Chen" and state.newly_collected_fields == ["user_name", "user_phone"]),
+        ("committed fields are normalized like any other extraction",
+         state.collected_data.get("user_phone") == "+15551234567" and state.current_field == "vehicledetailspage_urls")
+    ]
+
+    state, events = await stream_turn(BROKEN)
+    checks.append(("a broken stream still announced its closed fields", events == ["user_name", "user_phone"]))
+    checks.append(("a broken stream leaves collected_data untouched",
+                   state.collected_data == COLLECTED and state.newly_collected_fields == []
+                   and "data_extraction_json_error" in state.processing_steps))
+    checks.append(("and the field is asked for again", state.current_field == "user_name"))
+    return checks
+
+
+async def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing streaming extraction...")
+    print("=" * 50)
+    checks = await stream_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Streamed fields are committed only once the response parses.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for schema-constrained extraction (EXTRACTION_OUTPUT_MODE=structured).
+
+Uses the real Gemini structured-output runnable from the LLM client registry -
+request building, response schema and output parsing all run - with only the
+provider call replaced by canned responses. Checks that the request builds for
+both workflow schemas, that malformed or schema-invalid output is retried once
+on RETRY_MODEL, and that provider errors are not retried.
+
+No running service or API keys needed.
+
+Usage: python test_structured_extraction.py
+"""
+
+import os
+import json
+import asyncio
+import logging
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+os.environ["EXTRACTION_OUTPUT_MODE"] = "structured"
+os.environ["ENABLE_LOCAL_EXTRACTION"] = "false"
+logging.disable(logging.CRITICAL)
+
+import langchain_google_genai.chat_models as gemini_chat_models
+from google.ai.generativelanguage_v1beta.types import GenerateContentResponse
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.models.schemas import ConversationState
+from src.models.validation import EXTRACTION_MODELS
+from src.utils.llm_clients import get_llm_clients
+from src.workflows.data_collection import GEMINI_MODEL, RETRY_MODEL, DataCollectionNode
+
+requests = []
+responses = []
+
+
+def fake_response(text: str) -> GenerateContentResponse:
+    return GenerateContentResponse({
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finish_reason": 1}],
+        "usage_metadata": {"prompt_token_count": 100, "candidates_token_count": 20, "total_token_count": 120}
+    })
+
+
+def fake_call(generation_method=None, **kwargs):
+    """Stands in for the Gemini API: records the built request, returns the next canned response."""
+    requests.append(kwargs["request"])
+    response = responses.pop(0)
+    if isinstance(response, Exception):
+        raise response
+    return fake_response(response)
+
+
+async def fake_acall(generation_method=None, **kwargs):
+    return fake_call(generation_method, **kwargs)
+
+
+gemini_chat_models._chat_with_retry = fake_call
+gemini_chat_models._achat_with_retry = fake_acall
+
+
+async def request_checks() -> list:
+    checks = []
+    for workflow_id, schema in EXTRACTION_MODELS.items():
+        requests.clear()
+        responses[:] = [json.dumps({"user_name": "Mike Chen"})]
+        runnable = get_llm_clients().structured_gemini(GEMINI_MODEL, 0, schema)
+        try:
+            output = await runnable.ainvoke([SystemMessage("Extract the fields."), HumanMessage("I'm Mike Chen")])
+        except Exception as e:
+            output = {"parsed": None, "parsing_error": e}
+        checks.append((f"workflow {workflow_id}: real structured request builds",
+                       len(requests) == 1 and output.get("parsing_error") is None))
+        checks.append((f"workflow {workflow_id}: response schema carries the nested preference keys",
+                       bool(requests) and "year_min" in str(requests[0].generation_config.response_schema)))
+        parsed = output.get("parsed")
+        checks.append((f"workflow {workflow_id}: output parses into the extraction model",
+                       isinstance(parsed, schema) and parsed.user_name == "Mike Chen"))
+    return checks
+
+
+async def run(*canned) -> tuple:
+    """Run data collection with the given provider responses; returns (state, models called)."""
+    requests.clear()
+    responses[:] = list(canned)
+    state = ConversationState(
+        user_query="My customer Allie Davis wants a Tahoe", conversation_id=7, workflow_id=2,
+        current_field="shopper_name"
+    )
+    state = await DataCollectionNode().collect_data(state)
+    return state, [request.model.rsplit("/", 1)[-1] for request in requests]
+
+
+async def retry_checks() -> list:
+    valid = json.dumps({"shopper_name": "Allie Davis", "vehiclesearchpreference": [{"make": "Chevrolet", "model": "Tahoe"}]})
+    checks = []
+
+    state, models = await run(valid)
+    checks.append(("valid output: one call, data collected",
+                   models == [GEMINI_MODEL] and state.collected_data.get("shopper_name") == "Allie Davis"
+                   and state.collected_data.get("vehiclesearchpreference") == [{"make": "Chevrolet", "model": "Tahoe"}]))
+
+    state, models = await run("Sorry, I can't help with that.", valid)
+    checks.append(("malformed JSON is retried on RETRY_MODEL",
+                   models == [GEMINI_MODEL, RETRY_MODEL] and state.collected_data.get("shopper_name") == "Allie Davis"
+                   and f"structured_extraction_retried: {RETRY_MODEL}" in state.processing_steps))
+
+    state, models = await run(json.dumps({"vehiclesearchpreference": "a Tahoe"}), valid)
+    checks.append(("schema-invalid output is retried on RETRY_MODEL",
+                   models == [GEMINI_MODEL, RETRY_MODEL] and state.collected_data.get("shopper_name") == "Allie Davis"))
+
+    state, models = await run("Sorry, I can't help with that.", "No data here.")
+    checks.append(("two malformed responses give up without data",
+                   len(models) == 2 and "structured_extraction_failed" in state.processing_steps
+                   and not state.collected_data))
+
+    state, models = await run(RuntimeError("503 service unavailable"), valid)
+    checks.append(("provider error is not retried as a parsing error",
+                   models == [GEMINI_MODEL] and "data_extraction_failed" in state.processing_steps
+                   and "503" in (state.error or "")))
+    return checks
+
+
+async def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing structured extraction...")
+    print("=" * 50)
+    checks = await request_checks() + await retry_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Structured extraction builds real requests and retries only bad output.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if asyncio.run(main()) else 1)
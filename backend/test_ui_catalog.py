@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for pre-filled JSX from the UI catalog.
+
+Checks that values pre-filled into quoted attributes are entity-escaped,
+while array pre-fills go into {...} expression props as plain JSON - so a
+URL with a query string reaches the form unchanged - with "</" escaped.
+
+No running service or API keys needed.
+
+Usage: python test_ui_catalog.py
+"""
+
+import os
+import json
+import logging
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("GOOGLE_AI_API_KEY", "test")
+logging.disable(logging.CRITICAL)
+
+from src.utils.ui_catalog import UICatalog
+
+VDP_URL = "https://d.com/vdp?id=1&stock=A2"
+
+
+def expression(jsx: str, prop: str):
+    """Parse the JSON of an expression prop such as defaultValue={[...]}."""
+    start = jsx.index(f"{prop}={{") + len(prop) + 2
+    end = jsx.index("}\n", start)
+    return json.loads(jsx[start:end])
+
+
+def prefill_checks() -> list:
+    catalog = UICatalog().build()
+    urls = catalog.render(3, "vehicledetailspage_urls", {"vehicledetailspage_urls": [VDP_URL, "https://d.com/vdp?id=2"]})
+    website = catalog.render(2, "dealershipwebsite_url", {"dealershipwebsite_url": "https://d.com/?a=1&b=\"2\""})
+    script = catalog.render(3, "vehicledetailspage_urls", {"vehicledetailspage_urls": ["https://d.com/</script>"]})
+    return [
+        ("array pre-fills keep query strings intact",
+         expression(urls, "defaultValue") == [VDP_URL, "https://d.com/vdp?id=2"] and "&amp;" not in urls),
+        ("quoted attributes are still entity-escaped",
+         'defaultValue="https://d.com/?a=1&amp;b=&quot;2&quot;"' in website),
+        ("</ is escaped inside expression props",
+         "</script>" not in script and expression(script, "defaultValue") == ["https://d.com/</script>"]),
+        ("fields without a value keep the prebuilt JSX", catalog.render(3, "vehicledetailspage_urls", {}) ==
+         catalog._entries[(3, "vehicledetailspage_urls")]["jsx"])
+    ]
+
+
+def main() -> bool:
+    """Run every check; returns whether all passed."""
+    print("🧪 Testing UI catalog pre-fill...")
+    print("=" * 50)
+    checks = prefill_checks()
+
+    for name, ok in checks:
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    print("=" * 50)
+    if all(ok for _, ok in checks):
+        print("🎉 All tests passed! Pre-filled values reach the form unchanged.")
+        return True
+    print("⚠️  Some tests failed.")
+    return False
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if main() else 1)